@@ -1,14 +1,148 @@
+import math
+from typing import Any
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from model import env
+from core.admission import AdmissionController
+from core.log_sink import log_shipper
+from core.route import TimedRoute
+from core.timing import (
+    current,
+    emit_metrics,
+    end_request,
+    request_metrics,
+    server_timing_header,
+    start_request,
+)
+from db.book import book_cache
+from model.env import get_env
 from model.pyproject import ProjectInfo
+from router.books import book_lookups
 from router.books import router as books_router
 
-# pyproject.tomlからプロジェクト情報を読み込む
-project_info = ProjectInfo.from_pyproject()
+# プロジェクト情報を読み込む (デプロイ時に埋め込んだ環境変数を優先)
+project_info = ProjectInfo.load()
 
 # 環境変数の取得
-env = env.EnvConfig.from_env()
+env = get_env()
+
+
+class TimingMiddleware:
+    """リクエストの処理段階ごとの所要時間を計測するミドルウェア
+
+    DynamoDB・S3の呼び出し、アクセスログの出力、エンドポイントの実行、
+    シリアライズ、全体の所要時間をServer-Timingヘッダーで返し、
+    DynamoDBの消費キャパシティと合わせてEMFのログとして出力する。
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = start_request()
+        timings = current()
+        assert timings is not None
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if env.server_timing_enabled:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing", server_timing_header(timings.finish())
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            durations = timings.finish()
+            emit_metrics(
+                env.metrics_namespace,
+                {"Route": route_name(scope)},
+                request_metrics(timings, durations),
+                {"StatusCode": status_code, "Path": scope["path"]},
+            )
+            end_request(token)
+
+
+def route_name(scope: dict[str, Any]) -> str:
+    """メトリクスのディメンションに使用するルート名 (例: GET /books/{isbn})
+
+    パスパラメーターの値をパラメーター名に置き換え、ISBNごとに
+    ディメンションが分かれないようにする。
+    """
+    if "route" not in scope:
+        return f"{scope['method']} unmatched"
+    names = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    path = "/".join(
+        f"{{{names[segment]}}}" if segment in names else segment
+        for segment in scope["path"].split("/")
+    )
+    return f"{scope['method']} {path}"
+
+
+class AdmissionMiddleware:
+    """上限を超えたリクエストを処理前に429で拒否するミドルウェア
+
+    同時実行数・ルートごと・クライアント (APIキーまたは送信元IP) ごとの
+    上限を超えた場合、Retry-Afterヘッダー付きの429を即座に返す。
+    """
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController) -> None:
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in ADMISSION_EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        wait = self.controller.try_admit(
+            scope["method"], scope["path"], client_key(scope)
+        )
+        if wait:
+            response = JSONResponse(
+                {"detail": "Too Many Requests"},
+                status_code=429,
+                headers={"Retry-After": str(max(1, math.ceil(wait)))},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
+
+
+# 流量制御の対象外とするパス
+ADMISSION_EXEMPT_PATHS = frozenset({"/health"})
+
+
+def client_key(scope: Scope) -> str | None:
+    """クライアントごとの上限に使用するキー (APIキー、なければ送信元IP)"""
+    for name, value in scope["headers"]:
+        if name == b"x-api-key":
+            return f"key:{value.decode('latin-1')}"
+    client = scope.get("client")
+    return f"ip:{client[0]}" if client else None
+
+
+admission = AdmissionController(
+    max_concurrency=env.admission_max_concurrency,
+    route_limits=env.admission_route_limits,
+    client_rate=env.admission_client_rate,
+    client_burst=env.admission_client_burst,
+)
 
 
 # FastAPIアプリケーションのインスタンス化
@@ -20,6 +154,11 @@ app = FastAPI(
     openapi_prefix=f"/{env.project_major_version}/",  # バージョニング対応
 )
 
+app.router.route_class = TimedRoute
+# 後から追加したミドルウェアが外側になるため、拒否したリクエストも計測される
+app.add_middleware(AdmissionMiddleware, controller=admission)
+app.add_middleware(TimingMiddleware)
+
 # ルーターの登録
 app.include_router(
     prefix="/books",
@@ -32,3 +171,17 @@ app.include_router(
 async def health_check():
     """ヘルスチェックエンドポイント"""
     return {"status": "ok"}
+
+
+# 内部の状況は公開しないため、明示的に有効にした場合のみ登録する
+if env.metrics_endpoint_enabled:
+
+    @app.get("/metrics", tags=["Health"])
+    async def metrics():
+        """コンテナ内のキャッシュ・同時リクエストの集約・流量制御・ログ送信の状況を返す"""
+        return {
+            "book_cache": book_cache.stats(),
+            "book_lookups": book_lookups.stats(),
+            "admission": admission.stats(),
+            "log_shipping": log_shipper.stats(),
+        }
@@ -0,0 +1,71 @@
+"""API Gatewayのプロキシ統合イベントを組み立てるヘルパー"""
+
+import json
+import uuid
+from typing import Any
+
+
+def proxy_event(
+    method: str,
+    path: str,
+    body: Any = None,
+    query: dict[str, str] | None = None,
+    headers: dict[str, str] | None = None,
+    stage: str = "v1",
+) -> dict[str, Any]:
+    """API Gateway (REST API) のLambdaプロキシ統合イベントを生成する
+
+    Args:
+        method (str): HTTPメソッド
+        path (str): ステージを除いたリクエストパス (例: /books/123)
+        body (Any): JSONとして送信するリクエストボディ
+        query (dict[str, str] | None): クエリ文字列パラメータ
+        headers (dict[str, str] | None): 追加のリクエストヘッダー
+        stage (str): API Gatewayのステージ名
+
+    Returns:
+        dict[str, Any]: Lambdaに渡されるイベント
+    """
+    request_headers = {
+        "accept": "application/json",
+        "content-type": "application/json",
+        "host": "example.execute-api.ap-northeast-1.amazonaws.com",
+        **(headers or {}),
+    }
+    return {
+        "resource": "/{proxy+}",
+        "path": path,
+        "httpMethod": method,
+        "headers": request_headers,
+        "multiValueHeaders": {k: [v] for k, v in request_headers.items()},
+        "queryStringParameters": query,
+        "multiValueQueryStringParameters": (
+            {k: [v] for k, v in query.items()} if query else None
+        ),
+        "pathParameters": {"proxy": path.lstrip("/")},
+        "stageVariables": None,
+        "requestContext": {
+            "resourcePath": "/{proxy+}",
+            "httpMethod": method,
+            "path": f"/{stage}{path}",
+            "stage": stage,
+            "requestId": str(uuid.uuid4()),
+            "identity": {"sourceIp": "192.0.2.1", "userAgent": "bench"},
+        },
+        "body": json.dumps(body) if body is not None else None,
+        "isBase64Encoded": False,
+    }
+
+
+class LambdaContext:
+    """ベンチマーク用のLambdaコンテキスト"""
+
+    function_name = "bench"
+    memory_limit_in_mb = 5192
+    invoked_function_arn = "arn:aws:lambda:ap-northeast-1:000000000000:function:bench"
+
+    def __init__(self) -> None:
+        self.aws_request_id = str(uuid.uuid4())
+
+    def get_remaining_time_in_millis(self) -> int:
+        return 15000
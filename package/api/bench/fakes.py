@@ -0,0 +1,326 @@
+"""ベンチマーク用のDynamoDB/S3のインメモリ代替実装
+
+botocoreクライアントのHTTPリクエスト送信を差し替え、ネットワークに出ずに
+アプリケーション全体 (PynamoDB/botocoreのシリアライズを含む) を動かす。
+必要に応じて呼び出しごとに擬似的なレイテンシを加える。
+"""
+
+import io
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any
+
+from botocore.awsrequest import AWSResponse
+from botocore.client import BaseClient
+from botocore.exceptions import ClientError
+
+_CONDITION = re.compile(r"attribute_(not_)?exists \((#\w+)\)")
+_SET_CLAUSE = re.compile(r"SET (?P<set>.+?)(?: REMOVE (?P<remove>.+))?$")
+_REMOVE_CLAUSE = re.compile(r"REMOVE (?P<remove>.+)$")
+_KEY_CONDITION = re.compile(r"(#\w+) = (:\w+)")
+
+
+class FakeAws:
+    """DynamoDBとS3のAPI呼び出しをメモリ上で処理するクラス"""
+
+    def __init__(
+        self,
+        hash_key: str = "isbn",
+        index_sort_keys: dict[str, str] | None = None,
+        dynamodb_latency_ms: float = 0.0,
+        s3_latency_ms: float = 0.0,
+    ) -> None:
+        """FakeAwsを初期化する
+
+        Args:
+            hash_key (str): テーブルのパーティションキー名
+            index_sort_keys (dict[str, str] | None): GSIの名前ごとのソートキー名
+            dynamodb_latency_ms (float): DynamoDB呼び出しごとに加えるレイテンシ
+            s3_latency_ms (float): S3呼び出しごとに加えるレイテンシ
+        """
+        self.hash_key = hash_key
+        self.index_sort_keys = index_sort_keys or {
+            "author-index": "title",
+            "publisher-index": "title",
+        }
+        self.latency_seconds = {
+            "dynamodb": dynamodb_latency_ms / 1000,
+            "s3": s3_latency_ms / 1000,
+        }
+        self.tables: dict[str, dict[str, dict[str, Any]]] = {}
+        self.objects: dict[str, dict[str, Any]] = {}
+        self.calls: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._original: Any = None
+
+    def install(self) -> None:
+        """botocoreのHTTPリクエスト送信をこのインスタンスに差し替える
+
+        パラメータの検証やシリアライズ、before-call/after-callなどのイベントは
+        実際のクライアントと同じように処理され、送信だけがメモリ上で行われる。
+        """
+        fake = self
+        self._original = (BaseClient._emit_api_params, BaseClient._make_request)
+        emit_api_params = BaseClient._emit_api_params
+
+        def _emit_api_params(
+            client: BaseClient,
+            api_params: dict[str, Any],
+            operation_model: Any,
+            context: dict[str, Any],
+        ) -> dict[str, Any]:
+            api_params = emit_api_params(
+                client,
+                api_params=api_params,
+                operation_model=operation_model,
+                context=context,
+            )
+            # シリアライズ前のパラメータをリクエストの送信時に参照する
+            context["fake_api_params"] = api_params
+            return api_params
+
+        def _make_request(
+            client: BaseClient,
+            operation_model: Any,
+            request_dict: dict[str, Any],
+            request_context: dict[str, Any],
+        ) -> tuple[AWSResponse, dict[str, Any]]:
+            try:
+                parsed = fake.handle(
+                    client.meta.service_model.service_name,
+                    operation_model.name,
+                    request_context["fake_api_params"],
+                )
+            except ClientError as e:
+                return AWSResponse(request_dict["url"], 400, {}, None), e.response
+            return AWSResponse(request_dict["url"], 200, {}, None), parsed
+
+        BaseClient._emit_api_params = _emit_api_params  # type: ignore[method-assign]
+        BaseClient._make_request = _make_request  # type: ignore[method-assign]
+
+    def uninstall(self) -> None:
+        """botocoreのHTTPリクエスト送信を元に戻す"""
+        if self._original is not None:
+            (
+                BaseClient._emit_api_params,  # type: ignore[method-assign]
+                BaseClient._make_request,  # type: ignore[method-assign]
+            ) = self._original
+            self._original = None
+
+    def handle(
+        self, service_name: str, operation_name: str, params: dict[str, Any]
+    ) -> dict[str, Any]:
+        """1回分のAPI呼び出しを処理する"""
+        latency = self.latency_seconds.get(service_name, 0.0)
+        if latency:
+            time.sleep(latency)
+        with self._lock:
+            self.calls[f"{service_name}:{operation_name}"] += 1
+            handler = getattr(self, f"_{service_name}_{operation_name}", None)
+            if handler is None:
+                raise NotImplementedError(f"{service_name}:{operation_name}")
+            return handler(params)
+
+    # --- DynamoDB ---
+
+    def _key(self, item: dict[str, Any]) -> str:
+        return item[self.hash_key]["S"]
+
+    def _table(self, params: dict[str, Any]) -> dict[str, dict[str, Any]]:
+        return self.tables.setdefault(params["TableName"], {})
+
+    def _check(
+        self, operation_name: str, params: dict[str, Any], item: dict | None
+    ) -> None:
+        match = _CONDITION.fullmatch(params.get("ConditionExpression", "").strip())
+        if match is None:
+            return
+        name = params["ExpressionAttributeNames"][match.group(2)]
+        exists = item is not None and name in item
+        if exists == bool(match.group(1)):
+            raise ClientError(
+                {"Error": {"Code": "ConditionalCheckFailedException"}},
+                operation_name,
+            )
+
+    @staticmethod
+    def _capacity(params: dict[str, Any]) -> dict[str, Any]:
+        if "ReturnConsumedCapacity" not in params:
+            return {}
+        return {
+            "ConsumedCapacity": {
+                "TableName": params.get("TableName", ""),
+                "CapacityUnits": 1.0,
+            }
+        }
+
+    def _dynamodb_PutItem(self, params: dict[str, Any]) -> dict[str, Any]:
+        table = self._table(params)
+        key = self._key(params["Item"])
+        self._check("PutItem", params, table.get(key))
+        table[key] = params["Item"]
+        return self._capacity(params)
+
+    def _dynamodb_GetItem(self, params: dict[str, Any]) -> dict[str, Any]:
+        item = self._table(params).get(self._key(params["Key"]))
+        response = self._capacity(params)
+        if item is not None:
+            response["Item"] = self._project(params, item)
+        return response
+
+    def _dynamodb_DeleteItem(self, params: dict[str, Any]) -> dict[str, Any]:
+        table = self._table(params)
+        key = self._key(params["Key"])
+        self._check("DeleteItem", params, table.get(key))
+        old = table.pop(key, None)
+        response = self._capacity(params)
+        if old is not None and params.get("ReturnValues") == "ALL_OLD":
+            response["Attributes"] = old
+        return response
+
+    def _dynamodb_UpdateItem(self, params: dict[str, Any]) -> dict[str, Any]:
+        table = self._table(params)
+        key = self._key(params["Key"])
+        self._check("UpdateItem", params, table.get(key))
+        names = params.get("ExpressionAttributeNames", {})
+        values = params.get("ExpressionAttributeValues", {})
+        item = dict(table.get(key, params["Key"]))
+        expression = params["UpdateExpression"]
+        match = _SET_CLAUSE.match(expression) or _REMOVE_CLAUSE.match(expression)
+        if match is not None:
+            for clause in (match.groupdict().get("set") or "").split(","):
+                if clause.strip():
+                    name, value = (part.strip() for part in clause.split("="))
+                    item[names[name]] = values[value]
+            for name in (match.group("remove") or "").split(","):
+                if name.strip():
+                    item.pop(names[name.strip()], None)
+        table[key] = item
+        return {**self._capacity(params), "Attributes": item}
+
+    def _dynamodb_BatchWriteItem(self, params: dict[str, Any]) -> dict[str, Any]:
+        for table_name, requests in params["RequestItems"].items():
+            table = self.tables.setdefault(table_name, {})
+            for request in requests:
+                if "PutRequest" in request:
+                    item = request["PutRequest"]["Item"]
+                    table[self._key(item)] = item
+                else:
+                    table.pop(self._key(request["DeleteRequest"]["Key"]), None)
+        return {"UnprocessedItems": {}}
+
+    def _dynamodb_BatchGetItem(self, params: dict[str, Any]) -> dict[str, Any]:
+        responses = {}
+        for table_name, request in params["RequestItems"].items():
+            table = self.tables.setdefault(table_name, {})
+            responses[table_name] = [
+                self._project(request, table[self._key(key)])
+                for key in request["Keys"]
+                if self._key(key) in table
+            ]
+        return {"Responses": responses, "UnprocessedKeys": {}}
+
+    def _dynamodb_Scan(self, params: dict[str, Any]) -> dict[str, Any]:
+        table = self._table(params)
+        keys = sorted(table)
+        if "Segment" in params:
+            keys = keys[params["Segment"] :: params["TotalSegments"]]
+        start = params.get("ExclusiveStartKey")
+        if start is not None:
+            keys = [key for key in keys if key > self._key(start)]
+        limit = params.get("Limit", len(keys))
+        page = [self._project(params, table[key]) for key in keys[:limit]]
+        response = {
+            **self._capacity(params),
+            "Items": page,
+            "Count": len(page),
+            "ScannedCount": len(page),
+        }
+        if len(keys) > limit:
+            response["LastEvaluatedKey"] = {self.hash_key: {"S": keys[limit - 1]}}
+        return response
+
+    def _dynamodb_Query(self, params: dict[str, Any]) -> dict[str, Any]:
+        """GSIのパーティションキーの等価条件のみに対応し、ソートキーの順に返す"""
+        names = params.get("ExpressionAttributeNames", {})
+        values = params.get("ExpressionAttributeValues", {})
+        match = _KEY_CONDITION.fullmatch(params["KeyConditionExpression"].strip())
+        if match is None:
+            raise NotImplementedError(params["KeyConditionExpression"])
+        name, value = names[match.group(1)], values[match.group(2)]
+        sort_key = self.index_sort_keys[params["IndexName"]]
+
+        def position(item: dict[str, Any]) -> tuple[str, str]:
+            return item.get(sort_key, {}).get("S", ""), self._key(item)
+
+        items = sorted(
+            (item for item in self._table(params).values() if item.get(name) == value),
+            key=position,
+        )
+        start = params.get("ExclusiveStartKey")
+        if start is not None:
+            items = [item for item in items if position(item) > position(start)]
+        limit = params.get("Limit", len(items))
+        page = items[:limit]
+        response = {
+            **self._capacity(params),
+            "Items": [self._project(params, item) for item in page],
+            "Count": len(page),
+            "ScannedCount": len(page),
+        }
+        if len(items) > limit:
+            last = page[-1]
+            response["LastEvaluatedKey"] = {
+                key: last[key] for key in (self.hash_key, name, sort_key)
+            }
+        return response
+
+    @staticmethod
+    def _project(params: dict[str, Any], item: dict[str, Any]) -> dict[str, Any]:
+        projection = params.get("ProjectionExpression")
+        if projection is None:
+            return item
+        names = params.get("ExpressionAttributeNames", {})
+        fields = {names.get(f.strip(), f.strip()) for f in projection.split(",")}
+        return {k: v for k, v in item.items() if k in fields}
+
+    # --- S3 ---
+
+    def _s3_PutObject(self, params: dict[str, Any]) -> dict[str, Any]:
+        body = params["Body"]
+        if hasattr(body, "read"):
+            body.seek(0)
+            body = body.read()
+        self.objects[params["Key"]] = {**params, "Body": body}
+        return {}
+
+    def _s3_GetObject(self, params: dict[str, Any]) -> dict[str, Any]:
+        item = self.objects.get(params["Key"])
+        if item is None:
+            raise ClientError(
+                {"Error": {"Code": "NoSuchKey", "Message": params["Key"]}},
+                "GetObject",
+            )
+        response = {"Body": io.BytesIO(item["Body"])}
+        for name in ("ContentType", "ContentEncoding"):
+            if name in item:
+                response[name] = item[name]
+        return response
+
+    def _s3_ListObjectsV2(self, params: dict[str, Any]) -> dict[str, Any]:
+        prefix = params.get("Prefix", "")
+        keys = sorted(key for key in self.objects if key.startswith(prefix))
+        return {
+            "Contents": [
+                {"Key": key, "Size": len(self.objects[key]["Body"])} for key in keys
+            ],
+            "KeyCount": len(keys),
+            "IsTruncated": False,
+        }
+
+    def _s3_DeleteObjects(self, params: dict[str, Any]) -> dict[str, Any]:
+        for entry in params["Delete"]["Objects"]:
+            self.objects.pop(entry["Key"], None)
+        return {}
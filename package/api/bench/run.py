@@ -0,0 +1,386 @@
+"""Mangumハンドラーをプロセス内で呼び出すエンドツーエンドのベンチマーク
+
+DynamoDB/S3をインメモリの代替実装 (bench.fakes) に差し替え、API Gatewayの
+プロキシイベントでmain.handlerを直接呼び出す。エンドポイントごとの
+スループット・レイテンシ (p50/p95/p99)・1リクエストあたりのメモリ割り当てと、
+コールドスタート時間を計測し、結果をJSONで出力する。
+あわせて、ログシンクが書き出すNDJSONを圧縮方式ごとに圧縮・展開し、
+圧縮率と1レコードあたりのCPU時間を計測する。
+
+使い方:
+    uv run python -m bench.run --iterations 2000 --output .bench/result.json
+    uv run python -m bench.run --compare .bench/base.json --output .bench/new.json
+"""
+
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from bench.events import LambdaContext, proxy_event
+
+API_ROOT = Path(__file__).resolve().parents[1]
+
+# ベンチマーク実行時の環境変数 (既存の環境変数が優先される)
+BENCH_ENV = {
+    "BOOKS_TABLE_NAME": "books",
+    "LOG_BUCKET_NAME": "logs",
+    "PROJECT_MAJOR_VERSION": "v1",
+    "AWS_DEFAULT_REGION": "ap-northeast-1",
+    "AWS_ACCESS_KEY_ID": "bench",
+    "AWS_SECRET_ACCESS_KEY": "bench",
+}
+
+# シナリオ名と、反復番号からイベントを生成する関数の組
+Scenario = tuple[str, Callable[[int], dict[str, Any]]]
+
+
+def book(i: int, prefix: str) -> dict[str, Any]:
+    return {
+        "isbn": f"{prefix}-{i:08d}",
+        "title": f"Benchmark Book {i}",
+        "author": f"Author {i % 100}",
+        "publisher": f"Publisher {i % 10}",
+    }
+
+
+def scenarios(iterations: int) -> list[Scenario]:
+    """計測するシナリオの一覧を返す
+
+    GETはシード済みの書籍を順に参照し、DELETEはPOSTで登録した書籍を削除する。
+    """
+    return [
+        ("GET /health", lambda i: proxy_event("GET", "/health")),
+        ("POST /books", lambda i: proxy_event("POST", "/books", book(i, "post"))),
+        (
+            "GET /books/{isbn}",
+            lambda i: proxy_event("GET", f"/books/seed-{i % iterations:08d}"),
+        ),
+        (
+            "DELETE /books/{isbn}",
+            lambda i: proxy_event("DELETE", f"/books/post-{i:08d}"),
+        ),
+    ]
+
+
+def percentile(samples: list[float], p: float) -> float:
+    """線形補間でパーセンタイル値を求める"""
+    ordered = sorted(samples)
+    k = (len(ordered) - 1) * p / 100
+    lower = int(k)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (k - lower)
+
+
+def summarize(samples_ms: list[float]) -> dict[str, float]:
+    """レイテンシのサンプルを集計する"""
+    total_seconds = sum(samples_ms) / 1000
+    return {
+        "count": len(samples_ms),
+        "throughput_rps": len(samples_ms) / total_seconds if total_seconds else 0.0,
+        "mean_ms": statistics.fmean(samples_ms),
+        "p50_ms": percentile(samples_ms, 50),
+        "p95_ms": percentile(samples_ms, 95),
+        "p99_ms": percentile(samples_ms, 99),
+        "max_ms": max(samples_ms),
+    }
+
+
+def run_warm(
+    iterations: int, warmup: int, allocation_samples: int, fake_options: dict
+) -> tuple[dict[str, Any], dict[str, int]]:
+    """ウォームスタート状態で各エンドポイントを繰り返し呼び出して計測する"""
+    from bench.fakes import FakeAws
+
+    fake = FakeAws(**fake_options)
+    fake.install()
+    import main
+
+    context = LambdaContext()
+
+    def invoke(event: dict[str, Any]) -> None:
+        response = main.handler(event, context)
+        if response["statusCode"] >= 400:
+            raise RuntimeError(f"{event['httpMethod']} {event['path']}: {response}")
+
+    # GET用の書籍を事前に登録する
+    for i in range(iterations):
+        invoke(proxy_event("POST", "/books", book(i, "seed")))
+
+    results: dict[str, Any] = {}
+    for name, make_event in scenarios(iterations):
+        # DELETEはPOSTのシナリオで登録した書籍を同じ反復番号で削除する
+        offset = iterations
+        for i in range(warmup):
+            invoke(make_event(offset + i))
+
+        gc.collect()
+        samples_ms = []
+        for i in range(iterations):
+            event = make_event(i)
+            start = time.perf_counter()
+            invoke(event)
+            samples_ms.append((time.perf_counter() - start) * 1000)
+        result = summarize(samples_ms)
+
+        # メモリ割り当ては計測によるオーバーヘッドがあるため別パスで計測する
+        tracemalloc.start()
+        peaks = []
+        for i in range(allocation_samples):
+            event = make_event(offset + warmup + i)
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            invoke(event)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+        tracemalloc.stop()
+        if peaks:
+            result["alloc_peak_kib"] = statistics.fmean(peaks) / 1024
+        results[name] = result
+
+    fake.uninstall()
+    return results, dict(fake.calls)
+
+
+def cold_child() -> None:
+    """新しいプロセスでインポートから最初のリクエストまでの時間を出力する"""
+    start = time.perf_counter()
+    from bench.fakes import FakeAws
+
+    FakeAws().install()
+    import_start = time.perf_counter()
+    import main
+
+    imported = time.perf_counter()
+    main.handler(proxy_event("GET", "/health"), LambdaContext())
+    first = time.perf_counter()
+    main.handler(
+        proxy_event("POST", "/books", book(0, "cold")),
+        LambdaContext(),
+    )
+    first_book = time.perf_counter()
+    print(
+        json.dumps(
+            {
+                "import_ms": (imported - import_start) * 1000,
+                "first_request_ms": (first - imported) * 1000,
+                "first_book_request_ms": (first_book - first) * 1000,
+                "total_ms": (first_book - start) * 1000,
+            }
+        )
+    )
+
+
+def run_cold(samples: int) -> dict[str, Any]:
+    """コールドスタートを新しいプロセスで複数回計測する"""
+    runs = []
+    for _ in range(samples):
+        output = subprocess.run(
+            [sys.executable, "-m", "bench.run", "--cold-child"],
+            cwd=API_ROOT,
+            env={**BENCH_ENV, **os.environ},
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {key: summarize([run[key] for run in runs]) for key in runs[0]}
+
+
+def log_body(records: int) -> bytes:
+    """ログシンクが書き出すものと同じ形式のNDJSONを生成する"""
+    from model.log import AccessLog
+
+    actions = ("created", "retrieved", "retrieved", "retrieved", "deleted")
+    lines = []
+    for i in range(records):
+        log = AccessLog(
+            request_id=str(uuid.uuid4()),
+            event=f"Book with ISBN {9784000000000 + i % 997} {actions[i % 5]}",
+        )
+        lines.append(json.dumps(log.model_dump(), ensure_ascii=False).encode() + b"\n")
+    return b"".join(lines)
+
+
+def run_compression(records: int, repeat: int) -> dict[str, Any]:
+    """ログオブジェクトの圧縮方式ごとに圧縮率とCPU時間を計測する
+
+    CPU時間はprocess_timeで計測し、繰り返しの中央値を1レコードあたりに換算する。
+    実行環境で使用できない圧縮方式 (zstandardがない場合のzstd) は計測しない。
+    """
+    from core.compression import compress, is_available, open_decompressed
+
+    body = log_body(records)
+    results: dict[str, Any] = {}
+    for codec in ("gzip", "zstd"):
+        if not is_available(codec):
+            continue
+        compress_seconds = []
+        decompress_seconds = []
+        for _ in range(repeat):
+            start = time.process_time()
+            compressed = compress(body, codec)
+            compress_seconds.append(time.process_time() - start)
+            start = time.process_time()
+            restored = open_decompressed(io.BytesIO(compressed), codec).read()
+            decompress_seconds.append(time.process_time() - start)
+        if restored != body:
+            raise RuntimeError(f"{codec}: decompressed body does not match")
+        results[codec] = {
+            "records": records,
+            "raw_bytes": len(body),
+            "compressed_bytes": len(compressed),
+            "ratio": len(body) / len(compressed),
+            "compress_us_per_record": statistics.median(compress_seconds)
+            / records
+            * 1e6,
+            "decompress_us_per_record": statistics.median(decompress_seconds)
+            / records
+            * 1e6,
+        }
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=API_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(base: dict[str, Any], current: dict[str, Any], threshold: float) -> bool:
+    """前回の結果と比較して差分を表示し、閾値を超えて悪化していればFalseを返す"""
+    ok = True
+    print(f"\n{'scenario':<32} {'metric':<8} {'base':>10} {'current':>10} {'diff':>8}")
+    for group in ("warm", "cold_start"):
+        for name, metrics in current.get(group, {}).items():
+            base_metrics = base.get(group, {}).get(name)
+            if base_metrics is None:
+                continue
+            for metric in ("p50_ms", "p95_ms", "p99_ms"):
+                before = base_metrics[metric]
+                after = metrics[metric]
+                diff = (after - before) / before * 100 if before else 0.0
+                flag = " !" if diff > threshold else ""
+                ok &= diff <= threshold
+                print(
+                    f"{name:<32} {metric:<8} {before:>10.3f} {after:>10.3f}"
+                    f" {diff:>+7.1f}%{flag}"
+                )
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=100)
+    parser.add_argument("--allocation-samples", type=int, default=200)
+    parser.add_argument("--cold-samples", type=int, default=5)
+    parser.add_argument("--dynamodb-latency-ms", type=float, default=0.0)
+    parser.add_argument("--s3-latency-ms", type=float, default=0.0)
+    parser.add_argument(
+        "--compression-records",
+        type=int,
+        default=500,
+        help="圧縮を計測するログオブジェクトのレコード数 (0で計測しない)",
+    )
+    parser.add_argument("--compression-repeat", type=int, default=20)
+    parser.add_argument("--output", type=Path, default=None, help="結果のJSON")
+    parser.add_argument("--compare", type=Path, default=None, help="比較元のJSON")
+    parser.add_argument(
+        "--fail-threshold",
+        type=float,
+        default=None,
+        help="比較元よりこの割合(%%)以上遅くなった場合に終了コード1で終了する",
+    )
+    parser.add_argument("--cold-child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    for key, value in BENCH_ENV.items():
+        os.environ.setdefault(key, value)
+    sys.path.insert(0, str(API_ROOT))
+
+    if args.cold_child:
+        cold_child()
+        return
+
+    cold = run_cold(args.cold_samples) if args.cold_samples else {}
+    warm, calls = run_warm(
+        args.iterations,
+        args.warmup,
+        args.allocation_samples,
+        {
+            "dynamodb_latency_ms": args.dynamodb_latency_ms,
+            "s3_latency_ms": args.s3_latency_ms,
+        },
+    )
+    compression = (
+        run_compression(args.compression_records, args.compression_repeat)
+        if args.compression_records
+        else {}
+    )
+    result = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "iterations": args.iterations,
+            "dynamodb_latency_ms": args.dynamodb_latency_ms,
+            "s3_latency_ms": args.s3_latency_ms,
+        },
+        "cold_start": cold,
+        "warm": warm,
+        "aws_calls": calls,
+        "compression": compression,
+    }
+
+    print(f"{'scenario':<32} {'rps':>10} {'p50':>8} {'p95':>8} {'p99':>8} {'KiB':>8}")
+    for name, metrics in {**cold, **warm}.items():
+        print(
+            f"{name:<32} {metrics['throughput_rps']:>10.1f}"
+            f" {metrics['p50_ms']:>8.3f} {metrics['p95_ms']:>8.3f}"
+            f" {metrics['p99_ms']:>8.3f} {metrics.get('alloc_peak_kib', 0):>8.1f}"
+        )
+    if compression:
+        print(
+            f"\n{'codec':<8} {'raw':>10} {'compressed':>10} {'ratio':>8}"
+            f" {'comp us':>8} {'dec us':>8}"
+        )
+    for codec, metrics in compression.items():
+        print(
+            f"{codec:<8} {metrics['raw_bytes']:>10} {metrics['compressed_bytes']:>10}"
+            f" {metrics['ratio']:>8.1f} {metrics['compress_us_per_record']:>8.2f}"
+            f" {metrics['decompress_us_per_record']:>8.2f}"
+        )
+
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(result, indent=2))
+
+    if args.compare is not None:
+        base = json.loads(args.compare.read_text())
+        ok = compare(base, result, args.fail_threshold or float("inf"))
+        if args.fail_threshold is not None and not ok:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
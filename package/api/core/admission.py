@@ -0,0 +1,150 @@
+import math
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    """トークンバケット方式のレート制限
+
+    1秒あたりrate個のトークンが補充され、最大burst個まで貯まる。
+    イベントループ上で使用するため、ロックは取らない。
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """TokenBucketを初期化する
+
+        Args:
+            rate (float): 1秒あたりに補充するトークン数
+            burst (int): 貯められるトークンの最大数
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def wait_seconds(self) -> float:
+        """トークンを取得せずに、取得できるまでの秒数を返す
+
+        Returns:
+            float: 取得できる場合は0、できない場合は次のトークンまでの秒数
+        """
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def try_acquire(self) -> float:
+        """トークンを1つ取得する
+
+        Returns:
+            float: 取得できた場合は0、できなかった場合は次のトークンまでの秒数
+        """
+        wait = self.wait_seconds()
+        if not wait:
+            self._tokens -= 1
+        return wait
+
+
+class AdmissionController:
+    """同時実行数・ルートごと・クライアントごとの上限でリクエストの受け付けを判定する
+
+    上限を超えたリクエストは処理を始める前に拒否し、再試行までの秒数を返す。
+    上限はプロセス (Lambdaではコンテナ) ごとに適用される。
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 0,
+        route_limits: dict[str, tuple[float, int]] | None = None,
+        client_rate: float = 0.0,
+        client_burst: int = 0,
+        max_clients: int = 10000,
+    ) -> None:
+        """AdmissionControllerを初期化する
+
+        Args:
+            max_concurrency (int): 同時に処理するリクエスト数の上限 (0で無制限)
+            route_limits (dict[str, tuple[float, int]] | None): "METHOD /path" 形式の
+                ルートごとの (1秒あたりのリクエスト数, バースト) (パスは完全一致)
+            client_rate (float): クライアントごとの1秒あたりのリクエスト数 (0で無制限)
+            client_burst (int): クライアントごとのバースト (0の場合はclient_rateと同じ)
+            max_clients (int): レートを記録するクライアント数の上限
+        """
+        self.max_concurrency = max_concurrency
+        self.client_rate = client_rate
+        self.client_burst = client_burst or max(1, math.ceil(client_rate))
+        self.max_clients = max_clients
+        self._route_buckets = {
+            route: TokenBucket(rate, burst)
+            for route, (rate, burst) in (route_limits or {}).items()
+        }
+        self._client_buckets: OrderedDict[str, TokenBucket] = OrderedDict()
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected: dict[str, int] = {"concurrency": 0, "route": 0, "client": 0}
+
+    def try_admit(self, method: str, path: str, client: str | None) -> float:
+        """リクエストを受け付けられるか判定し、受け付ける場合は実行中として数える
+
+        受け付けたリクエストは処理の終了後にrelease()を呼び出すこと。
+        ルートとクライアントの両方の上限を確認してからトークンを取得するため、
+        一方の上限で拒否したリクエストが他方のトークンを消費することはない。
+
+        Args:
+            method (str): HTTPメソッド
+            path (str): リクエストパス
+            client (str | None): クライアントを識別するキー (APIキーや送信元IP)
+
+        Returns:
+            float: 受け付けた場合は0、拒否した場合は再試行までの秒数
+        """
+        if self.max_concurrency and self.in_flight >= self.max_concurrency:
+            self.rejected["concurrency"] += 1
+            return 1.0
+
+        route_bucket = self._route_buckets.get(f"{method} {path}")
+        if route_bucket is not None:
+            wait = route_bucket.wait_seconds()
+            if wait:
+                self.rejected["route"] += 1
+                return wait
+
+        client_bucket = None
+        if self.client_rate and client is not None:
+            client_bucket = self._client_bucket(client)
+            wait = client_bucket.wait_seconds()
+            if wait:
+                self.rejected["client"] += 1
+                return wait
+
+        for bucket in (route_bucket, client_bucket):
+            if bucket is not None:
+                bucket.try_acquire()
+        self.in_flight += 1
+        self.admitted += 1
+        return 0.0
+
+    def release(self) -> None:
+        """受け付けたリクエストの処理が終了したことを記録する"""
+        self.in_flight -= 1
+
+    def _client_bucket(self, client: str) -> TokenBucket:
+        bucket = self._client_buckets.get(client)
+        if bucket is None:
+            bucket = TokenBucket(self.client_rate, self.client_burst)
+            self._client_buckets[client] = bucket
+            if len(self._client_buckets) > self.max_clients:
+                self._client_buckets.popitem(last=False)
+        else:
+            self._client_buckets.move_to_end(client)
+        return bucket
+
+    def stats(self) -> dict[str, int | dict[str, int]]:
+        """受け付け状況を返す"""
+        return {
+            "in_flight": self.in_flight,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+        }
@@ -0,0 +1,89 @@
+import threading
+from typing import TYPE_CHECKING, Any
+
+import botocore.session
+from botocore.config import Config
+
+from core.timing import register_aws_hooks
+from model.env import get_env
+
+if TYPE_CHECKING:
+    from mypy_boto3_dynamodb import DynamoDBClient
+    from mypy_boto3_s3 import S3Client
+
+_lock = threading.Lock()
+_session: botocore.session.Session | None = None
+_clients: dict[str, Any] = {}
+
+
+def client_config() -> Config:
+    """DynamoDB/S3で共通のクライアント設定を環境変数から生成する"""
+    env = get_env()
+    return Config(
+        max_pool_connections=env.aws_max_pool_connections,
+        connect_timeout=env.aws_connect_timeout_seconds,
+        read_timeout=env.aws_read_timeout_seconds,
+        tcp_keepalive=env.aws_tcp_keepalive,
+        retries={
+            "mode": env.aws_retry_mode,
+            "total_max_attempts": env.aws_max_attempts,
+        },
+    )
+
+
+# サービスごとに共通設定へ上書きする設定
+SERVICE_CONFIGS = {
+    # PynamoDBと同様に、パラメータ検証を省略して呼び出しのオーバーヘッドを減らす
+    "dynamodb": Config(parameter_validation=False),
+}
+
+
+def _has_credentials(client: Any) -> bool:
+    """クライアントが認証情報を保持しているかを返す
+
+    botocoreは空の認証情報をキャッシュするため、メタデータサービスの一時的な
+    障害で認証情報を取得できなかったクライアントは使い続けられない
+    (PynamoDBのConnection.clientと同じ判定)。
+    """
+    signer = client._request_signer
+    return signer is None or bool(signer._credentials)
+
+
+def get_client(service_name: str) -> Any:
+    """AWSクライアントを初回利用時に生成し、コンテナ内で共有して返す
+
+    インポート時にクライアントを生成しないことで、コールドスタート時間を短縮する。
+    生成したクライアントはウォームスタート時も再利用され、コネクションも使い回される。
+    認証情報を取得できていないクライアントは作り直す。
+
+    Args:
+        service_name (str): AWSサービス名 (例: "s3")
+
+    Returns:
+        Any: botocoreのクライアント
+    """
+    global _session
+    client = _clients.get(service_name)
+    if client is None or not _has_credentials(client):
+        with _lock:
+            client = _clients.get(service_name)
+            if client is None or not _has_credentials(client):
+                if _session is None:
+                    _session = botocore.session.get_session()
+                config = client_config()
+                if service_name in SERVICE_CONFIGS:
+                    config = config.merge(SERVICE_CONFIGS[service_name])
+                client = _session.create_client(service_name, config=config)
+                register_aws_hooks(client, service_name)
+                _clients[service_name] = client
+    return client
+
+
+def get_s3_client() -> "S3Client":
+    """共有のS3クライアントを返す"""
+    return get_client("s3")
+
+
+def get_dynamodb_client() -> "DynamoDBClient":
+    """共有のDynamoDBクライアントを返す"""
+    return get_client("dynamodb")
@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache[K, V]:
+    """件数上限とTTLを持つスレッドセーフなLRUキャッシュ
+
+    値としてNoneを格納すると「存在しない」ことを表すネガティブキャッシュとなり、
+    通常とは別のTTLで保持される。
+
+    キーごとに世代を持ち、invalidate()で世代を進める。取得前に読んだ世代を
+    set()に渡すと、取得中に破棄された (更新された) 場合は格納しないため、
+    更新前に読んだ古い値で更新後のキャッシュを上書きすることはない。
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        negative_ttl_seconds: float,
+    ) -> None:
+        """TTLCacheを初期化する
+
+        Args:
+            max_size (int): 保持する最大件数 (0の場合はキャッシュしない)
+            ttl_seconds (float): 値を保持する秒数
+            negative_ttl_seconds (float): Noneを保持する秒数
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[K, tuple[float, V | None]] = OrderedDict()
+        # 破棄したキーの世代 (上限を超えて忘れた世代はfloorにまとめる)
+        self._generations: OrderedDict[K, int] = OrderedDict()
+        self._counter = 0
+        self._floor = 0
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key: K) -> tuple[bool, V | None]:
+        """キャッシュから値を取得する
+
+        Args:
+            key (K): キー
+
+        Returns:
+            tuple[bool, V | None]: キャッシュにヒットしたかどうかと、その値
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            if entry[1] is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return True, entry[1]
+
+    def generation(self, key: K) -> int:
+        """キーの現在の世代を返す (値を取得する前に読み、set()に渡す)
+
+        Args:
+            key (K): キー
+
+        Returns:
+            int: 世代
+        """
+        with self._lock:
+            return self._generations.get(key, self._floor)
+
+    def set(self, key: K, value: V | None, generation: int | None = None) -> None:
+        """値をキャッシュに格納する
+
+        Args:
+            key (K): キー
+            value (V | None): 値 (Noneの場合はネガティブキャッシュ)
+            generation (int | None): 値を取得する前に読んだ世代
+                (変わっていた場合は格納しない、Noneの場合は確認しない)
+        """
+        if self.max_size <= 0:
+            return
+        ttl = self.ttl_seconds if value is not None else self.negative_ttl_seconds
+        with self._lock:
+            current = self._generations.get(key, self._floor)
+            if generation is not None and generation != current:
+                return
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: K) -> None:
+        """キーに対応するキャッシュを破棄し、キーの世代を進める
+
+        Args:
+            key (K): キー
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._counter += 1
+            self._generations[key] = self._counter
+            self._generations.move_to_end(key)
+            # 忘れたキーの世代はfloor以上になるため、古い世代とは一致しない
+            while len(self._generations) > max(self.max_size, 1):
+                _, forgotten = self._generations.popitem(last=False)
+                self._floor = max(self._floor, forgotten)
+
+    def clear(self) -> None:
+        """すべてのキャッシュを破棄し、すべてのキーの世代を進める"""
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._counter += 1
+            self._floor = self._counter
+
+    def stats(self) -> dict[str, int]:
+        """キャッシュの利用状況を返す"""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,79 @@
+import threading
+import time
+from typing import Literal
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+class CircuitBreaker:
+    """連続した失敗を検知して外部サービスの呼び出しを止めるサーキットブレーカー
+
+    連続でfailure_threshold回失敗するとopenになり、呼び出しを止める。
+    reset_timeout_seconds経過後はhalf_openとなり、1回だけ試行 (プローブ) を許可する。
+    プローブが成功するとclosedに戻り、失敗すると再びopenになる。
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout_seconds: float) -> None:
+        """CircuitBreakerを初期化する
+
+        Args:
+            failure_threshold (int): openにするまでの連続失敗回数
+            reset_timeout_seconds (float): openからプローブを許可するまでの秒数
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self._lock = threading.Lock()
+        self._state: CircuitState = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened_count = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """現在の状態"""
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        """呼び出しを行ってよいかどうかを返す
+
+        half_openの間は、同時に1つのプローブのみを許可する。
+        """
+        with self._lock:
+            if self._state == "open":
+                if time.monotonic() - self._opened_at < self.reset_timeout_seconds:
+                    return False
+                self._state = "half_open"
+            if self._state == "half_open":
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        """呼び出しの成功を記録する"""
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """呼び出しの失敗を記録する"""
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    self.opened_count += 1
+                self._state = "open"
+                self._opened_at = time.monotonic()
+
+    def stats(self) -> dict[str, str | int]:
+        """現在の状態と連続失敗回数を返す"""
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "opened": self.opened_count,
+            }
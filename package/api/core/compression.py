@@ -0,0 +1,128 @@
+import gzip
+import logging
+from collections.abc import Iterator
+from typing import IO, Any, Literal
+
+logger = logging.getLogger(__name__)
+
+# ログオブジェクトの圧縮方式
+LogCodec = Literal["none", "gzip", "zstd"]
+
+# 圧縮方式ごとのオブジェクトキーの拡張子
+SUFFIXES: dict[LogCodec, str] = {"none": "", "gzip": ".gz", "zstd": ".zst"}
+
+# 圧縮方式ごとのContent-Encoding
+CONTENT_ENCODINGS: dict[LogCodec, str | None] = {
+    "none": None,
+    "gzip": "gzip",
+    "zstd": "zstd",
+}
+
+# 圧縮レベルを指定しない場合の既定値
+DEFAULT_LEVELS: dict[LogCodec, int] = {"none": 0, "gzip": 6, "zstd": 3}
+
+# 展開しながら読み込む場合に1回に読み込むサイズ
+READ_BYTES = 64 * 1024
+
+
+def _zstandard() -> Any:
+    """zstandardパッケージを読み込む (オプションの依存関係)"""
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError(
+            "zstd requires the zstandard package (install the 'zstd' extra)"
+        ) from e
+    return zstandard
+
+
+def is_available(codec: LogCodec) -> bool:
+    """圧縮方式が実行環境で使用できるかを返す"""
+    if codec != "zstd":
+        return True
+    try:
+        _zstandard()
+    except RuntimeError:
+        return False
+    return True
+
+
+def resolve_codec(codec: LogCodec) -> LogCodec:
+    """使用する圧縮方式を決める
+
+    zstdが指定されていてもzstandardがインストールされていない場合は、
+    ログの書き出しを止めないようgzipに切り替える。
+    """
+    if is_available(codec):
+        return codec
+    logger.warning(f"{codec} is not available, falling back to gzip")
+    return "gzip"
+
+
+def compress(body: bytes, codec: LogCodec, level: int | None = None) -> bytes:
+    """データを圧縮する
+
+    Args:
+        body (bytes): 圧縮するデータ
+        codec (LogCodec): 圧縮方式
+        level (int | None): 圧縮レベル (Noneの場合は圧縮方式ごとの既定値)
+
+    Returns:
+        bytes: 圧縮したデータ
+    """
+    if level is None:
+        level = DEFAULT_LEVELS[codec]
+    if codec == "gzip":
+        # 同じ内容から同じオブジェクトを作るため、更新日時は埋め込まない
+        return gzip.compress(body, compresslevel=level, mtime=0)
+    if codec == "zstd":
+        return _zstandard().ZstdCompressor(level=level).compress(body)
+    return body
+
+
+def codec_of(key: str, content_encoding: str | None = None) -> LogCodec:
+    """Content-Encodingまたはオブジェクトキーの拡張子から圧縮方式を判定する"""
+    for codec, encoding in CONTENT_ENCODINGS.items():
+        if encoding is not None and content_encoding == encoding:
+            return codec
+    for codec, suffix in SUFFIXES.items():
+        if suffix and key.endswith(suffix):
+            return codec
+    return "none"
+
+
+def open_decompressed(stream: IO[bytes], codec: LogCodec) -> IO[bytes]:
+    """ストリームを展開しながら読み込むストリームを返す
+
+    全体をメモリに読み込まずに展開するため、S3のレスポンスのBodyを
+    そのまま渡すことができる。
+
+    Args:
+        stream (IO[bytes]): 圧縮されたデータのストリーム
+        codec (LogCodec): 圧縮方式
+
+    Returns:
+        IO[bytes]: 展開したデータのストリーム
+    """
+    if codec == "gzip":
+        return gzip.GzipFile(fileobj=stream, mode="rb")
+    if codec == "zstd":
+        return (
+            _zstandard()
+            .ZstdDecompressor()
+            .stream_reader(stream, read_across_frames=True)
+        )
+    return stream
+
+
+def iter_lines(stream: IO[bytes], read_bytes: int = READ_BYTES) -> Iterator[bytes]:
+    """ストリームを一定サイズずつ読み込み、空行を除いた行 (改行なし) を順に返す"""
+    rest = b""
+    while chunk := stream.read(read_bytes):
+        lines = (rest + chunk).split(b"\n")
+        rest = lines.pop()
+        for line in lines:
+            if line.strip():
+                yield line
+    if rest.strip():
+        yield rest
@@ -0,0 +1,59 @@
+import asyncio
+import contextvars
+import functools
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+
+from model.env import get_env
+
+env = get_env()
+
+# PynamoDB/boto3のブロッキング呼び出しを実行するスレッドプール
+io_executor = ThreadPoolExecutor(
+    max_workers=env.io_max_workers,
+    thread_name_prefix="io",
+)
+
+
+async def run_io[**P, R](
+    func: Callable[P, R], /, *args: P.args, **kwargs: P.kwargs
+) -> R:
+    """ブロッキングなI/O処理をスレッドプールで実行し、完了を待機する
+
+    呼び出し元のcontextvarsを引き継いだ状態で実行するため、
+    イベントループを止めずに同期APIを呼び出せる。
+
+    Args:
+        func (Callable[P, R]): 実行する関数
+        *args: 関数に渡す位置引数
+        **kwargs: 関数に渡すキーワード引数
+
+    Returns:
+        R: 関数の戻り値
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        io_executor, functools.partial(context.run, func, *args, **kwargs)
+    )
+
+
+def submit_with_context[**P, R](
+    executor: Executor, func: Callable[P, R], /, *args: P.args, **kwargs: P.kwargs
+) -> Future[R]:
+    """呼び出し元のcontextvarsを引き継いだ状態で関数をスレッドプールに投入する
+
+    リクエストの計測 (所要時間や消費キャパシティ) をワーカースレッドからも
+    加算できるように、投入ごとにコンテキストを複製する。
+
+    Args:
+        executor (Executor): 投入先のスレッドプール
+        func (Callable[P, R]): 実行する関数
+        *args: 関数に渡す位置引数
+        **kwargs: 関数に渡すキーワード引数
+
+    Returns:
+        Future[R]: 関数の実行結果
+    """
+    context = contextvars.copy_context()
+    return executor.submit(context.run, func, *args, **kwargs)
@@ -0,0 +1,101 @@
+import csv
+import io
+from collections.abc import Iterable, Iterator
+from typing import Literal
+
+from db.book import parallel_scan_books
+from model.book import BOOK_FIELDS, Book
+
+# エクスポート形式
+ExportFormat = Literal["ndjson", "csv"]
+
+# エクスポート形式ごとのContent-Type
+MEDIA_TYPES: dict[ExportFormat, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# 1回に書き出すチャンクの目安のサイズ
+CHUNK_BYTES = 64 * 1024
+
+
+def ndjson_rows(books: Iterable[Book]) -> Iterator[str]:
+    """書籍情報を1行1件のJSONに変換する"""
+    for book in books:
+        yield book.model_dump_json() + "\n"
+
+
+def csv_rows(books: Iterable[Book]) -> Iterator[str]:
+    """書籍情報をヘッダー付きのCSVの行に変換する (出版社がない場合は空欄)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    def take() -> str:
+        row = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return row
+
+    writer.writerow(BOOK_FIELDS)
+    yield take()
+    for book in books:
+        writer.writerow([getattr(book, name) for name in BOOK_FIELDS])
+        yield take()
+
+
+def chunked(rows: Iterable[str], chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+    """行をまとめて一定サイズのチャンクにする
+
+    最初の行はすぐに返し、受信側が待たずに書き込みを始められるようにする。
+
+    Args:
+        rows (Iterable[str]): 改行を含む行
+        chunk_bytes (int): チャンクの目安のサイズ
+
+    Yields:
+        bytes: UTF-8でエンコードしたチャンク
+    """
+    iterator = iter(rows)
+    for row in iterator:
+        yield row.encode("utf-8")
+        break
+    parts: list[str] = []
+    size = 0
+    for row in iterator:
+        parts.append(row)
+        size += len(row)
+        if size >= chunk_bytes:
+            yield "".join(parts).encode("utf-8")
+            parts.clear()
+            size = 0
+    if parts:
+        yield "".join(parts).encode("utf-8")
+
+
+def export_books(
+    export_format: ExportFormat,
+    total_segments: int = 1,
+    page_size: int = 1000,
+    chunk_bytes: int = CHUNK_BYTES,
+) -> Iterator[bytes]:
+    """テーブル全体の書籍情報をNDJSONまたはCSVのチャンクとして順に返す
+
+    Scanはセグメントごとのスレッドで実行され、上限付きのキューを介して
+    受け渡されるため、書き出し中のページの次のページを先読みしつつ、
+    メモリ使用量はテーブルの大きさに関わらず一定に保たれる。
+    返却順序は保証されない。
+
+    Args:
+        export_format (ExportFormat): 出力形式
+        total_segments (int): 並列にScanするセグメントの数
+        page_size (int): 1回のScanで取得する件数 (先読みする件数)
+        chunk_bytes (int): チャンクの目安のサイズ
+
+    Yields:
+        bytes: 出力形式でエンコードしたチャンク
+    """
+    books = parallel_scan_books(
+        total_segments, page_size=page_size, buffer_size=page_size
+    )
+    rows = csv_rows(books) if export_format == "csv" else ndjson_rows(books)
+    yield from chunked(rows, chunk_bytes)
@@ -0,0 +1,60 @@
+import datetime
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+
+
+def make_etag(*parts: str) -> str:
+    """レスポンスの内容を識別する強いETagを生成する
+
+    Args:
+        *parts (str): ETagの元になる値 (更新日時や取得項目など)
+
+    Returns:
+        str: 引用符で囲んだETag
+    """
+    digest = hashlib.blake2b("\x1f".join(parts).encode(), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+
+def http_date(value: datetime.datetime) -> str:
+    """日時をHTTPの日付形式 (例: Wed, 21 Oct 2015 07:28:00 GMT) に変換する"""
+    return format_datetime(value.astimezone(datetime.UTC), usegmt=True)
+
+
+def is_not_modified(
+    etag: str,
+    last_modified: datetime.datetime,
+    if_none_match: str | None,
+    if_modified_since: str | None,
+) -> bool:
+    """条件付きGETの条件から、304 Not Modifiedを返せるかどうかを判定する
+
+    RFC 9110に従い、If-None-Matchがある場合はIf-Modified-Sinceを無視する。
+    ETagの比較は弱い比較 (W/の有無を区別しない) で行う。
+
+    Args:
+        etag (str): 現在のレスポンスのETag
+        last_modified (datetime.datetime): 現在のレスポンスの更新日時
+        if_none_match (str | None): If-None-Matchヘッダーの値
+        if_modified_since (str | None): If-Modified-Sinceヘッダーの値
+
+    Returns:
+        bool: 304 Not Modifiedを返せる場合はTrue
+    """
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        candidates = {
+            tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+        }
+        return etag in candidates
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        # HTTPの日付は秒単位のため、更新日時の秒未満を切り捨てて比較する
+        return last_modified.replace(microsecond=0) <= since
+    return False
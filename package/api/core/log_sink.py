@@ -0,0 +1,282 @@
+import json
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable
+
+from core.circuit import CircuitBreaker
+from core.s3 import env, save_logs_to_s3
+from core.spool import Spool
+from core.timing import timed
+from model.log import AccessLog
+
+logger = logging.getLogger(__name__)
+
+
+class LogSink:
+    """アクセスログをメモリ上に蓄積し、まとめてS3へ書き出すクラス
+
+    件数・バイト数・経過時間のいずれかが閾値に達した時点で、
+    蓄積したログを1つのNDJSONオブジェクトとして書き出す。
+    """
+
+    def __init__(
+        self,
+        max_records: int,
+        max_bytes: int,
+        max_age_seconds: float,
+        writer: Callable[[bytes, int], None] = save_logs_to_s3,
+    ) -> None:
+        """LogSinkを初期化する
+
+        Args:
+            max_records (int): 書き出しまでに蓄積する最大件数
+            max_bytes (int): 書き出しまでに蓄積する最大バイト数
+            max_age_seconds (float): 最初のログを蓄積してから書き出すまでの最大秒数
+            writer (Callable[[bytes, int], None]): NDJSONとレコード数を受け取る関数
+        """
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._writer = writer
+        self._lock = threading.Lock()
+        self._lines: list[bytes] = []
+        self._size = 0
+        self._oldest: float | None = None
+
+    def emit(self, log: AccessLog) -> None:
+        """ログをバッファに追加し、閾値を超えていれば書き出す
+
+        Args:
+            log (AccessLog): 追加するログ情報のオブジェクト
+        """
+        with timed("log"):
+            line = json.dumps(log.model_dump(), ensure_ascii=False).encode() + b"\n"
+            with self._lock:
+                if self._oldest is None:
+                    self._oldest = time.monotonic()
+                self._lines.append(line)
+                self._size += len(line)
+                lines = self._drain() if self._is_full() else []
+            self._write(lines)
+
+    def flush(self) -> None:
+        """閾値に関わらずバッファ内のログをすべて書き出す"""
+        with self._lock:
+            lines = self._drain()
+        self._write(lines)
+
+    def flush_if_expired(self) -> None:
+        """最初のログを蓄積してから最大秒数が経過していれば書き出す"""
+        with self._lock:
+            lines = self._drain() if self._is_expired() else []
+        self._write(lines)
+
+    def _is_expired(self) -> bool:
+        return (
+            self._oldest is not None
+            and time.monotonic() - self._oldest >= self.max_age_seconds
+        )
+
+    def _is_full(self) -> bool:
+        return (
+            len(self._lines) >= self.max_records
+            or self._size >= self.max_bytes
+            or self._is_expired()
+        )
+
+    def _drain(self) -> list[bytes]:
+        lines = self._lines
+        self._lines = []
+        self._size = 0
+        self._oldest = None
+        return lines
+
+    def _write(self, lines: list[bytes]) -> None:
+        if lines:
+            self._writer(b"".join(lines), len(lines))
+
+
+class LogShipper:
+    """サーキットブレーカーとローカルの退避領域を備えたログの書き出し処理
+
+    書き出しに連続で失敗するとサーキットブレーカーが開き、以降はS3を呼び出さずに
+    ログを退避領域 (ディスク) に保存するため、リクエストがS3の再試行を待たされない。
+    一定時間後の試行で書き出しに成功すると、退避したログを古い順に再送する。
+    """
+
+    def __init__(
+        self,
+        writer: Callable[[bytes, int], None],
+        breaker: CircuitBreaker,
+        spool: Spool,
+        replay_max_files: int,
+    ) -> None:
+        """LogShipperを初期化する
+
+        Args:
+            writer (Callable[[bytes, int], None]): NDJSONとレコード数を受け取り、
+                失敗時に例外を送出する関数
+            breaker (CircuitBreaker): 書き出しの可否を判定するサーキットブレーカー
+            spool (Spool): 書き出せなかったログの退避領域
+            replay_max_files (int): 1回の書き出しで再送する退避済みファイル数の上限
+        """
+        self._writer = writer
+        self.breaker = breaker
+        self.spool = spool
+        self.replay_max_files = replay_max_files
+        self._replay_lock = threading.Lock()
+
+    def __call__(self, body: bytes, record_count: int) -> None:
+        """ログを書き出す (書き出せない場合は退避する)
+
+        Args:
+            body (bytes): 1行1レコードのNDJSON形式のログ情報
+            record_count (int): bodyに含まれるレコード数
+        """
+        if not self._try_write(body, record_count):
+            self.spool.append(body, record_count)
+            return
+        self.replay()
+
+    def replay(self) -> None:
+        """退避したログを古い順に再送する (失敗した時点で中断する)"""
+        if not self._replay_lock.acquire(blocking=False):
+            return
+        try:
+            for path in self.spool.pending()[: self.replay_max_files]:
+                try:
+                    body = path.read_bytes()
+                except FileNotFoundError:
+                    continue
+                if not self._try_write(body, Spool.record_count(path)):
+                    return
+                self.spool.remove(path)
+        finally:
+            self._replay_lock.release()
+
+    def _try_write(self, body: bytes, record_count: int) -> bool:
+        if not self.breaker.allow():
+            return False
+        try:
+            self._writer(body, record_count)
+        except Exception:
+            logger.exception(
+                "Unexpected error occurred while saving logs to S3. "
+                f"record_count={record_count}"
+            )
+            self.breaker.record_failure()
+            return False
+        self.breaker.record_success()
+        return True
+
+    def stats(self) -> dict[str, dict[str, str | int]]:
+        """サーキットブレーカーと退避領域の状況を返す"""
+        return {"breaker": self.breaker.stats(), "spool": dict(self.spool.stats())}
+
+
+class BackgroundLogSink:
+    """アクセスログをキューに積み、バックグラウンドスレッドで書き出すクラス
+
+    リクエスト処理側はキューへの追加のみを行い、シリアライズと
+    S3への書き出しはワーカースレッドが内部のLogSinkを通じて行う。
+    """
+
+    def __init__(self, sink: LogSink, flush_timeout_seconds: float = 10.0) -> None:
+        """BackgroundLogSinkを初期化する
+
+        Args:
+            sink (LogSink): ワーカースレッドが書き出しに使用するログシンク
+            flush_timeout_seconds (float): flush()でキューの処理を待つ最大秒数
+        """
+        self._sink = sink
+        self.flush_timeout_seconds = flush_timeout_seconds
+        self._queue: queue.Queue[AccessLog] = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+
+    def emit(self, log: AccessLog) -> None:
+        """ログをキューに追加する
+
+        Args:
+            log (AccessLog): 追加するログ情報のオブジェクト
+        """
+        with timed("log"):
+            self._ensure_worker()
+            self._queue.put(log)
+
+    def flush(self) -> None:
+        """キューに積まれたログの処理を待ち、バッファ内のログをすべて書き出す
+
+        待つ時間には上限を設け、上限を超えた場合やワーカースレッドが停止した場合は
+        キューの処理を待たずにバッファ内のログのみを書き出す
+        (Lambdaの呼び出しがタイムアウトまで終わらなくなるのを防ぐ)。
+        """
+        deadline = time.monotonic() + self.flush_timeout_seconds
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                worker = self._worker
+                if remaining <= 0 or worker is None or not worker.is_alive():
+                    logger.warning(
+                        "Gave up waiting for queued logs. "
+                        f"unfinished={self._queue.unfinished_tasks}"
+                    )
+                    break
+                self._queue.all_tasks_done.wait(min(remaining, 0.1))
+        self._sink.flush()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="log-sink", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                log = self._queue.get(timeout=self._sink.max_age_seconds)
+            except queue.Empty:
+                try:
+                    self._sink.flush_if_expired()
+                except Exception:
+                    logger.exception("Unexpected error occurred while flushing logs.")
+                continue
+            try:
+                self._sink.emit(log)
+            except Exception:
+                logger.exception(
+                    "Unexpected error occurred while buffering log. "
+                    f"request_id={log.request_id}"
+                )
+            finally:
+                self._queue.task_done()
+
+
+# S3への書き出し (失敗時はサーキットブレーカーで止め、/tmpに退避して再送する)
+log_shipper = LogShipper(
+    writer=save_logs_to_s3,
+    breaker=CircuitBreaker(
+        failure_threshold=env.log_breaker_failure_threshold,
+        reset_timeout_seconds=env.log_breaker_reset_seconds,
+    ),
+    spool=Spool(env.log_spool_dir, env.log_spool_max_bytes),
+    replay_max_files=env.log_replay_max_files,
+)
+
+# コンテナ内で共有するログシンク
+log_sink: LogSink | BackgroundLogSink = LogSink(
+    max_records=env.log_flush_max_records,
+    max_bytes=env.log_flush_max_bytes,
+    max_age_seconds=env.log_flush_max_age_seconds,
+    writer=log_shipper,
+)
+if env.log_async:
+    log_sink = BackgroundLogSink(
+        log_sink, flush_timeout_seconds=env.log_flush_timeout_seconds
+    )
@@ -0,0 +1,121 @@
+import logging
+import random
+from collections.abc import Callable
+from typing import Any
+
+from core.aws import get_dynamodb_client, get_s3_client
+from core.timing import metrics_logger
+
+logger = logging.getLogger(__name__)
+
+# 事前に読み込むAWSの操作 (初回呼び出し時に生成される操作モデルを用意しておく)
+PRIMED_OPERATIONS = {
+    "dynamodb": (
+        "GetItem",
+        "PutItem",
+        "UpdateItem",
+        "DeleteItem",
+        "Query",
+        "Scan",
+        "BatchGetItem",
+        "BatchWriteItem",
+    ),
+    "s3": ("PutObject",),
+}
+
+# 事前にアプリケーションへ送るリクエスト (AWSを呼び出さないエンドポイント)
+PRIMING_EVENT: dict[str, Any] = {
+    "resource": "/{proxy+}",
+    "path": "/health",
+    "httpMethod": "GET",
+    "headers": {"accept": "application/json", "host": "localhost"},
+    "multiValueHeaders": {"accept": ["application/json"], "host": ["localhost"]},
+    "queryStringParameters": None,
+    "multiValueQueryStringParameters": None,
+    "pathParameters": {"proxy": "health"},
+    "stageVariables": None,
+    "requestContext": {
+        "resourcePath": "/{proxy+}",
+        "httpMethod": "GET",
+        "path": "/health",
+        "stage": "priming",
+        "requestId": "priming",
+        "identity": {"sourceIp": "127.0.0.1", "userAgent": "priming"},
+    },
+    "body": None,
+    "isBase64Encoded": False,
+}
+
+
+class PrimingContext:
+    """事前リクエスト用のLambdaコンテキスト"""
+
+    function_name = "priming"
+    memory_limit_in_mb = 0
+    invoked_function_arn = ""
+    aws_request_id = "priming"
+
+    def get_remaining_time_in_millis(self) -> int:
+        return 0
+
+
+def warm_clients() -> None:
+    """AWSクライアントを生成し、使用する操作のモデルを読み込む
+
+    ネットワークへの接続は行わない (スナップショットに古い接続を残さないため)。
+    """
+    clients = {"dynamodb": get_dynamodb_client(), "s3": get_s3_client()}
+    for service_name, operations in PRIMED_OPERATIONS.items():
+        service_model = clients[service_name].meta.service_model
+        for operation in operations:
+            service_model.operation_model(operation)
+
+
+def prime(handler: Callable[[dict[str, Any], Any], Any]) -> None:
+    """コールドスタートで初回リクエストが負担する処理を事前に実行する
+
+    AWSクライアントを用意し、ヘルスチェックのリクエストを1回処理して
+    FastAPI・Mangum・pydanticの初回実行時の処理を済ませておく。
+    事前リクエストのメトリクスは出力しない。
+
+    Args:
+        handler (Callable[[dict[str, Any], Any], Any]): Lambdaのハンドラー
+    """
+    metrics_logger.disabled = True
+    try:
+        warm_clients()
+        handler(PRIMING_EVENT, PrimingContext())
+    except Exception:
+        # 事前処理に失敗しても、通常のリクエストの処理は継続できる
+        logger.exception("Failed to prime the application")
+    finally:
+        metrics_logger.disabled = False
+
+
+def reseed_after_restore() -> None:
+    """スナップショットから復元した実行環境ごとに乱数の状態を初期化する
+
+    復元された実行環境は同じ乱数の状態を共有するため、再初期化する。
+    """
+    random.seed()
+
+
+def register_snapstart_hooks(handler: Callable[[dict[str, Any], Any], Any]) -> None:
+    """Lambda SnapStartのランタイムフックを登録する
+
+    スナップショットの作成前に事前処理を実行し、復元後に乱数を再初期化する。
+    snapshot_restore_pyはLambdaのPythonランタイムにのみ含まれるため、
+    読み込めない環境 (ローカル実行など) では何もしない。
+
+    Args:
+        handler (Callable[[dict[str, Any], Any], Any]): Lambdaのハンドラー
+    """
+    try:
+        from snapshot_restore_py import (  # type: ignore[import-not-found]
+            register_after_restore,
+            register_before_snapshot,
+        )
+    except ImportError:
+        return
+    register_before_snapshot(lambda: prime(handler))
+    register_after_restore(reseed_after_restore)
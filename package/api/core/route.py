@@ -0,0 +1,49 @@
+import functools
+import inspect
+from collections.abc import Callable
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from core.timing import timed
+
+
+def timed_endpoint[F: Callable[..., Any]](endpoint: F) -> F:
+    """エンドポイント関数の実行時間を "app" として計測するようにラップする"""
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            with timed("app"):
+                return await endpoint(*args, **kwargs)
+
+        return async_wrapper  # type: ignore[return-value]
+
+    @functools.wraps(endpoint)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with timed("app"):
+            return endpoint(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+class TimedRoute(APIRoute):
+    """エンドポイント関数とルートハンドラー全体の実行時間を計測するルート
+
+    ルートハンドラーはリクエストの検証・エンドポイント関数の実行・
+    レスポンスのシリアライズを行うため、差分からシリアライズ等の時間を求める。
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        handler = super().get_route_handler()
+
+        @functools.wraps(handler)
+        async def timed_handler(request: Request) -> Response:
+            with timed("route"):
+                return await handler(request)
+
+        return timed_handler
@@ -1,20 +1,47 @@
 import datetime
 import json
 import logging
+import uuid
 
-import boto3
-
-from model.env import EnvConfig
+from core.aws import get_s3_client
+from core.compression import CONTENT_ENCODINGS, SUFFIXES, compress, resolve_codec
+from model.env import get_env
 from model.log import AccessLog
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-env = EnvConfig.from_env()
-s3_client = boto3.client("s3")
+env = get_env()
 bucket_name = env.log_bucket_name
-s3_resource = boto3.resource("s3")
-bucket = s3_resource.Bucket(bucket_name)
+codec = resolve_codec(env.log_compression)
+
+
+def put_log_object(object_key: str, body: bytes, content_type: str) -> str:
+    """ログオブジェクトを設定された圧縮方式で圧縮してS3に保存する関数
+
+    Content-Typeは圧縮前の形式のままとし、圧縮方式はContent-Encodingと
+    オブジェクトキーの拡張子 (.gz/.zst) で示す。
+
+    Args:
+        object_key (str): 拡張子を付ける前のオブジェクトキー
+        body (bytes): 圧縮前のログ情報
+        content_type (str): 圧縮前のログ情報のContent-Type
+
+    Returns:
+        str: 保存したオブジェクトキー
+    """
+    object_key += SUFFIXES[codec]
+    extra_args = {}
+    if (content_encoding := CONTENT_ENCODINGS[codec]) is not None:
+        extra_args["ContentEncoding"] = content_encoding
+    get_s3_client().put_object(
+        Bucket=bucket_name,
+        Key=object_key,
+        Body=compress(body, codec, env.log_compression_level),
+        ContentType=content_type,
+        **extra_args,
+    )
+    return object_key
 
 
 def save_log_to_s3(log: AccessLog) -> None:
@@ -25,16 +52,32 @@ def save_log_to_s3(log: AccessLog) -> None:
     """
     timestamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y/%m/%d/%H%M%S")
     request_id = log.request_id
-    object_key = f"logs/{timestamp}_{request_id}.json"
 
     try:
-        bucket.put_object(
-            Key=object_key,
-            Body=json.dumps(log.model_dump(), ensure_ascii=False).encode("utf-8"),
-            ContentType="application/json",
+        object_key = put_log_object(
+            f"logs/{timestamp}_{request_id}.json",
+            json.dumps(log.model_dump(), ensure_ascii=False).encode("utf-8"),
+            "application/json",
         )
         logger.info(f"Log saved to S3: s3://{bucket_name}/{object_key}")
     except Exception:
         logger.exception(
             f"Unexpected error occurred while saving log to S3. request_id={request_id}"
         )
+
+
+def save_logs_to_s3(body: bytes, record_count: int) -> None:
+    """改行区切りJSON(NDJSON)にまとめた複数のログ情報をS3に保存する関数
+
+    失敗した場合の退避と再送は呼び出し元 (LogShipper) が行うため、
+    例外はそのまま送出する。
+
+    Args:
+        body (bytes): 1行1レコードのNDJSON形式のログ情報
+        record_count (int): bodyに含まれるレコード数
+    """
+    timestamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y/%m/%d/%H%M%S")
+    object_key = put_log_object(
+        f"logs/{timestamp}_{uuid.uuid4()}.ndjson", body, "application/x-ndjson"
+    )
+    logger.info(f"{record_count} logs saved to S3: s3://{bucket_name}/{object_key}")
@@ -0,0 +1,56 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+
+
+class SingleFlight[K: Hashable, V]:
+    """同じキーに対して同時に実行中の非同期処理を1つにまとめるクラス
+
+    先に呼び出したリクエストの処理結果 (または例外) を、処理中に同じキーで
+    呼び出した他のリクエストにも返す。結果は保持しないため、処理が終わった後の
+    呼び出しは新たに実行される。イベントループ上でのみ使用する。
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[K, asyncio.Future[V]] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: K, func: Callable[[], Awaitable[V]]) -> V:
+        """キーに対する処理を実行し、実行中であればその結果を待つ
+
+        処理は呼び出し元とは別のタスクとして実行するため、最初の呼び出し元を
+        含むいずれかの呼び出し元がキャンセルされても、他の呼び出し元には
+        処理結果が返される。
+
+        Args:
+            key (K): 処理をまとめる単位となるキー
+            func (Callable[[], Awaitable[V]]): 実行する処理
+
+        Returns:
+            V: 処理結果 (まとめられた呼び出し間で同じオブジェクトを共有する)
+        """
+        task = self._calls.get(key)
+        if task is not None and not task.done():
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            self.calls += 1
+            task.add_done_callback(lambda done: self._finish(key, done))
+        # 呼び出し元がキャンセルされても、実行中の処理は継続させる
+        return await asyncio.shield(task)
+
+    def _finish(self, key: K, task: asyncio.Future[V]) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # 待機している呼び出し元がない場合の警告を抑止する
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict[str, int]:
+        """処理をまとめた状況を返す"""
+        return {
+            "in_flight": len(self._calls),
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+        }
@@ -0,0 +1,95 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class Spool:
+    """書き出せなかったデータをローカルディスクに一時保存する上限付きのバッファ
+
+    1回分のデータを1ファイルとして保存し、古い順に取り出す。合計サイズが
+    上限を超えた場合は古いファイルから破棄する。ファイル名の先頭にレコード数を
+    含めるため、破棄した件数を数えられる。
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int) -> None:
+        """Spoolを初期化する
+
+        前回までに保存されたファイルが残っていれば、そのまま引き継ぐ。
+
+        Args:
+            directory (str | Path): 保存先のディレクトリ
+            max_bytes (int): 保存するファイルの合計サイズの上限
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.dropped_records = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._size = sum(path.stat().st_size for path in self._files())
+
+    def append(self, body: bytes, record_count: int) -> None:
+        """データをファイルとして保存する
+
+        Args:
+            body (bytes): 保存するデータ
+            record_count (int): データに含まれるレコード数
+        """
+        if len(body) > self.max_bytes:
+            self.dropped_records += record_count
+            logger.warning(f"Spool is too small; dropped {record_count} records")
+            return
+        name = f"{time.time_ns():020d}_{record_count}_{uuid.uuid4().hex}"
+        path = self.directory / f"{name}.ndjson"
+        temporary = self.directory / f".{name}.tmp"
+        with self._lock:
+            # 上限を超える分だけ古いファイルを破棄する
+            for old in self._files():
+                if self._size + len(body) <= self.max_bytes:
+                    break
+                self._remove(old)
+                dropped = self.record_count(old)
+                self.dropped_records += dropped
+                logger.warning(f"Spool is full; dropped {dropped} records ({old.name})")
+            temporary.write_bytes(body)
+            os.replace(temporary, path)
+            self._size += len(body)
+
+    def pending(self) -> list[Path]:
+        """保存されているファイルを古い順に返す"""
+        with self._lock:
+            return self._files()
+
+    def remove(self, path: Path) -> None:
+        """取り出し済みのファイルを削除する"""
+        with self._lock:
+            self._remove(path)
+
+    @staticmethod
+    def record_count(path: Path) -> int:
+        """ファイルに含まれるレコード数"""
+        return int(path.name.split("_")[1])
+
+    def stats(self) -> dict[str, int]:
+        """保存状況を返す"""
+        with self._lock:
+            return {
+                "files": len(self._files()),
+                "bytes": self._size,
+                "dropped_records": self.dropped_records,
+            }
+
+    def _files(self) -> list[Path]:
+        return sorted(self.directory.glob("*.ndjson"))
+
+    def _remove(self, path: Path) -> None:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return
+        self._size -= size
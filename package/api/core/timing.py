@@ -0,0 +1,211 @@
+import contextvars
+import logging
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
+
+# リクエストの処理段階ごとの名前と説明 (Server-Timingヘッダーの並び順)
+PHASES = {
+    "dynamodb": "DynamoDB",
+    "s3": "S3",
+    "log": "Access log",
+    "app": "Endpoint",
+    "serialize": "Validation and serialization",
+    "total": "Total",
+}
+
+# EMFとして出力するメトリクス名
+METRIC_NAMES = {
+    "dynamodb": "DynamoDBLatency",
+    "s3": "S3Latency",
+    "log": "LogLatency",
+    "app": "EndpointLatency",
+    "serialize": "SerializeLatency",
+    "total": "TotalLatency",
+}
+
+# 構造化ログ (EMF) を出力するロガー
+# Lambdaのアプリケーションログレベルに関わらずメトリクスを出力するため、
+# このロガーだけINFOレベルを明示する
+metrics_logger = logging.getLogger("metrics")
+metrics_logger.setLevel(logging.INFO)
+
+
+class RequestTimings:
+    """1リクエスト内の処理段階ごとの所要時間とDynamoDBの消費キャパシティを集計する
+
+    スレッドプールで実行されるAWS呼び出しからも加算されるため、ロックで保護する。
+    """
+
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.durations_ms: dict[str, float] = {}
+        self.consumed_capacity = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, duration_ms: float) -> None:
+        """処理段階の所要時間を加算する"""
+        with self._lock:
+            self.durations_ms[phase] = self.durations_ms.get(phase, 0.0) + duration_ms
+
+    def add_consumed_capacity(self, units: float) -> None:
+        """DynamoDBの消費キャパシティユニットを加算する"""
+        with self._lock:
+            self.consumed_capacity += units
+
+    def finish(self) -> dict[str, float]:
+        """リクエスト全体の所要時間を確定し、処理段階ごとの所要時間を返す
+
+        "serialize" はルートハンドラー全体からエンドポイント関数の実行時間を
+        差し引いた時間 (リクエストの検証とレスポンスのシリアライズ) とする。
+        """
+        with self._lock:
+            durations = dict(self.durations_ms)
+        route = durations.pop("route", None)
+        if route is not None:
+            durations["serialize"] = max(route - durations.get("app", 0.0), 0.0)
+        durations["total"] = (time.perf_counter() - self.start) * 1000
+        return {phase: durations[phase] for phase in PHASES if phase in durations}
+
+
+_current: contextvars.ContextVar[RequestTimings | None] = contextvars.ContextVar(
+    "request_timings", default=None
+)
+
+
+def start_request() -> contextvars.Token[RequestTimings | None]:
+    """リクエストの計測を開始する"""
+    return _current.set(RequestTimings())
+
+
+def end_request(token: contextvars.Token[RequestTimings | None]) -> None:
+    """リクエストの計測を終了する"""
+    _current.reset(token)
+
+
+def current() -> RequestTimings | None:
+    """計測中のリクエストの集計オブジェクトを返す (計測中でなければNone)"""
+    return _current.get()
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """ブロック内の処理時間を計測中のリクエストに加算する"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, (time.perf_counter() - start) * 1000)
+
+
+def server_timing_header(durations_ms: dict[str, float]) -> str:
+    """Server-Timingヘッダーの値を生成する
+
+    Args:
+        durations_ms (dict[str, float]): 処理段階ごとの所要時間 (ミリ秒)
+
+    Returns:
+        str: Server-Timingヘッダーの値
+    """
+    return ", ".join(
+        f'{phase};desc="{PHASES[phase]}";dur={duration:.2f}'
+        for phase, duration in durations_ms.items()
+    )
+
+
+def emit_metrics(
+    namespace: str,
+    dimensions: dict[str, str],
+    metrics: dict[str, tuple[float, str]],
+    properties: dict[str, Any] | None = None,
+) -> None:
+    """CloudWatch Embedded Metric Format (EMF) のログを出力する
+
+    LambdaのJSON形式のログでは、extraで渡した項目がJSONの最上位に展開されるため、
+    そのままEMFとしてCloudWatchメトリクスに変換される。
+
+    Args:
+        namespace (str): メトリクスの名前空間
+        dimensions (dict[str, str]): ディメンションの名前と値
+        metrics (dict[str, tuple[float, str]]): メトリクス名と (値, 単位) の組
+        properties (dict[str, Any] | None): メトリクス以外に記録する項目
+    """
+    payload: dict[str, Any] = {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [
+                {
+                    "Namespace": namespace,
+                    "Dimensions": [list(dimensions)],
+                    "Metrics": [
+                        {"Name": name, "Unit": unit}
+                        for name, (_, unit) in metrics.items()
+                    ],
+                }
+            ],
+        },
+        **dimensions,
+        **{name: value for name, (value, _) in metrics.items()},
+        **(properties or {}),
+    }
+    metrics_logger.info("metrics", extra=payload)
+
+
+def request_metrics(
+    timings: RequestTimings, durations_ms: dict[str, float]
+) -> dict[str, tuple[float, str]]:
+    """処理段階ごとの所要時間と消費キャパシティをEMFのメトリクスに変換する"""
+    metrics = {
+        METRIC_NAMES[phase]: (duration, "Milliseconds")
+        for phase, duration in durations_ms.items()
+    }
+    if "dynamodb" in durations_ms:
+        metrics["ConsumedCapacity"] = (timings.consumed_capacity, "Count")
+    return metrics
+
+
+def register_aws_hooks(client: Any, service_name: str) -> None:
+    """AWSクライアントの呼び出し時間をリクエストの計測に加算するフックを登録する
+
+    DynamoDBの場合は消費キャパシティ (ReturnConsumedCapacity=TOTAL) も要求し、
+    レスポンスから読み取って加算する。リクエストの計測中でなければ何もしない。
+
+    Args:
+        client (Any): botocoreのクライアント
+        service_name (str): AWSサービス名 (処理段階の名前として使用)
+    """
+    events = client.meta.events
+
+    def request_capacity(params: dict[str, Any], model: Any, **_: Any) -> None:
+        if (
+            _current.get() is not None
+            and "ReturnConsumedCapacity" in model.input_shape.members
+        ):
+            params.setdefault("ReturnConsumedCapacity", "TOTAL")
+
+    def before_call(context: dict[str, Any], **_: Any) -> None:
+        if _current.get() is not None:
+            context["timing_start"] = time.perf_counter()
+
+    def after_call(parsed: dict[str, Any], context: dict[str, Any], **_: Any) -> None:
+        timings = _current.get()
+        start = context.get("timing_start")
+        if timings is None or start is None:
+            return
+        timings.add(service_name, (time.perf_counter() - start) * 1000)
+        capacity = parsed.get("ConsumedCapacity")
+        if isinstance(capacity, dict):
+            capacity = [capacity]
+        for item in capacity or []:
+            timings.add_consumed_capacity(item.get("CapacityUnits", 0.0))
+
+    if service_name == "dynamodb":
+        events.register("before-parameter-build.dynamodb", request_capacity)
+    events.register(f"before-call.{service_name}", before_call)
+    events.register(f"after-call.{service_name}", after_call)
@@ -1,15 +1,99 @@
+import base64
 import datetime
+import json
+import logging
+import queue
+import random
+import threading
+import time
+from collections.abc import Collection, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from itertools import batched
+from typing import Any, Literal
 
 from pynamodb.attributes import (
     UnicodeAttribute,
     UTCDateTimeAttribute,
 )
+from pynamodb.connection import TableConnection
+from pynamodb.constants import ALL_OLD
+from pynamodb.exceptions import (
+    DeleteError,
+    PutError,
+    PynamoDBException,
+    UpdateError,
+)
+from pynamodb.expressions.update import Action
+from pynamodb.indexes import AllProjection, GlobalSecondaryIndex
 from pynamodb.models import Model
 
-from model.book import Book
-from model.env import EnvConfig
+from core.aws import get_dynamodb_client
+from core.cache import TTLCache
+from core.executor import submit_with_context
+from db.connection import SharedClientConnection
+from model.book import (
+    BOOK_FIELDS,
+    Book,
+    BookField,
+    BookLookupResult,
+    BookPage,
+    BookUpdate,
+    BookWriteOperation,
+    BookWriteResult,
+    PartialBook,
+    PartialBookPage,
+)
+from model.env import get_env
+
+logger = logging.getLogger(__name__)
+
+env = get_env()
+
+# BatchWriteItemの1リクエストあたりの最大件数
+BATCH_WRITE_LIMIT = 25
+# BatchGetItemの1リクエストあたりの最大件数
+BATCH_GET_LIMIT = 100
+
+# コンテナ内で共有する書籍情報のキャッシュ (レスポンス用の辞書を保持する)
+book_cache: TTLCache[str, dict[str, Any]] = TTLCache(
+    max_size=env.book_cache_max_size,
+    ttl_seconds=env.book_cache_ttl_seconds,
+    negative_ttl_seconds=env.book_cache_negative_ttl_seconds,
+)
+
+
+class BookAlreadyExistsError(Exception):
+    """登録しようとした書籍が既に存在する場合の例外"""
+
+
+class BookNotFoundError(Exception):
+    """操作対象の書籍が存在しない場合の例外"""
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+class AuthorIndex(GlobalSecondaryIndex["BookModel"]):
+    """著者で書籍を検索するためのGSI"""
+
+    class Meta:  # type: ignore
+        index_name = "author-index"
+        projection = AllProjection()
+
+    author = UnicodeAttribute(hash_key=True)
+    title = UnicodeAttribute(range_key=True)
+
+
+class PublisherIndex(GlobalSecondaryIndex["BookModel"]):
+    """出版社で書籍を検索するためのGSI"""
 
-env = EnvConfig.from_env()
+    class Meta:  # type: ignore
+        index_name = "publisher-index"
+        projection = AllProjection()
+
+    publisher = UnicodeAttribute(hash_key=True)
+    title = UnicodeAttribute(range_key=True)
 
 
 class BookModel(Model):
@@ -24,13 +108,33 @@ class BookModel(Model):
     author = UnicodeAttribute()
     publisher = UnicodeAttribute(null=True)
 
+    # インデックス
+    author_index = AuthorIndex()
+    publisher_index = PublisherIndex()
+
     # メタデータ
-    created_at = UTCDateTimeAttribute(
-        default=datetime.datetime.now(datetime.timezone.utc)
-    )
-    updated_at = UTCDateTimeAttribute(
-        default=datetime.datetime.now(datetime.timezone.utc)
-    )
+    created_at = UTCDateTimeAttribute(default=_now)
+    updated_at = UTCDateTimeAttribute(default=_now)
+
+    @classmethod
+    def _get_connection(cls) -> TableConnection:
+        """共通設定のDynamoDBクライアントを使うコネクションを返す
+
+        PynamoDBが生成したコネクションを、テーブル定義を引き継いだ
+        SharedClientConnectionに一度だけ置き換える。
+        """
+        connection = super()._get_connection()
+        if not isinstance(connection.connection, SharedClientConnection):
+            shared = SharedClientConnection(
+                region=cls.Meta.region,
+                host=cls.Meta.host,
+                extra_headers=cls.Meta.extra_headers,
+            )
+            shared.add_meta_table(
+                connection.connection.get_meta_table(cls.Meta.table_name)
+            )
+            connection.connection = shared
+        return connection
 
     @classmethod
     def from_model(cls, book: Book) -> "BookModel":
@@ -40,3 +144,552 @@ class BookModel(Model):
             author=book.author,
             publisher=book.publisher,
         )
+
+    def to_model(self) -> Book:
+        return Book(
+            isbn=self.isbn,
+            title=self.title,
+            author=self.author,
+            publisher=self.publisher,
+        )
+
+
+def _from_attribute_value(value: dict[str, Any]) -> Any:
+    """DynamoDBの属性値 (例: {"S": "..."}) をPythonの値に変換する
+
+    書籍の属性は文字列またはNULLのみのため、それ以外の型は扱わない。
+    """
+    if "S" in value:
+        return value["S"]
+    return None
+
+
+def get_book_item(
+    isbn: str, fields: list[BookField] | None = None
+) -> dict[str, Any] | None:
+    """書籍情報をキャッシュ経由で取得し、レスポンス用の辞書として返す
+
+    PynamoDBのモデルとpydanticモデルへの変換を経由せず、低レベルのGetItemで
+    ProjectionExpressionに指定した属性のみを取得して辞書に詰め替える。
+    すべての項目を取得した結果のみをキャッシュし、項目を指定した場合は
+    キャッシュから該当項目を取り出す。
+    条件付きリクエストの判定に使えるよう、更新日時 (updated_at) も含めて返す。
+
+    Args:
+        isbn (str): 書籍のISBNコード
+        fields (list[BookField] | None): 取得する項目 (Noneの場合はすべて)
+
+    Returns:
+        dict[str, Any] | None: 書籍情報と更新日時 (存在しない場合はNone)
+    """
+    hit, item = book_cache.lookup(isbn)
+    if not hit:
+        if fields is not None:
+            return _get_item(isbn, fields)
+        # 取得中に更新 (キャッシュの破棄) があった場合は、古い値を格納しない
+        generation = book_cache.generation(isbn)
+        item = _get_item(isbn, BOOK_FIELDS)
+        book_cache.set(isbn, item, generation)
+    if item is None:
+        return None
+    return {name: item[name] for name in (*(fields or BOOK_FIELDS), "updated_at")}
+
+
+def _get_item(isbn: str, fields: Sequence[BookField]) -> dict[str, Any] | None:
+    attributes_to_get = (*fields, "updated_at")
+    names = {f"#f{i}": name for i, name in enumerate(attributes_to_get)}
+    response = get_dynamodb_client().get_item(
+        TableName=BookModel.Meta.table_name,
+        Key={"isbn": {"S": isbn}},
+        ProjectionExpression=", ".join(names),
+        ExpressionAttributeNames=names,
+    )
+    attributes = response.get("Item")
+    if attributes is None:
+        return None
+    item = {
+        name: _from_attribute_value(attributes[name]) if name in attributes else None
+        for name in fields
+    }
+    # updated_atを持たない古い項目の場合はNoneとする
+    updated_at = attributes.get("updated_at", {}).get("S")
+    item["updated_at"] = (
+        BookModel.updated_at.deserialize(updated_at) if updated_at else None
+    )
+    return item
+
+
+def save_book(book: Book) -> None:
+    """書籍情報を新規登録し、キャッシュを破棄する
+
+    存在チェックは条件付きPutItemで行い、1回のリクエストで完結させる。
+
+    Args:
+        book (Book): 登録する書籍情報
+
+    Raises:
+        BookAlreadyExistsError: 同じISBNの書籍が既に存在する場合
+    """
+    try:
+        BookModel.from_model(book).save(condition=BookModel.isbn.does_not_exist())
+    except PutError as e:
+        if e.cause_response_code == "ConditionalCheckFailedException":
+            raise BookAlreadyExistsError(book.isbn) from e
+        raise
+    finally:
+        book_cache.invalidate(book.isbn)
+
+
+def update_book(isbn: str, update: BookUpdate) -> Book:
+    """書籍情報を部分更新し、キャッシュを破棄する
+
+    条件付きUpdateItemで存在チェックと更新を1回のリクエストで行い、
+    updated_atも同時に更新する。
+
+    Args:
+        isbn (str): 更新する書籍のISBNコード
+        update (BookUpdate): 更新内容
+
+    Returns:
+        Book: 更新後の書籍情報
+
+    Raises:
+        BookNotFoundError: 書籍が存在しない場合
+    """
+    actions: list[Action] = [BookModel.updated_at.set(_now())]
+    for name in sorted(update.model_fields_set):
+        attribute = getattr(BookModel, name)
+        value = getattr(update, name)
+        actions.append(attribute.remove() if value is None else attribute.set(value))
+
+    book = BookModel(isbn)
+    try:
+        book.update(actions=actions, condition=BookModel.isbn.exists())
+    except UpdateError as e:
+        if e.cause_response_code == "ConditionalCheckFailedException":
+            raise BookNotFoundError(isbn) from e
+        raise
+    finally:
+        book_cache.invalidate(isbn)
+    return book.to_model()
+
+
+def remove_book(isbn: str) -> Book:
+    """書籍情報を削除し、キャッシュを破棄する
+
+    条件付きDeleteItemで存在チェックと削除を1回のリクエストで行う。
+
+    Args:
+        isbn (str): 削除する書籍のISBNコード
+
+    Returns:
+        Book: 削除した書籍情報
+
+    Raises:
+        BookNotFoundError: 書籍が存在しない場合
+    """
+    try:
+        data = BookModel._get_connection().delete_item(
+            isbn,
+            condition=BookModel.isbn.exists(),
+            return_values=ALL_OLD,
+        )
+    except DeleteError as e:
+        if e.cause_response_code == "ConditionalCheckFailedException":
+            raise BookNotFoundError(isbn) from e
+        raise
+    finally:
+        book_cache.invalidate(isbn)
+    return BookModel.from_raw_data(data["Attributes"]).to_model()
+
+
+def encode_cursor(last_evaluated_key: dict[str, Any] | None) -> str | None:
+    """LastEvaluatedKeyをクライアントに返す不透明なカーソル文字列に変換する"""
+    if last_evaluated_key is None:
+        return None
+    raw = json.dumps(last_evaluated_key, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(
+    cursor: str | None, key_names: Collection[str]
+) -> dict[str, Any] | None:
+    """カーソル文字列をLastEvaluatedKeyに戻す
+
+    改ざんされたカーソルをDynamoDBに渡さないよう、キー属性の名前と型も検証する。
+
+    Args:
+        cursor (str | None): 前のページで返されたカーソル
+        key_names (Collection[str]): LastEvaluatedKeyに含まれるキー属性の名前
+
+    Raises:
+        ValueError: カーソルの形式が不正な場合
+    """
+    if cursor is None:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    if (
+        not isinstance(key, dict)
+        or set(key) != set(key_names)
+        or not all(
+            isinstance(value, dict)
+            and list(value) == ["S"]
+            and isinstance(value["S"], str)
+            for value in key.values()
+        )
+    ):
+        raise ValueError("Invalid cursor")
+    return key
+
+
+def list_books(
+    limit: int,
+    cursor: str | None = None,
+    segment: int | None = None,
+    total_segments: int | None = None,
+) -> BookPage:
+    """書籍情報を1ページ分Scanで取得する
+
+    segmentとtotal_segmentsを指定した場合は、並列Scanの1セグメント分のみを取得する。
+
+    Args:
+        limit (int): 1ページあたりの最大件数
+        cursor (str | None): 前のページで返されたカーソル
+        segment (int | None): 取得するセグメント番号
+        total_segments (int | None): セグメントの総数
+
+    Returns:
+        BookPage: 書籍情報の一覧と次のページのカーソル
+
+    Raises:
+        ValueError: カーソルの形式が不正な場合
+    """
+    result = BookModel.scan(
+        limit=limit,
+        last_evaluated_key=decode_cursor(cursor, ["isbn"]),
+        segment=segment,
+        total_segments=total_segments,
+    )
+    items = [book.to_model() for book in result]
+    return BookPage(items=items, next_cursor=encode_cursor(result.last_evaluated_key))
+
+
+def query_books(
+    index: Literal["author", "publisher"],
+    value: str,
+    limit: int,
+    cursor: str | None = None,
+    fields: list[BookField] | None = None,
+) -> PartialBookPage:
+    """著者または出版社のGSIを使って書籍情報を1ページ分取得する
+
+    結果はタイトル順に並ぶ。
+
+    Args:
+        index (Literal["author", "publisher"]): 検索に使うインデックス
+        value (str): 著者名または出版社名
+        limit (int): 1ページあたりの最大件数
+        cursor (str | None): 前のページで返されたカーソル
+        fields (list[BookField] | None): 取得する項目 (Noneの場合はすべて)
+
+    Returns:
+        PartialBookPage: 書籍情報の一覧と次のページのカーソル
+
+    Raises:
+        ValueError: カーソルの形式が不正な場合
+    """
+    book_index = (
+        BookModel.author_index if index == "author" else BookModel.publisher_index
+    )
+    result = book_index.query(
+        value,
+        limit=limit,
+        last_evaluated_key=decode_cursor(cursor, ["isbn", index, "title"]),
+        attributes_to_get=fields,
+    )
+    names = fields or BOOK_FIELDS
+    items = [
+        PartialBook(**{name: getattr(book, name) for name in names}) for book in result
+    ]
+    return PartialBookPage(
+        items=items, next_cursor=encode_cursor(result.last_evaluated_key)
+    )
+
+
+def parallel_scan_books(
+    total_segments: int,
+    page_size: int = 1000,
+    buffer_size: int = 1000,
+) -> Iterator[Book]:
+    """テーブル全体をセグメントごとのスレッドで並列にScanする
+
+    各スレッドの取得結果は上限付きのキューを経由して返すため、
+    呼び出し側の処理が遅い場合はScanも待機し、メモリ使用量は一定に保たれる。
+    返却順序は保証されない。
+
+    Args:
+        total_segments (int): セグメントの総数 (並列に動作するスレッド数)
+        page_size (int): 1回のScanで取得する件数
+        buffer_size (int): スレッド間で受け渡すキューの上限件数
+
+    Yields:
+        Book: 書籍情報
+    """
+    buffer: queue.Queue[Book | BaseException | None] = queue.Queue(buffer_size)
+    stopped = threading.Event()
+
+    def put(item: Book | BaseException | None) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def scan_segment(segment: int) -> None:
+        try:
+            for book in BookModel.scan(
+                segment=segment, total_segments=total_segments, page_size=page_size
+            ):
+                if not put(book.to_model()):
+                    return
+        except BaseException as e:
+            put(e)
+        finally:
+            put(None)
+
+    with ThreadPoolExecutor(max_workers=total_segments) as executor:
+        for segment in range(total_segments):
+            submit_with_context(executor, scan_segment, segment)
+        try:
+            remaining = total_segments
+            while remaining:
+                item = buffer.get()
+                if item is None:
+                    remaining -= 1
+                elif isinstance(item, BaseException):
+                    raise item
+                else:
+                    yield item
+        finally:
+            stopped.set()
+
+
+# 再送すれば成功する可能性があるDynamoDBのエラーコード
+RETRYABLE_ERROR_CODES = frozenset(
+    {
+        "ProvisionedThroughputExceededException",
+        "ThrottlingException",
+        "RequestLimitExceeded",
+        "InternalServerError",
+        "ServiceUnavailable",
+    }
+)
+
+
+def is_retryable(e: Exception) -> bool:
+    """書き込みの失敗が再送で解消しうるもの (スロットリングや一時的な障害) かを返す
+
+    レスポンスのない失敗 (接続エラーやタイムアウト) も再送の対象とする。
+    ValidationExceptionなど、同じ内容を再送しても成功しないものは対象外とする。
+    """
+    if not isinstance(e, PynamoDBException):
+        return False
+    code = e.cause_response_code
+    return code is None or code in RETRYABLE_ERROR_CODES
+
+
+def backoff_seconds(attempt: int) -> float:
+    """再送までの待機秒数をフルジッター付き指数バックオフで求める
+
+    Args:
+        attempt (int): 何回目の再送か (1始まり)
+
+    Returns:
+        float: 待機秒数
+    """
+    ceiling = min(
+        env.batch_backoff_max_seconds,
+        env.batch_backoff_base_seconds * 2**attempt,
+    )
+    return random.uniform(0, ceiling)
+
+
+def batch_write_books(operations: list[BookWriteOperation]) -> list[BookWriteResult]:
+    """書籍の登録・削除をBatchWriteItemでまとめて行う
+
+    操作を25件ずつに分割して並列に送信し、未処理項目は
+    ジッター付きバックオフで再送する。同一ISBNへの操作が複数ある場合は
+    最後の操作のみを実行する。
+
+    Args:
+        operations (list[BookWriteOperation]): 書き込み操作の一覧
+
+    Returns:
+        list[BookWriteResult]: operationsと同じ順序で並んだ操作ごとの処理結果
+    """
+    latest = {op.isbn: i for i, op in enumerate(operations)}
+    for isbn in latest:
+        book_cache.invalidate(isbn)
+    errors: dict[int, str | None] = {}
+    retryable: set[int] = set()
+    chunks = list(batched(latest.values(), BATCH_WRITE_LIMIT))
+    with ThreadPoolExecutor(max_workers=env.batch_max_workers) as executor:
+        futures = [
+            submit_with_context(executor, _write_chunk, [operations[i] for i in chunk])
+            for chunk in chunks
+        ]
+        for chunk, future in zip(chunks, futures):
+            chunk_errors, chunk_retryable = future.result()
+            errors.update(zip(chunk, chunk_errors))
+            if chunk_retryable:
+                retryable.update(chunk)
+
+    results = []
+    for i, op in enumerate(operations):
+        if i not in errors:
+            status = "superseded"
+        elif errors[i] is None:
+            status = "succeeded"
+        else:
+            status = "failed"
+        results.append(
+            BookWriteResult(
+                isbn=op.isbn,
+                action=op.action,
+                status=status,
+                error=errors.get(i),
+                retryable=status == "failed" and i in retryable,
+            )
+        )
+    return results
+
+
+def _write_chunk(
+    operations: list[BookWriteOperation],
+) -> tuple[list[str | None], bool]:
+    """25件以内の操作を1回のBatchWriteItemで書き込み、未処理項目を再送する
+
+    Returns:
+        tuple[list[str | None], bool]: 操作ごとのエラー内容 (成功時はNone) と、
+            失敗が再送で解消しうるもの (スロットリングや未処理項目) かどうか
+    """
+    pending: dict[str, dict[str, Any]] = {}
+    for op in operations:
+        if op.put is not None:
+            pending[op.isbn] = {"put": BookModel.from_model(op.put).serialize()}
+        else:
+            pending[op.isbn] = {"delete": {"isbn": {"S": op.isbn}}}
+
+    connection = BookModel._get_connection()
+    attempt = 0
+    while True:
+        try:
+            data = connection.batch_write_item(
+                put_items=[r["put"] for r in pending.values() if "put" in r],
+                delete_items=[r["delete"] for r in pending.values() if "delete" in r],
+            )
+        except Exception as e:
+            logger.exception(f"Failed to batch write {len(pending)} books")
+            return (
+                [str(e) if op.isbn in pending else None for op in operations],
+                is_retryable(e),
+            )
+
+        unprocessed = data.get("UnprocessedItems", {}).get(env.books_table_name, [])
+        unprocessed_isbns = {
+            (
+                request["PutRequest"]["Item"]
+                if "PutRequest" in request
+                else request["DeleteRequest"]["Key"]
+            )["isbn"]["S"]
+            for request in unprocessed
+        }
+        pending = {k: v for k, v in pending.items() if k in unprocessed_isbns}
+        if not pending:
+            return [None] * len(operations), False
+
+        attempt += 1
+        if attempt > env.batch_max_retries:
+            return [
+                "Unprocessed after max retries" if op.isbn in pending else None
+                for op in operations
+            ], True
+        logger.info(f"Retrying {len(pending)} unprocessed items (attempt {attempt})")
+        time.sleep(backoff_seconds(attempt))
+
+
+def batch_get_books(isbns: list[str]) -> list[BookLookupResult]:
+    """書籍情報をBatchGetItemでまとめて取得する
+
+    重複を除いたISBNを100件ずつに分割して並列に取得し、未処理キーは
+    ジッター付きバックオフで再送する。
+
+    Args:
+        isbns (list[str]): 取得する書籍のISBNコード一覧
+
+    Returns:
+        list[BookLookupResult]: isbnsと同じ順序で並んだISBNごとの取得結果
+    """
+    keys = list(dict.fromkeys(isbns))
+    chunks = list(batched(keys, BATCH_GET_LIMIT))
+    books: dict[str, Book] = {}
+    errors: dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=env.batch_max_workers) as executor:
+        futures = [submit_with_context(executor, _get_chunk, chunk) for chunk in chunks]
+        for future in futures:
+            chunk_books, chunk_errors = future.result()
+            books.update(chunk_books)
+            errors.update(chunk_errors)
+
+    results = []
+    for isbn in isbns:
+        if isbn in books:
+            results.append(
+                BookLookupResult(isbn=isbn, status="found", book=books[isbn])
+            )
+        elif isbn in errors:
+            results.append(
+                BookLookupResult(isbn=isbn, status="failed", error=errors[isbn])
+            )
+        else:
+            results.append(BookLookupResult(isbn=isbn, status="not_found"))
+    return results
+
+
+def _get_chunk(isbns: tuple[str, ...]) -> tuple[dict[str, Book], dict[str, str]]:
+    """100件以内のISBNを1回のBatchGetItemで取得し、未処理キーを再送する
+
+    Returns:
+        tuple[dict[str, Book], dict[str, str]]: 取得した書籍情報と失敗時のエラー内容
+    """
+    connection = BookModel._get_connection()
+    books: dict[str, Book] = {}
+    pending = list(isbns)
+    attempt = 0
+    while True:
+        try:
+            data = connection.batch_get_item(
+                keys=[{"isbn": {"S": isbn}} for isbn in pending]
+            )
+        except Exception as e:
+            logger.exception(f"Failed to batch get {len(pending)} books")
+            return books, {isbn: str(e) for isbn in pending}
+
+        for item in data.get("Responses", {}).get(env.books_table_name, []):
+            book = BookModel.from_raw_data(item).to_model()
+            books[book.isbn] = book
+        unprocessed = data.get("UnprocessedKeys", {}).get(env.books_table_name, {})
+        pending = [key["isbn"]["S"] for key in unprocessed.get("Keys", [])]
+        if not pending:
+            return books, {}
+
+        attempt += 1
+        if attempt > env.batch_max_retries:
+            return books, {isbn: "Unprocessed after max retries" for isbn in pending}
+        logger.info(f"Retrying {len(pending)} unprocessed keys (attempt {attempt})")
+        time.sleep(backoff_seconds(attempt))
@@ -0,0 +1,31 @@
+from typing import Any
+
+from pynamodb.connection import Connection
+
+from core.aws import get_dynamodb_client
+
+
+class SharedClientConnection(Connection):
+    """core.awsの共有DynamoDBクライアントを使うPynamoDBのコネクション
+
+    PynamoDBが独自に生成するクライアントの代わりに、コネクションプール・
+    タイムアウト・リトライ設定済みの共有クライアントを使う。
+    PynamoDBのbefore-sendフック (extra_headersの付与) は共有クライアントにも登録する。
+    """
+
+    @property
+    def client(self) -> Any:
+        """共有のDynamoDBクライアントを返す
+
+        認証情報を取得できなかった場合の作り直しは core.aws.get_client が行い、
+        作り直された場合はフックを登録し直す。
+        """
+        client = get_dynamodb_client()
+        if client is not self._client:
+            client.meta.events.register_first(
+                "before-send.*.*",
+                self._before_send,
+                unique_id=f"pynamodb-before-send-{id(self)}",
+            )
+            self._client = client
+        return client
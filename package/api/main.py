@@ -1,6 +1,43 @@
+import time
+from typing import Any
+
 from mangum import Mangum
+from mangum.adapter import DEFAULT_TEXT_MIME_TYPES
+
+from app import app, env
+from core.export import MEDIA_TYPES
+from core.log_sink import log_sink
+from core.priming import prime, register_snapstart_hooks
+from core.timing import emit_metrics
+
+# REST APIはバイナリメディアタイプを定義していないため、テキストとして返す
+# Content-Typeにエクスポート形式 (NDJSON) を加え、Base64で返されないようにする
+asgi_handler = Mangum(
+    app, text_mime_types=[*DEFAULT_TEXT_MIME_TYPES, MEDIA_TYPES["ndjson"]]
+)
+
+
+def handler(event: dict[str, Any], context: Any) -> dict[str, Any]:
+    """Lambda用のハンドラー
+
+    呼び出しが終了してコンテナが凍結される前に、
+    キューとバッファに残っているアクセスログをS3へ書き出す。
+    書き出しはレスポンス生成後に行われるため、所要時間は別のEMFとして出力する。
+    """
+    try:
+        return asgi_handler(event, context)
+    finally:
+        start = time.perf_counter()
+        log_sink.flush()
+        emit_metrics(
+            env.metrics_namespace,
+            {},
+            {"LogFlushLatency": ((time.perf_counter() - start) * 1000, "Milliseconds")},
+        )
 
-from app import app
 
-# Lambda用のハンドラー
-handler = Mangum(app)
+# SnapStartではスナップショットの作成前に、プロビジョニング済み同時実行では
+# 初期化時に事前処理を行い、初回リクエストの負担を減らす
+register_snapstart_hooks(handler)
+if env.prime_on_init:
+    prime(handler)
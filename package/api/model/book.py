@@ -1,4 +1,10 @@
-from pydantic import BaseModel, Field
+from typing import Literal, Self
+
+from pydantic import BaseModel, Field, model_validator
+
+# 取得項目として指定できる書籍情報のフィールド名
+BookField = Literal["isbn", "title", "author", "publisher"]
+BOOK_FIELDS: tuple[BookField, ...] = ("isbn", "title", "author", "publisher")
 
 
 class Book(BaseModel):
@@ -8,3 +14,131 @@ class Book(BaseModel):
     title: str = Field(..., description="書籍のタイトル")
     author: str = Field(..., description="書籍の著者")
     publisher: str | None = Field(None, description="書籍の出版社")
+
+
+class PartialBook(BaseModel):
+    """取得項目を絞り込んだ書籍情報を管理するオブジェクトクラス"""
+
+    isbn: str | None = Field(None, description="書籍のISBNコード")
+    title: str | None = Field(None, description="書籍のタイトル")
+    author: str | None = Field(None, description="書籍の著者")
+    publisher: str | None = Field(None, description="書籍の出版社")
+
+
+class BookUpdate(BaseModel):
+    """書籍情報の部分更新内容を管理するオブジェクトクラス
+
+    指定したフィールドのみを更新する。publisherにnullを指定すると出版社を削除する。
+    """
+
+    title: str | None = Field(None, description="書籍のタイトル")
+    author: str | None = Field(None, description="書籍の著者")
+    publisher: str | None = Field(None, description="書籍の出版社")
+
+    @model_validator(mode="after")
+    def check_fields(self) -> Self:
+        """更新するフィールドが指定されており、必須項目がnullでないことを検証する"""
+        if not self.model_fields_set:
+            raise ValueError("更新するフィールドを1つ以上指定してください")
+        for name in ("title", "author"):
+            if name in self.model_fields_set and getattr(self, name) is None:
+                raise ValueError(f"{name}にnullは指定できません")
+        return self
+
+
+class BookWriteOperation(BaseModel):
+    """一括書き込みにおける1件分の操作を管理するオブジェクトクラス"""
+
+    put: Book | None = Field(None, description="登録する書籍情報")
+    delete: str | None = Field(None, description="削除する書籍のISBNコード")
+
+    @model_validator(mode="after")
+    def check_single_action(self) -> Self:
+        """putとdeleteのどちらか一方のみが指定されていることを検証する"""
+        if (self.put is None) == (self.delete is None):
+            raise ValueError("putとdeleteのどちらか一方のみを指定してください")
+        return self
+
+    @property
+    def isbn(self) -> str:
+        """操作対象のISBNコード"""
+        return self.put.isbn if self.put is not None else str(self.delete)
+
+    @property
+    def action(self) -> Literal["put", "delete"]:
+        """操作の種類"""
+        return "put" if self.put is not None else "delete"
+
+
+class BookWriteResult(BaseModel):
+    """一括書き込みにおける1件分の処理結果を管理するオブジェクトクラス"""
+
+    isbn: str = Field(..., description="書籍のISBNコード")
+    action: Literal["put", "delete"] = Field(..., description="操作の種類")
+    status: Literal["succeeded", "failed", "superseded"] = Field(
+        ..., description="処理結果 (supersededは同一ISBNへの後続操作で上書き)"
+    )
+    error: str | None = Field(None, description="失敗時のエラー内容")
+    retryable: bool = Field(
+        False,
+        description="再送すれば成功する可能性がある失敗か (スロットリングや未処理項目)",
+    )
+
+
+class BatchWriteRequest(BaseModel):
+    """書籍の一括書き込みリクエストを管理するオブジェクトクラス"""
+
+    operations: list[BookWriteOperation] = Field(
+        ..., min_length=1, max_length=10000, description="書き込み操作の一覧"
+    )
+
+
+class BatchWriteResponse(BaseModel):
+    """書籍の一括書き込み結果を管理するオブジェクトクラス"""
+
+    results: list[BookWriteResult] = Field(
+        ..., description="リクエストと同じ順序で並んだ操作ごとの処理結果"
+    )
+
+
+class BatchGetRequest(BaseModel):
+    """書籍の一括取得リクエストを管理するオブジェクトクラス"""
+
+    isbns: list[str] = Field(
+        ..., min_length=1, max_length=1000, description="取得する書籍のISBNコード一覧"
+    )
+
+
+class BookLookupResult(BaseModel):
+    """一括取得における1件分の取得結果を管理するオブジェクトクラス"""
+
+    isbn: str = Field(..., description="書籍のISBNコード")
+    status: Literal["found", "not_found", "failed"] = Field(..., description="取得結果")
+    book: Book | None = Field(None, description="取得した書籍情報")
+    error: str | None = Field(None, description="失敗時のエラー内容")
+
+
+class BatchGetResponse(BaseModel):
+    """書籍の一括取得結果を管理するオブジェクトクラス"""
+
+    results: list[BookLookupResult] = Field(
+        ..., description="リクエストと同じ順序で並んだISBNごとの取得結果"
+    )
+
+
+class BookPage(BaseModel):
+    """書籍一覧の1ページ分を管理するオブジェクトクラス"""
+
+    items: list[Book] = Field(..., description="書籍情報の一覧")
+    next_cursor: str | None = Field(
+        None, description="次のページを取得するためのカーソル (最終ページではNone)"
+    )
+
+
+class PartialBookPage(BaseModel):
+    """取得項目を絞り込んだ書籍一覧の1ページ分を管理するオブジェクトクラス"""
+
+    items: list[PartialBook] = Field(..., description="書籍情報の一覧")
+    next_cursor: str | None = Field(
+        None, description="次のページを取得するためのカーソル (最終ページではNone)"
+    )
@@ -1,6 +1,9 @@
+import functools
+import json
 import os
+from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class EnvConfig(BaseModel):
@@ -18,7 +21,163 @@ class EnvConfig(BaseModel):
         ..., description="プロジェクトのメジャーバージョン"
     )
 
+    # アクセスログのバッファリング設定
+    log_flush_max_records: int = Field(
+        500, ge=1, description="ログをS3へ書き出すまでに蓄積する最大件数"
+    )
+    log_flush_max_bytes: int = Field(
+        1024 * 1024, ge=1, description="ログをS3へ書き出すまでに蓄積する最大バイト数"
+    )
+    log_flush_max_age_seconds: float = Field(
+        60.0, gt=0, description="ログをS3へ書き出すまでに蓄積する最大秒数"
+    )
+    log_async: bool = Field(
+        True, description="バックグラウンドスレッドでログをS3へ書き出すかどうか"
+    )
+    log_flush_timeout_seconds: float = Field(
+        10.0, gt=0, description="呼び出しの終了時にキュー内のログの処理を待つ最大秒数"
+    )
+
+    # S3への書き出しに失敗した場合の設定
+    log_breaker_failure_threshold: int = Field(
+        3, ge=1, description="S3への書き出しを止めるまでの連続失敗回数"
+    )
+    log_breaker_reset_seconds: float = Field(
+        30.0, gt=0, description="S3への書き出しを止めてから再試行するまでの秒数"
+    )
+    log_spool_dir: str = Field(
+        "/tmp/log-spool", description="書き出せなかったログを退避するディレクトリ"
+    )
+    log_spool_max_bytes: int = Field(
+        64 * 1024 * 1024, ge=1, description="退避するログの合計サイズの上限"
+    )
+    log_replay_max_files: int = Field(
+        16, ge=1, description="1回の書き出しで再送する退避済みファイル数の上限"
+    )
+
+    # S3へ書き出すログオブジェクトの圧縮設定
+    log_compression: Literal["none", "gzip", "zstd"] = Field(
+        "gzip",
+        description="ログオブジェクトの圧縮方式 (zstdはzstandardが必要)",
+    )
+    log_compression_level: int | None = Field(
+        None, description="圧縮レベル (未指定の場合は圧縮方式ごとの既定値)"
+    )
+
+    # AWSクライアント (DynamoDB/S3共通) の接続設定
+    aws_max_pool_connections: int = Field(
+        64, ge=1, description="AWSクライアントごとのHTTPコネクションプールの上限"
+    )
+    aws_connect_timeout_seconds: float = Field(
+        1.0, gt=0, description="AWSへの接続タイムアウト秒数"
+    )
+    aws_read_timeout_seconds: float = Field(
+        3.0, gt=0, description="AWSからの応答の読み取りタイムアウト秒数"
+    )
+    aws_tcp_keepalive: bool = Field(
+        True, description="AWSとのコネクションでTCPキープアライブを有効にするかどうか"
+    )
+    aws_retry_mode: Literal["standard", "adaptive"] = Field(
+        "standard", description="AWSクライアントのリトライモード"
+    )
+    aws_max_attempts: int = Field(
+        3, ge=1, description="AWSへのリクエストの最大試行回数 (初回を含む)"
+    )
+
+    # ブロッキングI/Oを実行するスレッドプールの設定
+    io_max_workers: int = Field(
+        32, ge=1, description="DynamoDB/S3呼び出しを実行するスレッド数"
+    )
+
+    # DynamoDBの一括操作設定
+    batch_max_workers: int = Field(
+        8, ge=1, description="一括操作で並列に送信するリクエスト数"
+    )
+    batch_max_retries: int = Field(8, ge=0, description="未処理項目を再送する最大回数")
+    batch_backoff_base_seconds: float = Field(
+        0.05, gt=0, description="未処理項目の再送間隔の基準秒数"
+    )
+    batch_backoff_max_seconds: float = Field(
+        2.0, gt=0, description="未処理項目の再送間隔の最大秒数"
+    )
+
+    # 書籍情報のキャッシュ設定 (コンテナごとに保持されるため、他コンテナでの
+    # 更新はTTLが切れるまで反映されない)
+    book_cache_max_size: int = Field(
+        1024, ge=0, description="キャッシュする書籍の最大件数 (0で無効)"
+    )
+    book_cache_ttl_seconds: float = Field(
+        30.0, gt=0, description="書籍情報をキャッシュする秒数"
+    )
+    book_cache_negative_ttl_seconds: float = Field(
+        5.0, gt=0, description="存在しないISBNをキャッシュする秒数"
+    )
+
+    # 書籍情報取得のHTTPキャッシュ設定
+    book_http_max_age_seconds: int = Field(
+        60, ge=0, description="書籍情報のレスポンスをクライアントがキャッシュする秒数"
+    )
+
+    # エクスポートの設定
+    export_page_size: int = Field(
+        1000, ge=1, le=10000, description="エクスポート時に1回のScanで取得する件数"
+    )
+    export_max_segments: int = Field(
+        16, ge=1, description="エクスポート時に並列にScanするセグメント数の上限"
+    )
+
+    # 流量制御の設定 (上限はプロセスごとに適用される)
+    admission_max_concurrency: int = Field(
+        256, ge=0, description="同時に処理するリクエスト数の上限 (0で無制限)"
+    )
+    admission_route_limits: dict[str, tuple[float, int]] = Field(
+        default_factory=lambda: {
+            "POST /books/batch": (20.0, 40),
+            "POST /books/batch-get": (20.0, 40),
+            "GET /books/export": (1.0, 2),
+        },
+        description="ルート (完全一致) ごとの (1秒あたりのリクエスト数, バースト) "
+        '(JSON、例: {"POST /books/batch": [20, 40]})',
+    )
+    admission_client_rate: float = Field(
+        0.0, ge=0, description="クライアントごとの1秒あたりのリクエスト数 (0で無制限)"
+    )
+    admission_client_burst: int = Field(
+        0, ge=0, description="クライアントごとのバースト (0の場合は1秒分)"
+    )
+
+    # リクエストの計測設定
+    server_timing_enabled: bool = Field(
+        True, description="処理段階ごとの所要時間をServer-Timingヘッダーで返すかどうか"
+    )
+    metrics_namespace: str = Field(
+        "BooksApi", description="EMFで出力するCloudWatchメトリクスの名前空間"
+    )
+    metrics_endpoint_enabled: bool = Field(
+        False,
+        description="コンテナ内部の状況を返す/metricsエンドポイントを公開するかどうか",
+    )
+
+    # コールドスタート対策の設定
+    prime_on_init: bool = Field(
+        False,
+        description="初期化時にAWSクライアントの生成と事前リクエストを行うかどうか"
+        " (プロビジョニング済み同時実行向け)",
+    )
+
+    @field_validator("admission_route_limits", mode="before")
+    @classmethod
+    def parse_json(cls, value: Any) -> Any:
+        """環境変数ではJSON文字列として受け取るため、辞書に変換する"""
+        return json.loads(value) if isinstance(value, str) else value
+
     @classmethod
     def from_env(cls) -> "EnvConfig":
         """環境変数から設定を読み込む"""
         return cls.model_validate(os.environ)
+
+
+@functools.cache
+def get_env() -> EnvConfig:
+    """環境変数から読み込んだ設定を返す (プロセス内で1度だけ読み込む)"""
+    return EnvConfig.from_env()
@@ -7,7 +7,7 @@ class AccessLog(BaseModel):
     """基本的なログ情報を管理するオブジェクトクラス"""
 
     timestamp: str = Field(
-        default=datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        default_factory=lambda: datetime.datetime.now(datetime.UTC).isoformat(),
         description="ログのタイムスタンプ",
     )
     request_id: str = Field(..., description="リクエストID")
@@ -1,4 +1,4 @@
-import tomllib
+import os
 from pathlib import Path
 
 from pydantic import BaseModel, Field
@@ -16,12 +16,38 @@ class ProjectInfo(BaseModel):
     version: str = Field(..., description="プロジェクトのバージョン")
     description: str = Field(..., description="プロジェクトの説明")
 
+    @classmethod
+    def load(cls) -> "ProjectInfo":
+        """プロジェクト情報を読み込む
+
+        デプロイ時に環境変数として埋め込まれていればそれを使用し、
+        ローカル実行時などで存在しない場合のみpyproject.tomlを読み込む。
+        """
+        project_info = cls.from_env()
+        if project_info is None:
+            project_info = cls.from_pyproject()
+        return project_info
+
+    @classmethod
+    def from_env(cls) -> "ProjectInfo | None":
+        """環境変数からプロジェクト情報を読み込む (未設定の場合はNone)"""
+        try:
+            return cls(
+                name=os.environ["PROJECT_NAME"],
+                version=os.environ["PROJECT_SEMANTIC_VERSION"],
+                description=os.environ["PROJECT_DESCRIPTION"],
+            )
+        except KeyError:
+            return None
+
     @classmethod
     def from_pyproject(
         cls,
         path: Path = Path.cwd() / "pyproject.toml",
     ) -> "ProjectInfo":
         """pyproject.tomlからプロジェクト情報を読み込む"""
+        import tomllib
+
         with path.open("rb") as f:
             pyproject = tomllib.load(f)
         project_info = pyproject.get("project", {})
@@ -1,20 +1,194 @@
 import uuid
+from typing import Any, cast
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
 
-from core.s3 import save_log_to_s3
-from db.book import BookModel
-from model.book import Book
+from core.executor import run_io
+from core.export import MEDIA_TYPES, ExportFormat, export_books
+from core.http_cache import http_date, is_not_modified, make_etag
+from core.log_sink import log_sink
+from core.route import TimedRoute
+from core.singleflight import SingleFlight
+from db.book import (
+    BookAlreadyExistsError,
+    BookNotFoundError,
+    batch_get_books,
+    batch_write_books,
+    get_book_item,
+    list_books,
+    query_books,
+    remove_book,
+    save_book,
+    update_book,
+)
+from model.book import (
+    BOOK_FIELDS,
+    BatchGetRequest,
+    BatchGetResponse,
+    BatchWriteRequest,
+    BatchWriteResponse,
+    Book,
+    BookField,
+    BookPage,
+    BookUpdate,
+    PartialBook,
+    PartialBookPage,
+)
+from model.env import get_env
 from model.log import AccessLog
 
-router = APIRouter()
+env = get_env()
+
+router = APIRouter(route_class=TimedRoute)
+
+# 同じ書籍への同時リクエストのDynamoDB呼び出しを1つにまとめる
+book_lookups: SingleFlight[
+    tuple[str, tuple[str, ...] | None], dict[str, Any] | None
+] = SingleFlight()
+
+
+def parse_fields(fields: str | None) -> list[BookField] | None:
+    """カンマ区切りの取得項目を検証してリストに変換する"""
+    if fields is None:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    if not names or any(name not in BOOK_FIELDS for name in names):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid fields: {fields}. Allowed: {', '.join(BOOK_FIELDS)}",
+        )
+    return cast(list[BookField], list(dict.fromkeys(names)))
+
+
+@router.get("", summary="書籍一覧取得")
+async def get_books(
+    limit: int = Query(100, ge=1, le=1000, description="1ページあたりの最大件数"),
+    cursor: str | None = Query(None, description="前のページで返されたカーソル"),
+    segment: int | None = Query(
+        None, ge=0, description="並列Scanで取得するセグメント番号 (管理用)"
+    ),
+    total_segments: int | None = Query(
+        None, ge=1, le=1000, description="並列Scanのセグメントの総数 (管理用)"
+    ),
+) -> BookPage:
+    """書籍の一覧をカーソルページングで取得するエンドポイント"""
+    if (segment is None) != (total_segments is None):
+        raise HTTPException(
+            status_code=400,
+            detail="segment and total_segments must be specified together",
+        )
+    if segment is not None and total_segments is not None and segment >= total_segments:
+        raise HTTPException(
+            status_code=400, detail="segment must be less than total_segments"
+        )
+    try:
+        return await run_io(list_books, limit, cursor, segment, total_segments)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@router.get(
+    "/by-author/{author}",
+    summary="著者別書籍一覧取得",
+    response_model_exclude_unset=True,
+)
+async def get_books_by_author(
+    author: str,
+    limit: int = Query(100, ge=1, le=1000, description="1ページあたりの最大件数"),
+    cursor: str | None = Query(None, description="前のページで返されたカーソル"),
+    fields: str | None = Query(
+        None, description="取得する項目 (カンマ区切り、例: title,publisher)"
+    ),
+) -> PartialBookPage:
+    """著者の書籍をタイトル順に取得するエンドポイント"""
+    try:
+        return await run_io(
+            query_books, "author", author, limit, cursor, parse_fields(fields)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@router.get(
+    "/by-publisher/{publisher}",
+    summary="出版社別書籍一覧取得",
+    response_model_exclude_unset=True,
+)
+async def get_books_by_publisher(
+    publisher: str,
+    limit: int = Query(100, ge=1, le=1000, description="1ページあたりの最大件数"),
+    cursor: str | None = Query(None, description="前のページで返されたカーソル"),
+    fields: str | None = Query(
+        None, description="取得する項目 (カンマ区切り、例: title,author)"
+    ),
+) -> PartialBookPage:
+    """出版社の書籍をタイトル順に取得するエンドポイント"""
+    try:
+        return await run_io(
+            query_books, "publisher", publisher, limit, cursor, parse_fields(fields)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+
+@router.get(
+    "/export",
+    summary="書籍一括エクスポート",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {media_type: {} for media_type in MEDIA_TYPES.values()},
+            "description": "全書籍のNDJSONまたはCSV (順序は保証されない)",
+        }
+    },
+)
+async def export(
+    export_format: ExportFormat = Query(
+        "ndjson", alias="format", description="出力形式"
+    ),
+    segments: int = Query(
+        1, ge=1, description="並列にScanするセグメント数 (大きなテーブル向け)"
+    ),
+) -> StreamingResponse:
+    """全書籍をNDJSONまたはCSVでストリーミングするエンドポイント
+
+    Scanの結果を取得した順に少しずつ書き出すため、テーブルの大きさに関わらず
+    メモリ使用量は一定で、レスポンスの先頭はすぐに返り始める。
+    Lambda (API Gateway) 経由ではレスポンスがまとめて返されサイズの上限もあるため、
+    大きなテーブルの出力には tools.export_books を使用する。
+    """
+    if segments > env.export_max_segments:
+        raise HTTPException(
+            status_code=400,
+            detail=f"segments must be at most {env.export_max_segments}",
+        )
+    log_sink.emit(
+        AccessLog(
+            request_id=str(uuid.uuid4()),
+            event=f"Books exported as {export_format}",
+        )
+    )
+    return StreamingResponse(
+        export_books(export_format, segments, env.export_page_size),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="books.{export_format}"'
+        },
+    )
 
 
 @router.post("", summary="ISBN書籍登録")
 async def create_book(book: Book) -> int:
     """書籍を登録するエンドポイント"""
-    BookModel.from_model(book).save()
-    save_log_to_s3(
+    try:
+        await run_io(save_book, book)
+    except BookAlreadyExistsError as e:
+        raise HTTPException(
+            status_code=409, detail=f"Book {book.isbn} already exists"
+        ) from e
+    log_sink.emit(
         AccessLog(
             request_id=str(uuid.uuid4()),
             event=f"Book with ISBN {book.isbn} created",
@@ -23,29 +197,114 @@ async def create_book(book: Book) -> int:
     return 201
 
 
-@router.get("/{isbn}", summary="書籍情報取得")
-async def get_book(isbn: str) -> Book:
-    """書籍情報を取得するエンドポイント"""
-    book = BookModel.get(isbn)
-    save_log_to_s3(
+@router.post("/batch", summary="書籍一括登録・削除")
+async def batch_write(request: BatchWriteRequest) -> BatchWriteResponse:
+    """書籍の登録・削除をまとめて行うエンドポイント"""
+    results = await run_io(batch_write_books, request.operations)
+    for result in results:
+        if result.status == "succeeded":
+            log_sink.emit(
+                AccessLog(
+                    request_id=str(uuid.uuid4()),
+                    event=(
+                        f"Book with ISBN {result.isbn} "
+                        f"{'created' if result.action == 'put' else 'deleted'}"
+                    ),
+                )
+            )
+    return BatchWriteResponse(results=results)
+
+
+@router.post("/batch-get", summary="書籍情報一括取得")
+async def batch_get(request: BatchGetRequest) -> BatchGetResponse:
+    """複数の書籍情報をまとめて取得するエンドポイント"""
+    results = await run_io(batch_get_books, request.isbns)
+    for isbn in dict.fromkeys(r.isbn for r in results if r.status == "found"):
+        log_sink.emit(
+            AccessLog(
+                request_id=str(uuid.uuid4()),
+                event=f"Book with ISBN {isbn} retrieved",
+            )
+        )
+    return BatchGetResponse(results=results)
+
+
+@router.get(
+    "/{isbn}",
+    summary="書籍情報取得",
+    response_model=PartialBook,
+    response_model_exclude_unset=True,
+    responses={304: {"description": "前回取得時から更新されていない"}},
+)
+async def get_book(
+    isbn: str,
+    fields: str | None = Query(
+        None, description="取得する項目 (カンマ区切り、例: title,author)"
+    ),
+    if_none_match: str | None = Header(None, description="前回取得時のETag"),
+    if_modified_since: str | None = Header(
+        None, description="前回取得時のLast-Modified"
+    ),
+) -> Response:
+    """書籍情報を取得するエンドポイント
+
+    DynamoDBから取得した辞書をレスポンスモデルで再検証せず、
+    そのままJSONにシリアライズして返す。同じ書籍・項目への同時リクエストは
+    1回のDynamoDB呼び出しの結果を共有する。
+    更新日時からETagとLast-Modifiedを生成し、条件付きGETで
+    更新されていない場合は本文を含まない304を返す。
+    """
+    book_fields = parse_fields(fields)
+    key = (isbn, tuple(book_fields) if book_fields is not None else None)
+    item = await book_lookups.do(key, lambda: run_io(get_book_item, isbn, book_fields))
+    if item is None:
+        raise HTTPException(status_code=404, detail=f"Book {isbn} not found")
+    # 同時リクエスト間で共有される結果のため、複製してから加工する
+    item = dict(item)
+    log_sink.emit(
         AccessLog(
             request_id=str(uuid.uuid4()),
             event=f"Book with ISBN {isbn} retrieved",
         )
     )
-    return Book(
-        isbn=book.isbn,
-        title=book.title,
-        author=book.author,
-        publisher=book.publisher,
+
+    updated_at = item.pop("updated_at")
+    headers = {"Cache-Control": f"max-age={env.book_http_max_age_seconds}"}
+    if updated_at is not None:
+        etag = make_etag(isbn, updated_at.isoformat(), ",".join(item))
+        headers["ETag"] = etag
+        headers["Last-Modified"] = http_date(updated_at)
+        if is_not_modified(etag, updated_at, if_none_match, if_modified_since):
+            return Response(status_code=304, headers=headers)
+    return Response(
+        content=to_json(item), media_type="application/json", headers=headers
+    )
+
+
+@router.patch("/{isbn}", summary="書籍情報更新")
+async def patch_book(isbn: str, update: BookUpdate) -> Book:
+    """書籍情報を部分更新するエンドポイント"""
+    try:
+        book = await run_io(update_book, isbn, update)
+    except BookNotFoundError as e:
+        raise HTTPException(status_code=404, detail=f"Book {isbn} not found") from e
+    log_sink.emit(
+        AccessLog(
+            request_id=str(uuid.uuid4()),
+            event=f"Book with ISBN {isbn} updated",
+        )
     )
+    return book
 
 
 @router.delete("/{isbn}", summary="書籍削除")
 async def delete_book(isbn: str) -> int:
     """書籍を削除するエンドポイント"""
-    BookModel.get(isbn).delete()
-    save_log_to_s3(
+    try:
+        await run_io(remove_book, isbn)
+    except BookNotFoundError as e:
+        raise HTTPException(status_code=404, detail=f"Book {isbn} not found") from e
+    log_sink.emit(
         AccessLog(
             request_id=str(uuid.uuid4()),
             event=f"Book with ISBN {isbn} deleted",
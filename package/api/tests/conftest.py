@@ -0,0 +1,113 @@
+import os
+import tempfile
+from collections import Counter
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import pytest
+from botocore.exceptions import ClientError
+
+from bench.fakes import FakeAws
+from bench.run import BENCH_ENV
+
+# アプリケーションのモジュールは読み込み時に環境変数を参照するため、先に設定する
+for key, value in BENCH_ENV.items():
+    os.environ.setdefault(key, value)
+os.environ.setdefault("LOG_SPOOL_DIR", tempfile.mkdtemp(prefix="log-spool-"))
+
+
+@pytest.fixture
+def fake_aws() -> Iterator[FakeAws]:
+    """DynamoDB/S3の呼び出しをメモリ上の代替実装 (bench.fakes) に差し替える"""
+    fake = FakeAws()
+    fake.install()
+    yield fake
+    fake.uninstall()
+
+
+@pytest.fixture
+def no_backoff(monkeypatch: pytest.MonkeyPatch) -> None:
+    """失敗・未処理の項目の再送を待たずに行う"""
+    # 環境変数を設定してから読み込むため、ここでインポートする
+    import db.book
+
+    monkeypatch.setattr(db.book, "backoff_seconds", lambda attempt: 0.0)
+
+
+def _write_request_isbn(request: dict[str, Any]) -> str:
+    """BatchWriteItemの1件分のリクエストからISBNを取り出す"""
+    if "PutRequest" in request:
+        return request["PutRequest"]["Item"]["isbn"]["S"]
+    return request["DeleteRequest"]["Key"]["isbn"]["S"]
+
+
+@pytest.fixture
+def fail_writes(fake_aws: FakeAws) -> Callable[..., None]:
+    """BatchWriteItemを指定したエラーコードで指定した回数だけ失敗させる
+
+    isbnを指定した場合は、そのISBNを含むリクエストのみを失敗させる。
+    """
+    original = fake_aws._dynamodb_BatchWriteItem
+
+    def _fail_writes(code: str, times: int, isbn: str | None = None) -> None:
+        remaining = [times]
+
+        def batch_write_item(params: dict[str, Any]) -> dict[str, Any]:
+            isbns = {
+                _write_request_isbn(request)
+                for requests in params["RequestItems"].values()
+                for request in requests
+            }
+            if remaining[0] > 0 and (isbn is None or isbn in isbns):
+                remaining[0] -= 1
+                raise ClientError({"Error": {"Code": code}}, "BatchWriteItem")
+            return original(params)
+
+        fake_aws._dynamodb_BatchWriteItem = batch_write_item
+
+    return _fail_writes
+
+
+@pytest.fixture
+def unprocess_writes(fake_aws: FakeAws) -> Callable[[dict[str, int]], None]:
+    """指定したISBNへの書き込みを、指定した回数だけ未処理として返すようにする"""
+    original = fake_aws._dynamodb_BatchWriteItem
+
+    def _unprocess_writes(times: dict[str, int]) -> None:
+        remaining = Counter(times)
+
+        def batch_write_item(params: dict[str, Any]) -> dict[str, Any]:
+            processed: dict[str, list] = {}
+            unprocessed: dict[str, list] = {}
+            for table, requests in params["RequestItems"].items():
+                for request in requests:
+                    isbn = _write_request_isbn(request)
+                    if remaining[isbn] > 0:
+                        remaining[isbn] -= 1
+                        unprocessed.setdefault(table, []).append(request)
+                    else:
+                        processed.setdefault(table, []).append(request)
+            original({**params, "RequestItems": processed})
+            return {"UnprocessedItems": unprocessed}
+
+        fake_aws._dynamodb_BatchWriteItem = batch_write_item
+
+    return _unprocess_writes
+
+
+class Clock:
+    """time.monotonicの代わりに任意に進められる時計"""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    """time.monotonicをテストから進められる時計に差し替える"""
+    clock = Clock()
+    monkeypatch.setattr("time.monotonic", clock)
+    return clock
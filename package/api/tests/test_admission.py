@@ -0,0 +1,82 @@
+import pytest
+
+from core.admission import AdmissionController, TokenBucket
+
+
+def test_token_bucket_refills_at_rate(clock):
+    bucket = TokenBucket(rate=2.0, burst=3)
+
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_acquire() == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == pytest.approx(0.5)
+
+
+def test_token_bucket_does_not_exceed_burst(clock):
+    bucket = TokenBucket(rate=1.0, burst=2)
+
+    clock.now += 60
+    assert [bucket.try_acquire() for _ in range(2)] == [0.0, 0.0]
+    assert bucket.try_acquire() == pytest.approx(1.0)
+
+
+def test_route_limit_rejects_until_refilled(clock):
+    admission = AdmissionController(route_limits={"GET /books/export": (1.0, 1)})
+
+    assert admission.try_admit("GET", "/books/export", None) == 0.0
+    assert admission.try_admit("GET", "/books/export", None) == pytest.approx(1.0)
+    assert admission.try_admit("GET", "/books/a", None) == 0.0
+
+    clock.now += 1
+    assert admission.try_admit("GET", "/books/export", None) == 0.0
+    assert admission.stats()["rejected"] == {"concurrency": 0, "route": 1, "client": 0}
+
+
+def test_client_limit_and_concurrency(clock):
+    admission = AdmissionController(max_concurrency=3, client_rate=1.0)
+
+    assert admission.try_admit("GET", "/books/a", "client-1") == 0.0
+    assert admission.try_admit("GET", "/books/a", "client-1") == pytest.approx(1.0)
+    assert admission.try_admit("GET", "/books/a", "client-2") == 0.0
+    assert admission.try_admit("GET", "/books/a", None) == 0.0
+    assert admission.try_admit("GET", "/books/a", None) == 1.0
+
+    admission.release()
+    assert admission.try_admit("GET", "/books/a", None) == 0.0
+    assert admission.stats()["rejected"] == {
+        "concurrency": 1,
+        "route": 0,
+        "client": 1,
+    }
+
+
+def test_route_limits_match_exact_routes(clock):
+    admission = AdmissionController(
+        route_limits={"POST /books/batch": (1.0, 1), "POST /books/batch-get": (1.0, 1)}
+    )
+
+    assert admission.try_admit("POST", "/books/batch", None) == 0.0
+    assert admission.try_admit("POST", "/books/batch-get", None) == 0.0
+    assert admission.try_admit("POST", "/books/batch", None) > 0
+    assert admission.try_admit("POST", "/books/batch-get", None) > 0
+    assert admission.try_admit("POST", "/books/batch-other", None) == 0.0
+
+
+def test_rejection_does_not_consume_the_other_bucket(clock):
+    admission = AdmissionController(
+        route_limits={"GET /books/export": (1.0, 1)}, client_rate=1.0
+    )
+
+    # ルートの上限で拒否されたリクエストは、クライアントのトークンを消費しない
+    assert admission.try_admit("GET", "/books/export", "client-1") == 0.0
+    assert admission.try_admit("GET", "/books/export", "client-2") > 0
+    assert admission.try_admit("GET", "/books/a", "client-2") == 0.0
+
+    # クライアントの上限で拒否されたリクエストは、ルートのトークンを消費しない
+    clock.now += 1
+    assert admission.try_admit("GET", "/books/a", "client-2") == 0.0
+    assert admission.try_admit("GET", "/books/export", "client-2") > 0
+    assert admission.try_admit("GET", "/books/export", "client-3") == 0.0
+    assert admission.stats()["rejected"] == {"concurrency": 0, "route": 1, "client": 1}
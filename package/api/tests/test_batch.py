@@ -0,0 +1,178 @@
+from collections import Counter
+from typing import Any
+
+import pytest
+
+import db.book
+import main
+from bench.events import LambdaContext, proxy_event
+from bench.fakes import FakeAws
+from model.book import Book, BookWriteOperation
+
+TABLE_NAME = db.book.env.books_table_name
+
+pytestmark = pytest.mark.usefixtures("no_backoff")
+
+
+def book(isbn: str, title: str = "書籍") -> Book:
+    return Book(isbn=isbn, title=title, author="Author")
+
+
+def put(isbn: str, title: str = "書籍") -> BookWriteOperation:
+    return BookWriteOperation(put=book(isbn, title))
+
+
+def delete(isbn: str) -> BookWriteOperation:
+    return BookWriteOperation(delete=isbn)
+
+
+def unprocess_gets(fake: FakeAws, times: dict[str, int]) -> None:
+    """指定したISBNの取得を、指定した回数だけ未処理として返すようにする"""
+    original = fake._dynamodb_BatchGetItem
+    remaining = Counter(times)
+
+    def batch_get_item(params: dict[str, Any]) -> dict[str, Any]:
+        request = params["RequestItems"][TABLE_NAME]
+        processed, unprocessed = [], []
+        for key in request["Keys"]:
+            if remaining[key["isbn"]["S"]] > 0:
+                remaining[key["isbn"]["S"]] -= 1
+                unprocessed.append(key)
+            else:
+                processed.append(key)
+        data = original({"RequestItems": {TABLE_NAME: {**request, "Keys": processed}}})
+        if unprocessed:
+            data["UnprocessedKeys"] = {TABLE_NAME: {**request, "Keys": unprocessed}}
+        return data
+
+    fake._dynamodb_BatchGetItem = batch_get_item
+
+
+def stored_titles(fake: FakeAws) -> dict[str, str]:
+    return {isbn: item["title"]["S"] for isbn, item in fake.tables[TABLE_NAME].items()}
+
+
+def test_batch_write_splits_into_chunks_of_25(fake_aws):
+    operations = [put(f"isbn-{i:03d}") for i in range(60)]
+
+    results = db.book.batch_write_books(operations)
+
+    assert fake_aws.calls["dynamodb:BatchWriteItem"] == 3
+    assert [r.status for r in results] == ["succeeded"] * 60
+    assert len(fake_aws.tables[TABLE_NAME]) == 60
+
+
+def test_batch_write_keeps_last_operation_per_isbn(fake_aws):
+    db.book.batch_write_books([put("c", "旧タイトル")])
+
+    results = db.book.batch_write_books(
+        [put("a", "1回目"), put("b"), put("a", "2回目"), put("c", "新"), delete("c")]
+    )
+
+    assert [(r.isbn, r.action, r.status) for r in results] == [
+        ("a", "put", "superseded"),
+        ("b", "put", "succeeded"),
+        ("a", "put", "succeeded"),
+        ("c", "put", "superseded"),
+        ("c", "delete", "succeeded"),
+    ]
+    assert stored_titles(fake_aws) == {"a": "2回目", "b": "書籍"}
+
+
+def test_batch_write_retries_unprocessed_items(fake_aws, unprocess_writes):
+    unprocess_writes({"b": 2})
+
+    results = db.book.batch_write_books([put("a"), put("b"), delete("c")])
+
+    assert fake_aws.calls["dynamodb:BatchWriteItem"] == 3
+    assert [r.status for r in results] == ["succeeded"] * 3
+    assert set(stored_titles(fake_aws)) == {"a", "b"}
+
+
+def test_batch_write_fails_items_unprocessed_after_max_retries(
+    fake_aws, unprocess_writes
+):
+    unprocess_writes({"b": 1000})
+
+    results = db.book.batch_write_books([put("a"), put("b")])
+
+    retries = db.book.env.batch_max_retries
+    assert fake_aws.calls["dynamodb:BatchWriteItem"] == retries + 1
+    assert [(r.status, r.error) for r in results] == [
+        ("succeeded", None),
+        ("failed", "Unprocessed after max retries"),
+    ]
+    assert set(stored_titles(fake_aws)) == {"a"}
+
+
+def test_batch_get_splits_into_chunks_of_100(fake_aws):
+    isbns = [f"isbn-{i:03d}" for i in range(250)]
+    db.book.batch_write_books([put(isbn) for isbn in isbns])
+    fake_aws.calls.clear()
+
+    results = db.book.batch_get_books(isbns + isbns[:10])
+
+    assert fake_aws.calls["dynamodb:BatchGetItem"] == 3
+    assert [r.isbn for r in results] == isbns + isbns[:10]
+    assert {r.status for r in results} == {"found"}
+
+
+def test_batch_get_returns_results_in_request_order(fake_aws):
+    db.book.batch_write_books([put("a", "A"), put("c", "C")])
+
+    results = db.book.batch_get_books(["c", "missing", "a", "c"])
+
+    assert [(r.isbn, r.status) for r in results] == [
+        ("c", "found"),
+        ("missing", "not_found"),
+        ("a", "found"),
+        ("c", "found"),
+    ]
+    assert [r.book.title if r.book else None for r in results] == [
+        "C",
+        None,
+        "A",
+        "C",
+    ]
+
+
+def test_batch_get_retries_unprocessed_keys(fake_aws):
+    db.book.batch_write_books([put("a"), put("b")])
+    fake_aws.calls.clear()
+    unprocess_gets(fake_aws, {"b": 2})
+
+    results = db.book.batch_get_books(["a", "b", "missing"])
+
+    assert fake_aws.calls["dynamodb:BatchGetItem"] == 3
+    assert [r.status for r in results] == ["found", "found", "not_found"]
+
+
+def test_batch_get_fails_keys_unprocessed_after_max_retries(fake_aws):
+    db.book.batch_write_books([put("a"), put("b")])
+    fake_aws.calls.clear()
+    unprocess_gets(fake_aws, {"b": 1000})
+
+    results = db.book.batch_get_books(["a", "b"])
+
+    retries = db.book.env.batch_max_retries
+    assert fake_aws.calls["dynamodb:BatchGetItem"] == retries + 1
+    assert [(r.status, r.error) for r in results] == [
+        ("found", None),
+        ("failed", "Unprocessed after max retries"),
+    ]
+
+
+def test_batch_endpoints_report_dynamodb_timing(fake_aws):
+    requests = [
+        ("/books/batch", {"operations": [{"put": book("a").model_dump()}]}),
+        ("/books/batch-get", {"isbns": ["a"]}),
+    ]
+    for path, body in requests:
+        response = main.handler(proxy_event("POST", path, body), LambdaContext())
+
+        assert response["statusCode"] == 200
+        phases = [
+            metric.split(";")[0]
+            for metric in response["headers"]["server-timing"].split(", ")
+        ]
+        assert "dynamodb" in phases
@@ -0,0 +1,86 @@
+import datetime
+import json
+
+import db.book
+import main
+from bench.events import LambdaContext, proxy_event
+
+TABLE_NAME = db.book.env.books_table_name
+BOOK = {"isbn": "a", "title": "書籍", "author": "Author", "publisher": "Publisher"}
+
+
+def invoke(method: str, path: str, body: dict | None = None, **kwargs) -> dict:
+    response = main.handler(proxy_event(method, path, body, **kwargs), LambdaContext())
+    if response["body"]:
+        response["json"] = json.loads(response["body"])
+    return response
+
+
+def test_create_rejects_duplicate_isbn(fake_aws):
+    assert invoke("POST", "/books", BOOK)["statusCode"] == 200
+
+    response = invoke("POST", "/books", {**BOOK, "title": "別の書籍"})
+
+    assert response["statusCode"] == 409
+    assert fake_aws.tables[TABLE_NAME]["a"]["title"] == {"S": "書籍"}
+
+
+def test_update_and_delete_missing_book_return_404(fake_aws):
+    patch = invoke("PATCH", "/books/missing", {"title": "新しいタイトル"})
+    delete = invoke("DELETE", "/books/missing")
+
+    assert (patch["statusCode"], delete["statusCode"]) == (404, 404)
+    # 条件付き書き込みのため、存在しない項目は作成されない
+    assert fake_aws.tables[TABLE_NAME] == {}
+
+
+def test_delete_removes_book(fake_aws):
+    invoke("POST", "/books", BOOK)
+
+    assert invoke("DELETE", "/books/a")["statusCode"] == 200
+    assert invoke("GET", "/books/a")["statusCode"] == 404
+    assert invoke("DELETE", "/books/a")["statusCode"] == 404
+
+
+def test_patch_with_null_publisher_removes_the_attribute(fake_aws):
+    invoke("POST", "/books", BOOK)
+
+    response = invoke(
+        "PATCH", "/books/a", {"title": "新しいタイトル", "publisher": None}
+    )
+
+    assert response["statusCode"] == 200
+    assert response["json"] == {
+        "isbn": "a",
+        "title": "新しいタイトル",
+        "author": "Author",
+        "publisher": None,
+    }
+    assert "publisher" not in fake_aws.tables[TABLE_NAME]["a"]
+    assert invoke("GET", "/books/a")["json"]["publisher"] is None
+
+
+def test_patch_bumps_updated_at(fake_aws, monkeypatch):
+    invoke("POST", "/books", BOOK)
+    item = fake_aws.tables[TABLE_NAME]["a"]
+    created_at, updated_at = item["created_at"], item["updated_at"]
+    before = invoke("GET", "/books/a")["headers"]
+
+    later = datetime.datetime(2100, 1, 1, tzinfo=datetime.UTC)
+    monkeypatch.setattr(db.book, "_now", lambda: later)
+    assert invoke("PATCH", "/books/a", {"author": "Other"})["statusCode"] == 200
+
+    item = fake_aws.tables[TABLE_NAME]["a"]
+    assert item["created_at"] == created_at
+    assert item["updated_at"] != updated_at
+    assert db.book.BookModel.updated_at.deserialize(item["updated_at"]["S"]) == later
+    after = invoke("GET", "/books/a")["headers"]
+    assert after["last-modified"] == "Fri, 01 Jan 2100 00:00:00 GMT"
+    assert after["etag"] != before["etag"]
+
+
+def test_patch_rejects_null_required_fields(fake_aws):
+    invoke("POST", "/books", BOOK)
+
+    assert invoke("PATCH", "/books/a", {"title": None})["statusCode"] == 422
+    assert invoke("PATCH", "/books/a", {})["statusCode"] == 422
@@ -0,0 +1,98 @@
+import db.book
+from core.cache import TTLCache
+from model.book import Book, BookUpdate
+
+
+def test_value_expires_after_ttl(clock):
+    cache = TTLCache[str, str](max_size=10, ttl_seconds=30, negative_ttl_seconds=5)
+    cache.set("a", "A")
+
+    clock.now += 29.9
+    assert cache.lookup("a") == (True, "A")
+    clock.now += 0.1
+    assert cache.lookup("a") == (False, None)
+    assert cache.stats()["size"] == 0
+
+
+def test_negative_entry_uses_negative_ttl(clock):
+    cache = TTLCache[str, str](max_size=10, ttl_seconds=30, negative_ttl_seconds=5)
+    cache.set("missing", None)
+
+    assert cache.lookup("missing") == (True, None)
+    clock.now += 5
+    assert cache.lookup("missing") == (False, None)
+    assert cache.stats() == {
+        "size": 0,
+        "hits": 0,
+        "negative_hits": 1,
+        "misses": 1,
+        "evictions": 0,
+    }
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = TTLCache[str, str](max_size=2, ttl_seconds=30, negative_ttl_seconds=5)
+    cache.set("a", "A")
+    cache.set("b", "B")
+
+    # 参照したaは新しくなり、次の追加ではbが破棄される
+    assert cache.lookup("a") == (True, "A")
+    cache.set("c", "C")
+
+    assert cache.lookup("b") == (False, None)
+    assert cache.lookup("a") == (True, "A")
+    assert cache.lookup("c") == (True, "C")
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_and_disabled_cache(clock):
+    cache = TTLCache[str, str](max_size=10, ttl_seconds=30, negative_ttl_seconds=5)
+    cache.set("a", "A")
+    cache.invalidate("a")
+    assert cache.lookup("a") == (False, None)
+
+    disabled = TTLCache[str, str](max_size=0, ttl_seconds=30, negative_ttl_seconds=5)
+    disabled.set("a", "A")
+    assert disabled.lookup("a") == (False, None)
+
+
+def test_set_is_skipped_when_invalidated_after_the_fetch_started(clock):
+    cache = TTLCache[str, str](max_size=10, ttl_seconds=30, negative_ttl_seconds=5)
+    generation = cache.generation("a")
+    cache.invalidate("a")
+
+    cache.set("a", "古い値", generation)
+    assert cache.lookup("a") == (False, None)
+
+    cache.set("a", "新しい値", cache.generation("a"))
+    assert cache.lookup("a") == (True, "新しい値")
+
+
+def test_forgotten_generations_do_not_match_older_reads(clock):
+    cache = TTLCache[str, str](max_size=1, ttl_seconds=30, negative_ttl_seconds=5)
+    generation = cache.generation("a")
+    cache.invalidate("a")
+    # 上限を超えてaの世代を忘れても、取得前に読んだ世代とは一致しない
+    cache.invalidate("b")
+
+    cache.set("a", "古い値", generation)
+    assert cache.lookup("a") == (False, None)
+
+
+def test_read_through_does_not_overwrite_a_concurrent_update(fake_aws, monkeypatch):
+    db.book.book_cache.clear()
+    db.book.save_book(Book(isbn="a", title="旧タイトル", author="Author"))
+    get_item = db.book._get_item
+
+    def get_item_racing_update(isbn, fields):
+        # 取得した直後、キャッシュに格納する前に別のリクエストが更新する
+        item = get_item(isbn, fields)
+        db.book.update_book(isbn, BookUpdate(title="新タイトル"))
+        return item
+
+    monkeypatch.setattr(db.book, "_get_item", get_item_racing_update)
+    assert db.book.get_book_item("a")["title"] == "旧タイトル"
+    monkeypatch.setattr(db.book, "_get_item", get_item)
+
+    assert db.book.get_book_item("a")["title"] == "新タイトル"
+    assert fake_aws.calls["dynamodb:GetItem"] == 2
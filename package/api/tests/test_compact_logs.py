@@ -0,0 +1,82 @@
+import datetime
+import gzip
+import json
+
+import pytest
+
+from tools.compact_logs import MANIFEST_NAME, LogCompactor, create_client
+
+HOUR = datetime.datetime(2025, 1, 1, 9, tzinfo=datetime.UTC)
+PARTITION = "compacted/dt=2025-01-01/hour=09/"
+
+
+def put_log(fake_aws, key: str, *events: str) -> None:
+    """ログシンクと同じ形式 (gzip圧縮したNDJSON) でログオブジェクトを置く"""
+    body = b"".join(
+        json.dumps({"request_id": "r", "event": event}).encode() + b"\n"
+        for event in events
+    )
+    fake_aws.objects[key] = {
+        "Key": key,
+        "Body": gzip.compress(body),
+        "ContentEncoding": "gzip",
+    }
+
+
+def partition_events(fake_aws) -> list[str]:
+    events = []
+    for key, item in sorted(fake_aws.objects.items()):
+        if key.startswith(PARTITION) and key.endswith(".ndjson.gz"):
+            lines = gzip.decompress(item["Body"]).splitlines()
+            events.extend(json.loads(line)["event"] for line in lines)
+    return sorted(events)
+
+
+@pytest.fixture
+def compactor():
+    with LogCompactor(create_client(4), "bucket", max_workers=4) as compactor:
+        yield compactor
+
+
+def compact_hour(compactor):
+    (result,) = compactor.compact(HOUR, HOUR + datetime.timedelta(hours=1))
+    return result
+
+
+def test_recompacting_an_hour_adds_only_late_objects(fake_aws, compactor):
+    put_log(fake_aws, "logs/2025/01/01/090500_a.ndjson.gz", "1", "2")
+    put_log(fake_aws, "logs/2025/01/01/093000_b.ndjson.gz", "3")
+    put_log(fake_aws, "logs/2025/01/01/100000_c.ndjson.gz", "next hour")
+
+    first = compact_hour(compactor)
+    assert (first.source_objects, first.records) == (2, 3)
+
+    # 退避からの再送などで、同じ時間のログが遅れて書き出された
+    put_log(fake_aws, "logs/2025/01/01/095959_d.ndjson.gz", "4", "5")
+    second = compact_hour(compactor)
+
+    assert (second.source_objects, second.skipped_objects, second.records) == (1, 2, 2)
+    assert partition_events(fake_aws) == ["1", "2", "3", "4", "5"]
+    manifest = fake_aws.objects[PARTITION + MANIFEST_NAME]["Body"].decode()
+    assert manifest.splitlines() == [
+        "logs/2025/01/01/090500_a.ndjson.gz",
+        "logs/2025/01/01/093000_b.ndjson.gz",
+        "logs/2025/01/01/095959_d.ndjson.gz",
+    ]
+
+    third = compact_hour(compactor)
+    assert (third.records, third.output_keys) == (0, [])
+    assert partition_events(fake_aws) == ["1", "2", "3", "4", "5"]
+
+
+def test_delete_source_keeps_earlier_parts(fake_aws, compactor):
+    put_log(fake_aws, "logs/2025/01/01/090500_a.ndjson.gz", "1", "2")
+    compactor.delete_source = True
+
+    assert compact_hour(compactor).deleted_objects == 1
+    put_log(fake_aws, "logs/2025/01/01/095959_b.ndjson.gz", "3")
+    result = compact_hour(compactor)
+
+    assert (result.records, result.deleted_objects) == (1, 1)
+    assert partition_events(fake_aws) == ["1", "2", "3"]
+    assert not any(key.startswith("logs/2025/01/01/09") for key in fake_aws.objects)
@@ -0,0 +1,84 @@
+import gzip
+import io
+import sys
+
+import pytest
+
+from core.compression import (
+    codec_of,
+    compress,
+    is_available,
+    iter_lines,
+    open_decompressed,
+    resolve_codec,
+)
+
+BODY = b'{"event": "a"}\n\n{"event": "b"}\n{"event": "c"}'
+
+
+@pytest.fixture
+def without_zstandard(monkeypatch):
+    """zstandardがインストールされていない環境を再現する"""
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+
+
+@pytest.mark.parametrize("codec", ["none", "gzip"])
+def test_round_trip(codec):
+    compressed = compress(BODY, codec)
+
+    stream = open_decompressed(io.BytesIO(compressed), codec)
+
+    assert stream.read() == BODY
+
+
+def test_zstd_round_trip():
+    pytest.importorskip("zstandard")
+    compressed = compress(BODY, "zstd")
+
+    stream = open_decompressed(io.BytesIO(compressed), "zstd")
+
+    assert compressed != BODY
+    assert stream.read() == BODY
+
+
+def test_gzip_output_is_deterministic():
+    assert compress(BODY, "gzip") == compress(BODY, "gzip")
+    assert gzip.decompress(compress(BODY, "gzip", level=1)) == BODY
+
+
+def test_zstd_falls_back_to_gzip_without_zstandard(without_zstandard, caplog):
+    assert not is_available("zstd")
+    assert is_available("gzip")
+    assert resolve_codec("zstd") == "gzip"
+    assert "falling back to gzip" in caplog.text
+    with pytest.raises(RuntimeError, match="zstandard"):
+        compress(BODY, "zstd")
+
+
+@pytest.mark.parametrize(
+    ("key", "content_encoding", "expected"),
+    [
+        ("logs/2025/01/01/090500_a.ndjson", None, "none"),
+        ("logs/2025/01/01/090500_a.ndjson.gz", None, "gzip"),
+        ("logs/2025/01/01/090500_a.ndjson.zst", None, "zstd"),
+        # Content-Encodingは拡張子より優先する
+        ("logs/2025/01/01/090500_a.ndjson", "gzip", "gzip"),
+        ("logs/2025/01/01/090500_a.ndjson.gz", "zstd", "zstd"),
+        ("logs/2025/01/01/090500_a.ndjson.gz", "identity", "gzip"),
+    ],
+)
+def test_codec_of(key, content_encoding, expected):
+    assert codec_of(key, content_encoding) == expected
+
+
+@pytest.mark.parametrize("read_bytes", [1, 4, 1024])
+def test_iter_lines_skips_blank_lines_across_reads(read_bytes):
+    lines = list(iter_lines(io.BytesIO(BODY), read_bytes=read_bytes))
+
+    assert lines == [b'{"event": "a"}', b'{"event": "b"}', b'{"event": "c"}']
+
+
+def test_iter_lines_reads_a_decompressed_stream():
+    stream = open_decompressed(io.BytesIO(compress(BODY + b"\n", "gzip")), "gzip")
+
+    assert len(list(iter_lines(stream, read_bytes=8))) == 3
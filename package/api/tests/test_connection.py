@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+
+from core.aws import get_dynamodb_client
+from db.book import BookModel
+from db.connection import SharedClientConnection
+
+
+def test_model_uses_shared_client(fake_aws):
+    connection = BookModel._get_connection().connection
+
+    assert isinstance(connection, SharedClientConnection)
+    assert connection.client is get_dynamodb_client()
+
+    BookModel(isbn="shared-0001", title="title", author="author").save()
+    assert BookModel.get("shared-0001").title == "title"
+    assert fake_aws.calls["dynamodb:PutItem"] == 1
+    assert fake_aws.calls["dynamodb:GetItem"] == 1
+
+
+def test_client_without_credentials_is_recreated():
+    connection = BookModel._get_connection().connection
+    client = connection.client
+    client._request_signer._credentials = None
+
+    assert get_dynamodb_client() is not client
+    assert connection.client is get_dynamodb_client()
+
+
+def test_before_send_hook_is_registered_on_shared_client():
+    connection = SharedClientConnection(extra_headers={"x-test": "1"})
+    request = SimpleNamespace(headers={})
+
+    connection.client.meta.events.emit("before-send.dynamodb.GetItem", request=request)
+
+    assert request.headers == {"x-test": "1"}
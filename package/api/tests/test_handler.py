@@ -0,0 +1,50 @@
+import csv
+import io
+import json
+
+import main
+from bench.events import LambdaContext, proxy_event
+
+
+def book(i: int) -> dict[str, str]:
+    return {
+        "isbn": f"export-{i:04d}",
+        "title": f"書籍 {i}",
+        "author": f"Author {i}",
+        "publisher": f"Publisher {i}",
+    }
+
+
+def invoke(event: dict) -> dict:
+    return main.handler(event, LambdaContext())
+
+
+def test_export_ndjson_is_returned_as_text(fake_aws):
+    for i in range(3):
+        assert invoke(proxy_event("POST", "/books", book(i)))["statusCode"] == 200
+
+    response = invoke(proxy_event("GET", "/books/export", query={"format": "ndjson"}))
+
+    assert response["statusCode"] == 200
+    assert response["isBase64Encoded"] is False
+    assert response["headers"]["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response["body"].splitlines()]
+    assert sorted(rows, key=lambda row: row["isbn"]) == [book(i) for i in range(3)]
+
+
+def test_export_csv_is_returned_as_text(fake_aws):
+    for i in range(2):
+        assert invoke(proxy_event("POST", "/books", book(i)))["statusCode"] == 200
+
+    response = invoke(proxy_event("GET", "/books/export", query={"format": "csv"}))
+
+    assert response["statusCode"] == 200
+    assert response["isBase64Encoded"] is False
+    rows = list(csv.DictReader(io.StringIO(response["body"])))
+    assert sorted(rows, key=lambda row: row["isbn"]) == [book(i) for i in range(2)]
+
+
+def test_metrics_endpoint_is_not_exposed_by_default(fake_aws):
+    response = invoke(proxy_event("GET", "/metrics"))
+
+    assert response["statusCode"] == 404
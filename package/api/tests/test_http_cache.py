@@ -0,0 +1,35 @@
+import datetime
+
+from core.http_cache import http_date, is_not_modified, make_etag
+
+ETAG = make_etag("2025-01-01T00:00:00+00:00", "isbn,title")
+LAST_MODIFIED = datetime.datetime(2025, 1, 1, 9, 30, 15, 500000, tzinfo=datetime.UTC)
+SINCE = http_date(LAST_MODIFIED)
+BEFORE = http_date(LAST_MODIFIED - datetime.timedelta(seconds=1))
+
+
+def test_etag_depends_on_every_part():
+    assert make_etag("a", "b") == make_etag("a", "b")
+    assert make_etag("a", "b") != make_etag("a,b")
+    assert ETAG.startswith('"') and ETAG.endswith('"')
+
+
+def test_if_none_match_uses_weak_comparison():
+    assert is_not_modified(ETAG, LAST_MODIFIED, ETAG, None)
+    assert is_not_modified(ETAG, LAST_MODIFIED, f'"other", W/{ETAG}', None)
+    assert is_not_modified(ETAG, LAST_MODIFIED, "*", None)
+    assert not is_not_modified(ETAG, LAST_MODIFIED, '"other"', None)
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    # If-None-Matchが一致しなければ、If-Modified-Sinceが満たされていても更新ありとする
+    assert not is_not_modified(ETAG, LAST_MODIFIED, '"other"', SINCE)
+    # If-None-Matchが一致すれば、If-Modified-Sinceが古くても更新なしとする
+    assert is_not_modified(ETAG, LAST_MODIFIED, ETAG, BEFORE)
+
+
+def test_if_modified_since_compares_whole_seconds():
+    assert is_not_modified(ETAG, LAST_MODIFIED, None, SINCE)
+    assert not is_not_modified(ETAG, LAST_MODIFIED, None, BEFORE)
+    assert not is_not_modified(ETAG, LAST_MODIFIED, None, "not a date")
+    assert not is_not_modified(ETAG, LAST_MODIFIED, None, None)
@@ -0,0 +1,20 @@
+import os
+
+from tools.import_time import measure_import_time
+
+# コールドスタート時のインポート時間の上限 (実行環境に応じて環境変数で調整する)
+IMPORT_TIME_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "1200"))
+
+
+def test_import_time():
+    report = measure_import_time("main")
+
+    assert report.total_ms <= IMPORT_TIME_BUDGET_MS, report.format(top=20)
+
+
+def test_import_does_not_load_boto3():
+    # AWSクライアントは初回利用時に生成し、インポート時には生成しない
+    report = measure_import_time("main")
+    modules = {entry.module for entry in report.entries}
+
+    assert "boto3" not in modules
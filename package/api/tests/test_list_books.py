@@ -0,0 +1,68 @@
+import base64
+import json
+
+import pytest
+
+import db.book
+import main
+from bench.events import LambdaContext, proxy_event
+from model.book import Book
+
+
+def invoke(query: dict[str, str]) -> tuple[int, dict]:
+    response = main.handler(proxy_event("GET", "/books", query=query), LambdaContext())
+    return response["statusCode"], json.loads(response["body"])
+
+
+def cursor_of(value: object) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+
+def test_cursor_round_trip():
+    key = {"isbn": {"S": "9784000000000"}, "author": {"S": "著者"}}
+
+    cursor = db.book.encode_cursor(key)
+
+    assert db.book.decode_cursor(cursor, ["isbn", "author"]) == key
+    assert db.book.encode_cursor(None) is None
+    assert db.book.decode_cursor(None, ["isbn"]) is None
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-a-cursor",
+        "あ",
+        cursor_of(["isbn"]),
+        cursor_of({"isbn": "9784000000000"}),
+        cursor_of({"isbn": {"N": "1"}}),
+        cursor_of({"isbn": {"S": "1"}, "title": {"S": "A"}}),
+        cursor_of({"title": {"S": "A"}}),
+    ],
+)
+def test_invalid_or_tampered_cursor_is_rejected(fake_aws, cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        db.book.decode_cursor(cursor, ["isbn"])
+
+    status, body = invoke({"cursor": cursor})
+    assert status == 400
+    assert body == {"detail": "Invalid cursor"}
+    assert fake_aws.calls["dynamodb:Scan"] == 0
+
+
+def test_list_books_paginates_with_cursor(fake_aws):
+    isbns = [f"isbn-{i}" for i in range(5)]
+    for isbn in isbns:
+        db.book.save_book(Book(isbn=isbn, title="書籍", author="Author"))
+
+    listed, query = [], {"limit": "2"}
+    while True:
+        status, body = invoke(query)
+        assert status == 200
+        listed.extend(item["isbn"] for item in body["items"])
+        if body["next_cursor"] is None:
+            break
+        query = {"limit": "2", "cursor": body["next_cursor"]}
+
+    assert listed == isbns
+    assert fake_aws.calls["dynamodb:Scan"] == 3
@@ -0,0 +1,62 @@
+import io
+import json
+
+import pytest
+
+import db.book
+from tools.load_books import BookLoader, Checkpoint, Record
+
+TABLE_NAME = db.book.env.books_table_name
+
+pytestmark = pytest.mark.usefixtures("no_backoff")
+
+
+def records(count: int, start: int = 1) -> list[Record]:
+    return [
+        (line, {"isbn": f"isbn-{line:03d}", "title": "書籍", "author": "A"}, line * 10)
+        for line in range(start, start + count)
+    ]
+
+
+@pytest.fixture
+def loader(tmp_path) -> BookLoader:
+    return BookLoader(
+        Checkpoint(source="catalog.ndjson", format="ndjson"),
+        tmp_path / "checkpoint.json",
+        io.StringIO(),
+        workers=4,
+        max_retries=3,
+        progress_seconds=3600,
+    )
+
+
+def test_throttled_writes_are_retried_and_shrink_the_window(
+    fake_aws, loader, fail_writes
+):
+    fail_writes("ProvisionedThroughputExceededException", times=2)
+
+    loader.run([records(5)])
+
+    assert fake_aws.calls["dynamodb:BatchWriteItem"] == 3
+    assert len(fake_aws.tables[TABLE_NAME]) == 5
+    assert loader.checkpoint.loaded == 5
+    assert loader.checkpoint.rejected == 0
+    assert loader.window.limit < loader.window.max_size
+
+
+def test_non_retryable_failures_are_rejected(fake_aws, loader, fail_writes):
+    fail_writes("ValidationException", times=1, isbn="isbn-003")
+
+    loader.run([records(3), records(2, start=4)])
+
+    assert fake_aws.calls["dynamodb:BatchWriteItem"] == 2
+    assert sorted(fake_aws.tables[TABLE_NAME]) == ["isbn-004", "isbn-005"]
+    assert loader.checkpoint.model_dump(include={"line", "loaded", "rejected"}) == {
+        "line": 5,
+        "loaded": 2,
+        "rejected": 3,
+    }
+    assert loader.window.limit == loader.window.max_size
+    rejects = [json.loads(line) for line in loader.rejects.getvalue().splitlines()]
+    assert [reject["line"] for reject in rejects] == [1, 2, 3]
+    assert all("ValidationException" in reject["error"] for reject in rejects)
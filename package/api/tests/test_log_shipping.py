@@ -0,0 +1,133 @@
+import io
+
+import pytest
+
+from core.circuit import CircuitBreaker
+from core.compression import codec_of, iter_lines, open_decompressed
+from core.log_sink import LogShipper
+from core.s3 import save_logs_to_s3
+from core.spool import Spool
+
+RESET_SECONDS = 30
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_seconds=60)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.stats()["opened"] == 1
+
+
+def test_breaker_half_open_allows_single_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=RESET_SECONDS)
+    breaker.record_failure()
+    clock.now += RESET_SECONDS - 1
+    assert not breaker.allow()
+    clock.now += 1
+
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+
+    # プローブが失敗すると再びopenになり、待ち時間が経過するまで止める
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    clock.now += RESET_SECONDS
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+
+def test_spool_evicts_oldest_files_over_limit(tmp_path):
+    spool = Spool(tmp_path, max_bytes=100)
+
+    for i in range(3):
+        spool.append(bytes([ord("a") + i]) * 40, record_count=i + 1)
+
+    # 40バイト×3は上限を超えるため、最も古いファイル (1件) を破棄する
+    pending = spool.pending()
+    assert [path.read_bytes()[:1] for path in pending] == [b"b", b"c"]
+    assert [Spool.record_count(path) for path in pending] == [2, 3]
+    assert spool.stats() == {"files": 2, "bytes": 80, "dropped_records": 1}
+
+    spool.append(b"x" * 101, record_count=5)
+    assert spool.stats()["dropped_records"] == 6
+
+    # 再起動後も残っているファイルを引き継ぐ
+    assert Spool(tmp_path, max_bytes=100).stats()["bytes"] == 80
+
+
+class FlakyWriter:
+    """失敗を切り替えられるS3への書き出し (成功時はbench.fakesに保存される)"""
+
+    def __init__(self) -> None:
+        self.failing = False
+        self.calls = 0
+        self.written: list[bytes] = []
+
+    def __call__(self, body: bytes, record_count: int) -> None:
+        self.calls += 1
+        if self.failing:
+            raise ConnectionError("S3 is unavailable")
+        save_logs_to_s3(body, record_count)
+        self.written.append(body)
+
+
+def stored_lines(fake_aws) -> list[bytes]:
+    lines = []
+    for key, item in sorted(fake_aws.objects.items()):
+        codec = codec_of(key, item.get("ContentEncoding"))
+        lines.extend(iter_lines(open_decompressed(io.BytesIO(item["Body"]), codec)))
+    return lines
+
+
+@pytest.fixture
+def shipper(tmp_path):
+    writer = FlakyWriter()
+    shipper = LogShipper(
+        writer=writer,
+        breaker=CircuitBreaker(
+            failure_threshold=2, reset_timeout_seconds=RESET_SECONDS
+        ),
+        spool=Spool(tmp_path, max_bytes=1024 * 1024),
+        replay_max_files=2,
+    )
+    return shipper, writer
+
+
+def test_shipper_spools_while_open_and_replays_in_order(fake_aws, clock, shipper):
+    shipper, writer = shipper
+    writer.failing = True
+    for i in range(4):
+        shipper(f'{{"i":{i}}}\n'.encode(), 1)
+
+    # 2回失敗した時点でブレーカーが開き、以降はS3を呼び出さずに退避する
+    assert writer.calls == 2
+    assert shipper.breaker.state == "open"
+    assert shipper.spool.stats()["files"] == 4
+    assert fake_aws.objects == {}
+
+    writer.failing = False
+    clock.now += RESET_SECONDS
+    shipper(b'{"i":4}\n', 1)
+
+    # 新しいログの書き出しに成功すると、退避分を古い順に上限まで再送する
+    assert shipper.breaker.state == "closed"
+    assert shipper.spool.stats()["files"] == 2
+    assert writer.written == [b'{"i":4}\n', b'{"i":0}\n', b'{"i":1}\n']
+
+    shipper.replay()
+    assert shipper.spool.stats()["files"] == 0
+    assert writer.written[3:] == [b'{"i":2}\n', b'{"i":3}\n']
+    assert sorted(stored_lines(fake_aws)) == [f'{{"i":{i}}}'.encode() for i in range(5)]
@@ -0,0 +1,74 @@
+import threading
+import time
+
+from core.log_sink import BackgroundLogSink, LogSink
+from model.log import AccessLog
+
+
+def access_log(i: int) -> AccessLog:
+    return AccessLog(request_id=f"r{i}", event=f"Book with ISBN {i} retrieved")
+
+
+def wait_until(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition was not met"
+        time.sleep(0.005)
+
+
+class Writer:
+    """書き出したレコード数を記録し、指定した回数だけ失敗する書き出し先"""
+
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.calls = 0
+        self.records = 0
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, body: bytes, record_count: int) -> None:
+        self.calls += 1
+        self.release.wait()
+        if self.failures:
+            self.failures -= 1
+            raise OSError("No space left on device")
+        self.records += record_count
+
+
+def test_idle_flush_error_does_not_stop_the_worker():
+    writer = Writer(failures=1)
+    sink = BackgroundLogSink(
+        LogSink(max_records=100, max_bytes=1 << 20, max_age_seconds=0.01, writer=writer)
+    )
+
+    sink.emit(access_log(0))
+    # 待機中の書き出し (経過時間による) が失敗しても、ワーカーは処理を続ける
+    wait_until(lambda: writer.calls == 1)
+    sink.emit(access_log(1))
+    sink.flush()
+
+    assert writer.records == 1
+    assert sink._worker is not None and sink._worker.is_alive()
+
+
+def test_flush_waits_for_queued_logs_only_until_the_timeout():
+    writer = Writer()
+    writer.release.clear()
+    sink = BackgroundLogSink(
+        LogSink(max_records=1, max_bytes=1 << 20, max_age_seconds=60, writer=writer),
+        flush_timeout_seconds=0.2,
+    )
+    for i in range(3):
+        sink.emit(access_log(i))
+    wait_until(lambda: writer.calls == 1)
+
+    started = time.monotonic()
+    flushing = threading.Thread(target=sink.flush)
+    flushing.start()
+    flushing.join(timeout=2)
+
+    assert not flushing.is_alive()
+    assert 0.2 <= time.monotonic() - started < 1
+    writer.release.set()
+    sink.flush()
+    assert writer.records == 3
@@ -0,0 +1,64 @@
+import json
+
+import db.book
+import main
+from bench.events import LambdaContext, proxy_event
+from model.book import Book
+
+
+def save_books(*books: tuple[str, str, str, str | None]) -> None:
+    for isbn, title, author, publisher in books:
+        db.book.save_book(
+            Book(isbn=isbn, title=title, author=author, publisher=publisher)
+        )
+
+
+def invoke(path: str, query: dict[str, str] | None = None) -> tuple[int, dict]:
+    response = main.handler(proxy_event("GET", path, query=query), LambdaContext())
+    return response["statusCode"], json.loads(response["body"])
+
+
+def test_query_by_author_is_sorted_by_title_and_paginated(fake_aws):
+    save_books(
+        ("1", "C", "Author", "P"),
+        ("2", "A", "Author", "P"),
+        ("3", "B", "Other", "P"),
+        ("4", "B", "Author", None),
+    )
+
+    first = db.book.query_books("author", "Author", limit=2)
+    second = db.book.query_books("author", "Author", limit=2, cursor=first.next_cursor)
+
+    assert [book.title for book in first.items] == ["A", "B"]
+    assert first.next_cursor is not None
+    assert [book.title for book in second.items] == ["C"]
+    assert second.next_cursor is None
+    assert fake_aws.calls["dynamodb:Query"] == 2
+
+
+def test_query_returns_only_requested_fields(fake_aws):
+    save_books(("1", "A", "Author", "P"))
+
+    page = db.book.query_books("publisher", "P", limit=10, fields=["title"])
+
+    assert [book.model_dump(exclude_unset=True) for book in page.items] == [
+        {"title": "A"}
+    ]
+
+
+def test_query_endpoints(fake_aws):
+    save_books(("1", "A", "Author", "P"), ("2", "B", "Author", "Q"))
+
+    status, body = invoke("/books/by-author/Author", {"fields": "isbn,title"})
+    assert status == 200
+    assert body == {
+        "items": [{"isbn": "1", "title": "A"}, {"isbn": "2", "title": "B"}],
+        "next_cursor": None,
+    }
+
+    status, body = invoke("/books/by-publisher/Q", {"limit": "1"})
+    assert status == 200
+    assert [item["isbn"] for item in body["items"]] == ["2"]
+
+    status, _ = invoke("/books/by-author/Author", {"cursor": "not-a-cursor"})
+    assert status == 400
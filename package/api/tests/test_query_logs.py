@@ -0,0 +1,79 @@
+import datetime
+
+import pytest
+
+from model.log import AccessLog
+from tools.query_logs import LogFilter, LogQuery, create_client
+
+START = datetime.datetime(2025, 1, 1, 9, 0, tzinfo=datetime.UTC)
+END = datetime.datetime(2025, 1, 1, 10, 0, tzinfo=datetime.UTC)
+
+
+def put_log(fake_aws, key: str, *timestamps: datetime.datetime) -> None:
+    """ログシンクと同じキー (logs/%Y/%m/%d/%H%M%S_...) でNDJSONのログを置く"""
+    body = b"".join(
+        AccessLog(
+            timestamp=timestamp.isoformat(),
+            request_id="r",
+            event="Book with ISBN 9784000000000 retrieved",
+        )
+        .model_dump_json()
+        .encode()
+        + b"\n"
+        for timestamp in timestamps
+    )
+    fake_aws.objects[key] = {"Key": key, "Body": body}
+
+
+@pytest.fixture
+def listed(fake_aws) -> list[str]:
+    """一覧取得したプレフィックスを記録する (シャードは並列に一覧取得される)"""
+    prefixes = []
+    list_objects = fake_aws._s3_ListObjectsV2
+
+    def list_objects_v2(params):
+        prefixes.append(params["Prefix"])
+        return list_objects(params)
+
+    fake_aws._s3_ListObjectsV2 = list_objects_v2
+    return prefixes
+
+
+def test_late_flushed_records_are_found_in_later_shards(fake_aws, listed):
+    minute = datetime.timedelta(minutes=1)
+    put_log(fake_aws, "logs/2025/01/01/090500_a.ndjson", START + 5 * minute)
+    # 範囲の末尾のレコードが、次の時間 (終了時刻の後) に書き出された
+    put_log(fake_aws, "logs/2025/01/01/100200_b.ndjson", END - minute, END + minute)
+    put_log(fake_aws, "logs/2025/01/01/110000_c.ndjson", END - 2 * minute)
+
+    with LogQuery(create_client(2), "bucket", max_workers=2, cache_dir=None) as query:
+        result = query.run(LogFilter(start=START, end=END), histogram="hour")
+
+    assert sorted(listed) == ["logs/2025/01/01/09", "logs/2025/01/01/10"]
+    assert result.scanned == 3
+    assert result.matched == 2
+    assert result.histogram == {"2025-01-01T09": 2}
+
+
+def test_lag_is_configurable(fake_aws, listed):
+    with LogQuery(
+        create_client(2), "bucket", cache_dir=None, lag=datetime.timedelta(hours=2)
+    ) as query:
+        query.run(LogFilter(start=START, end=END + datetime.timedelta(minutes=30)))
+
+    assert sorted(listed) == [
+        "logs/2025/01/01/09",
+        "logs/2025/01/01/10",
+        "logs/2025/01/01/11",
+        "logs/2025/01/01/12",
+    ]
+
+
+def test_close_shuts_down_the_download_executor(fake_aws):
+    query = LogQuery(create_client(2), "bucket", cache_dir=None)
+
+    with query:
+        pass
+
+    with pytest.raises(RuntimeError):
+        query.executor.submit(print)
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from core.singleflight import SingleFlight
+
+
+class Backend:
+    """呼び出し回数を数え、releaseされるまで応答を返さない処理"""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def fetch(self) -> dict[str, int]:
+        self.calls += 1
+        await self.release.wait()
+        return {"call": self.calls}
+
+
+def test_concurrent_calls_are_coalesced():
+    async def scenario():
+        flight = SingleFlight[str, dict[str, int]]()
+        backend = Backend()
+        tasks = [asyncio.create_task(flight.do("a", backend.fetch)) for _ in range(3)]
+        other = asyncio.create_task(flight.do("b", backend.fetch))
+        await asyncio.sleep(0)
+        backend.release.set()
+        results = await asyncio.gather(*tasks)
+        await other
+
+        assert backend.calls == 2
+        assert results[0] is results[1] is results[2]
+        assert flight.stats() == {"in_flight": 0, "calls": 2, "coalesced": 2}
+
+        # 処理が終わった後の呼び出しは新たに実行される
+        assert await flight.do("a", backend.fetch) == {"call": 3}
+
+    asyncio.run(scenario())
+
+
+def test_exception_is_shared_with_waiters():
+    async def scenario():
+        flight = SingleFlight[str, int]()
+        release = asyncio.Event()
+
+        async def fail() -> int:
+            await release.wait()
+            raise ValueError("boom")
+
+        tasks = [asyncio.create_task(flight.do("a", fail)) for _ in range(2)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert [type(r) for r in results] == [ValueError, ValueError]
+        assert flight.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_waiter_cancellation_does_not_cancel_the_call():
+    async def scenario():
+        flight = SingleFlight[str, dict[str, int]]()
+        backend = Backend()
+        leader = asyncio.create_task(flight.do("a", backend.fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flight.do("a", backend.fetch))
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        backend.release.set()
+
+        assert await leader == {"call": 1}
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(scenario())
+
+
+def test_leader_cancellation_does_not_cancel_waiters():
+    async def scenario():
+        flight = SingleFlight[str, dict[str, int]]()
+        backend = Backend()
+        leader = asyncio.create_task(flight.do("a", backend.fetch))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(flight.do("a", backend.fetch))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        backend.release.set()
+
+        assert await waiter == {"call": 1}
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert backend.calls == 1
+        assert flight.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,87 @@
+"""Lambda関数のコードをバイトコードにコンパイルして組み立てるツール
+
+実行時に必要なモジュール (開発用のbench・tests・toolsを除く) を
+``.function`` にコピーし、レイヤーと同じくunchecked-hash形式の
+バイトコードを事前にコンパイルする。Lambdaのコードは読み取り専用のため、
+.pycがないとコールドスタートのたびにアプリのモジュールもコンパイルされる。
+
+infraは ``.function`` が存在する場合にそれを関数のコードとして使用する
+(存在しない場合はpackage/apiのソースをそのまま使用する)。
+
+使い方:
+    uv run python -m tools.build_function
+"""
+
+import argparse
+import shutil
+import sys
+from pathlib import Path
+
+from pydantic import BaseModel, Field
+
+from tools.build_layer import PYTHON_VERSION, TreeSize, compile_bytecode
+from tools.import_time import API_ROOT
+
+DEFAULT_OUTPUT = API_ROOT.parents[1] / ".function"
+
+# 実行時に必要なファイルとパッケージ (pyproject.tomlはProjectInfoが読み込む)
+RUNTIME_PATHS = ("main.py", "app.py", "pyproject.toml", "core", "db", "model", "router")
+
+
+class FunctionBuildReport(BaseModel):
+    """関数のコードのビルド結果を管理するオブジェクトクラス"""
+
+    output: str = Field(..., description="出力先のディレクトリ")
+    size: TreeSize = Field(..., description="コンパイル後のサイズ")
+    compiled: bool = Field(..., description="すべてのモジュールをコンパイルできたか")
+
+
+def build(output: Path) -> FunctionBuildReport:
+    """関数のコードを組み立てる
+
+    Args:
+        output (Path): 出力先 (既存の内容は削除する)
+
+    Returns:
+        FunctionBuildReport: ビルド結果
+    """
+    if sys.version_info[:2] != tuple(map(int, PYTHON_VERSION.split("."))):
+        raise RuntimeError(
+            f"Python {PYTHON_VERSION} is required to compile bytecode for the runtime"
+        )
+    if output.exists():
+        shutil.rmtree(output)
+    output.mkdir(parents=True)
+
+    ignore = shutil.ignore_patterns("__pycache__", "*.pyc")
+    for name in RUNTIME_PATHS:
+        source = API_ROOT / name
+        if source.is_dir():
+            shutil.copytree(source, output / name, ignore=ignore)
+        else:
+            shutil.copy2(source, output / name)
+
+    compiled = compile_bytecode(output)
+    return FunctionBuildReport(
+        output=str(output), size=TreeSize.of(output), compiled=compiled
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=DEFAULT_OUTPUT,
+        help=f"関数のコードの出力先 (既定値: {DEFAULT_OUTPUT})",
+    )
+    args = parser.parse_args()
+
+    report = build(args.output.resolve())
+    print(report.model_dump_json(indent=2))
+    if not report.compiled:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""Lambdaレイヤーをuv.lockから組み立てるツール
+
+``uv export`` でロックされた本番用の依存関係 (devグループを除く) を書き出し、
+Lambdaの実行環境 (アーキテクチャ・Pythonバージョン) 向けのwheelを
+``.layers/python`` にインストールしたうえで、次の処理を行う。
+
+- テスト・ドキュメント・型スタブ・Cythonのソースなど実行時に不要なファイルを削除する
+- botocoreのサービス定義のうち、使用するサービス (DynamoDB・S3) 以外を削除する
+- バイトコードを事前にコンパイルする
+  (Lambdaの/optは読み取り専用のため、.pycがないとコールドスタートのたびに
+  コンパイルが発生する。ソースの更新確認を省略するunchecked-hash形式で出力する)
+
+処理前後のサイズと、ビルド環境で実行可能な場合はインポート時間を表示する。
+
+使い方:
+    uv run python -m tools.build_layer
+    uv run python -m tools.build_layer --architecture arm64 --json
+    uv run python -m tools.build_layer --extra zstd
+"""
+
+import argparse
+import compileall
+import os
+import py_compile
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from pydantic import BaseModel, Field
+
+from tools.import_time import API_ROOT, measure_import_time
+
+DEFAULT_OUTPUT = API_ROOT.parents[1] / ".layers"
+
+# Lambdaのアーキテクチャとwheelのプラットフォームの対応
+PLATFORMS = {
+    "arm64": "aarch64-manylinux2014",
+    "x86_64": "x86_64-manylinux2014",
+}
+
+# 実行環境のPythonバージョン (LambdaConstructのランタイムと合わせる)
+PYTHON_VERSION = "3.13"
+
+# 実行時に必要なbotocoreのサービス定義
+DEFAULT_SERVICES = ("dynamodb", "s3")
+
+# 削除するディレクトリ (テストとキャッシュ)
+REMOVED_DIRS = {"tests", "test", "__pycache__"}
+
+# Pythonパッケージでない場合に限り削除するディレクトリ
+# (botocore.docsのように実行時にインポートされるパッケージは残す)
+REMOVED_DATA_DIRS = {"docs", "doc", "examples"}
+
+# 削除するファイルの拡張子
+REMOVED_SUFFIXES = {".pyi", ".pyc", ".pyx", ".pxd"}
+
+
+class TreeSize(BaseModel):
+    """ディレクトリのファイル数と合計サイズを管理するオブジェクトクラス"""
+
+    files: int = Field(..., description="ファイル数")
+    size_bytes: int = Field(..., description="合計サイズ (バイト)")
+
+    @classmethod
+    def of(cls, path: Path) -> "TreeSize":
+        """ディレクトリ配下のファイル数と合計サイズを集計する"""
+        files = [p for p in path.rglob("*") if p.is_file()]
+        return cls(files=len(files), size_bytes=sum(p.stat().st_size for p in files))
+
+
+class BuildReport(BaseModel):
+    """レイヤーのビルド結果を管理するオブジェクトクラス"""
+
+    architecture: str = Field(..., description="対象のアーキテクチャ")
+    output: str = Field(..., description="出力先のディレクトリ")
+    before: TreeSize = Field(..., description="インストール直後のサイズ")
+    after: TreeSize = Field(..., description="削除・コンパイル後のサイズ")
+    removed: dict[str, int] = Field(
+        default_factory=dict, description="削除したファイルの種類ごとのバイト数"
+    )
+    compiled: bool = Field(..., description="すべてのモジュールをコンパイルできたか")
+    import_ms_before: float | None = Field(
+        None, description="インストール直後のインポート時間 (ミリ秒)"
+    )
+    import_ms_after: float | None = Field(
+        None, description="削除・コンパイル後のインポート時間 (ミリ秒)"
+    )
+
+    def format(self) -> str:
+        """処理前後の比較を表形式で返す"""
+
+        def mib(size: int) -> str:
+            return f"{size / 1024 / 1024:.1f} MiB"
+
+        def ms(value: float | None) -> str:
+            return "-" if value is None else f"{value:.1f} ms"
+
+        lines = [
+            f"layer: {self.output} ({self.architecture})",
+            f"{'':<12} {'before':>12} {'after':>12}",
+            f"{'size':<12} {mib(self.before.size_bytes):>12} "
+            f"{mib(self.after.size_bytes):>12}",
+            f"{'files':<12} {self.before.files:>12} {self.after.files:>12}",
+            f"{'import':<12} {ms(self.import_ms_before):>12} "
+            f"{ms(self.import_ms_after):>12}",
+            "removed:",
+        ]
+        for kind, size in sorted(self.removed.items(), key=lambda i: -i[1]):
+            lines.append(f"  {kind:<24} {mib(size):>12}")
+        if not self.compiled:
+            lines.append("warning: some modules could not be compiled")
+        return "\n".join(lines)
+
+
+def export_requirements(path: Path, extras: tuple[str, ...] = ()) -> None:
+    """uv.lockから本番用の依存関係 (指定したextraを含む) をrequirements形式で書き出す"""
+    subprocess.run(
+        [
+            "uv",
+            "export",
+            "--frozen",
+            "--no-dev",
+            "--no-emit-project",
+            *(arg for extra in extras for arg in ("--extra", extra)),
+            "--format",
+            "requirements-txt",
+            "--output-file",
+            str(path),
+        ],
+        cwd=API_ROOT,
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def install(requirements: Path, target: Path, architecture: str) -> None:
+    """対象のアーキテクチャ向けのwheelをディレクトリにインストールする"""
+    subprocess.run(
+        [
+            "uv",
+            "pip",
+            "install",
+            "--requirements",
+            str(requirements),
+            "--target",
+            str(target),
+            "--python-platform",
+            PLATFORMS[architecture],
+            "--python-version",
+            PYTHON_VERSION,
+            "--only-binary",
+            ":all:",
+            "--no-cache",
+        ],
+        cwd=API_ROOT,
+        check=True,
+    )
+
+
+def directory_size(path: Path) -> int:
+    """ディレクトリ配下のファイルの合計サイズを返す"""
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def trim(site_packages: Path, services: tuple[str, ...]) -> dict[str, int]:
+    """実行時に不要なファイルを削除する
+
+    Args:
+        site_packages (Path): パッケージのインストール先
+        services (tuple[str, ...]): 残すbotocoreのサービス名
+
+    Returns:
+        dict[str, int]: 削除したファイルの種類ごとのバイト数
+    """
+    removed: dict[str, int] = {}
+
+    def remove(path: Path, kind: str) -> None:
+        size = directory_size(path) if path.is_dir() else path.stat().st_size
+        removed[kind] = removed.get(kind, 0) + size
+        if path.is_dir():
+            shutil.rmtree(path)
+        else:
+            path.unlink()
+
+    # 型スタブのみのパッケージ
+    for path in site_packages.glob("*-stubs"):
+        remove(path, "type stubs")
+
+    # botocoreのサービス定義 (data直下のディレクトリがサービスごとの定義)
+    botocore_data = site_packages / "botocore" / "data"
+    if botocore_data.is_dir():
+        for path in botocore_data.iterdir():
+            if path.is_dir() and path.name not in services:
+                remove(path, "botocore service models")
+
+    # テスト・キャッシュ・ドキュメント (深い階層から順に削除する)
+    for path in sorted(site_packages.glob("*/**/"), key=lambda p: -len(p.parts)):
+        if not path.exists():
+            continue
+        if path.name in REMOVED_DIRS:
+            remove(path, "tests and caches")
+        elif path.name in REMOVED_DATA_DIRS and not (path / "__init__.py").exists():
+            remove(path, "docs and examples")
+
+    for path in list(site_packages.rglob("*")):
+        if path.is_file() and path.suffix in REMOVED_SUFFIXES:
+            kind = "type stubs" if path.suffix == ".pyi" else "sources and bytecode"
+            remove(path, kind)
+    return removed
+
+
+def compile_bytecode(site_packages: Path) -> bool:
+    """モジュールをバイトコードにコンパイルする
+
+    実行環境と同じバージョンのPythonで実行する必要がある。
+    Lambdaは最適化オプション (-O) なしで実行されるため最適化レベル0で出力する
+    (-OOはFastAPIがOpenAPIに使用するdocstringとassertを削除してしまう)。
+
+    Returns:
+        bool: すべてのモジュールをコンパイルできた場合はTrue
+    """
+    return bool(
+        compileall.compile_dir(
+            site_packages,
+            quiet=1,
+            workers=0,
+            invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+        )
+    )
+
+
+def can_import(architecture: str) -> bool:
+    """ビルド環境でレイヤーを読み込めるか (アーキテクチャが一致するか) を返す"""
+    machine = os.uname().machine
+    return sys.platform == "linux" and PLATFORMS[architecture].startswith(machine)
+
+
+def import_ms(site_packages: Path) -> float:
+    """レイヤーを読み込んだ場合のハンドラーのインポート時間を計測する
+
+    Lambdaと同様に.pycを書き込まない状態で計測する。
+    """
+    report = measure_import_time(
+        "main",
+        extra_env={"PYTHONPATH": str(site_packages), "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    return report.total_ms
+
+
+def build(
+    output: Path,
+    architecture: str,
+    services: tuple[str, ...],
+    measure: bool,
+    extras: tuple[str, ...] = (),
+) -> BuildReport:
+    """レイヤーを組み立てる
+
+    Args:
+        output (Path): レイヤーの出力先 (配下のpythonディレクトリを作り直す)
+        architecture (str): 対象のアーキテクチャ (arm64/x86_64)
+        services (tuple[str, ...]): 残すbotocoreのサービス名
+        measure (bool): インポート時間を計測するかどうか
+        extras (tuple[str, ...]): 追加でインストールするextra (zstdなど)
+
+    Returns:
+        BuildReport: ビルド結果
+    """
+    if sys.version_info[:2] != tuple(map(int, PYTHON_VERSION.split("."))):
+        raise RuntimeError(
+            f"Python {PYTHON_VERSION} is required to compile bytecode for the runtime"
+        )
+    site_packages = output / "python"
+    if site_packages.exists():
+        shutil.rmtree(site_packages)
+    site_packages.mkdir(parents=True)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        requirements = Path(tmp) / "requirements.txt"
+        export_requirements(requirements, extras)
+        install(requirements, site_packages, architecture)
+
+    measure = measure and can_import(architecture)
+    before = TreeSize.of(site_packages)
+    import_ms_before = import_ms(site_packages) if measure else None
+
+    removed = trim(site_packages, services)
+    compiled = compile_bytecode(site_packages)
+
+    return BuildReport(
+        architecture=architecture,
+        output=str(output),
+        before=before,
+        after=TreeSize.of(site_packages),
+        removed=removed,
+        compiled=compiled,
+        import_ms_before=import_ms_before,
+        import_ms_after=import_ms(site_packages) if measure else None,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=DEFAULT_OUTPUT,
+        help=f"レイヤーの出力先 (既定値: {DEFAULT_OUTPUT})",
+    )
+    parser.add_argument(
+        "--architecture",
+        choices=sorted(PLATFORMS),
+        default="x86_64",
+        help="Lambdaのアーキテクチャ (infraのlambda_architectureと合わせる)",
+    )
+    parser.add_argument(
+        "--service",
+        action="append",
+        dest="services",
+        default=None,
+        help=f"残すbotocoreのサービス名 (既定値: {', '.join(DEFAULT_SERVICES)})",
+    )
+    parser.add_argument(
+        "--extra",
+        action="append",
+        dest="extras",
+        default=[],
+        help="追加でインストールするextra (LOG_COMPRESSION=zstdの場合はzstd)",
+    )
+    parser.add_argument(
+        "--skip-import-time", action="store_true", help="インポート時間を計測しない"
+    )
+    parser.add_argument("--json", action="store_true", help="JSON形式で出力する")
+    args = parser.parse_args()
+
+    report = build(
+        args.output.resolve(),
+        args.architecture,
+        tuple(args.services or DEFAULT_SERVICES),
+        measure=not args.skip_import_time,
+        extras=tuple(args.extras),
+    )
+    print(report.model_dump_json(indent=2) if args.json else report.format())
+    if not report.compiled:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
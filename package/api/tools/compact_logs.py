@@ -0,0 +1,430 @@
+"""S3上の小さなアクセスログを時間単位のパーティションにまとめるツール
+
+``logs/YYYY/MM/DD/HHMMSS_<id>.json`` (1リクエスト1オブジェクト) と
+``logs/YYYY/MM/DD/HHMMSS_<id>.ndjson`` (ログシンクがまとめて書き出したもの)
+(圧縮されている場合は ``.gz``/``.zst`` が付く) を
+指定した時間範囲で展開しながら読み込み、Hive形式のパーティション
+``compacted/dt=YYYY-MM-DD/hour=HH/part-<id>-NNNNN.ndjson.gz`` に
+gzip圧縮したNDJSONとして書き出す。
+
+1時間分ずつ処理し、ダウンロード中のオブジェクト数と出力ファイルのサイズに
+上限を設けるため、対象のログが多くてもメモリ使用量は一定に保たれる。
+レコードはログオブジェクトが書き出された時間のパーティションに入る。
+
+まとめた元のログオブジェクトのキーはパーティションの ``_sources.txt`` に記録し、
+同じ時間を再実行した場合は未処理のオブジェクト (遅れて書き出されたログなど) のみを
+新しいファイルに書き出すため、レコードが重複することはない。
+出力ファイル名は入力オブジェクトの一覧から決まるため、記録の前に中断した場合の
+再実行は同じファイルを上書きする。
+
+使い方:
+    uv run python -m tools.compact_logs --bucket <bucket> --start 2025-01-01T00
+    uv run python -m tools.compact_logs --bucket <bucket> --start 2025-01-01T00 \\
+        --end 2025-01-02T00 --delete-source
+"""
+
+import argparse
+import datetime
+import gzip
+import hashlib
+import itertools
+import json
+import os
+import sys
+import tempfile
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import IO, Any, Self
+
+import botocore.session
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from pydantic import BaseModel, Field
+
+from core.compression import SUFFIXES, codec_of, open_decompressed
+
+SOURCE_PREFIX = "logs/"
+DEST_PREFIX = "compacted/"
+
+# 読み込むログオブジェクトの拡張子 (圧縮方式ごとの拡張子を含む)
+SOURCE_SUFFIXES = tuple(
+    f"{name}{suffix}" for suffix in SUFFIXES.values() for name in (".json", ".ndjson")
+)
+
+# まとめた元のログオブジェクトのキーを記録するファイル名
+# (先頭が "_" のファイルはAthenaなどのクエリエンジンから無視される)
+MANIFEST_NAME = "_sources.txt"
+
+# DeleteObjectsで一度に削除できるオブジェクト数
+DELETE_BATCH_SIZE = 1000
+
+
+class CompactionResult(BaseModel):
+    """1時間分のパーティションの処理結果を管理するオブジェクトクラス"""
+
+    hour: datetime.datetime = Field(..., description="対象の時間 (UTC)")
+    source_objects: int = Field(0, description="読み込んだログオブジェクト数")
+    skipped_objects: int = Field(
+        0, description="まとめ済みのため読み込まなかったログオブジェクト数"
+    )
+    records: int = Field(0, description="書き出したレコード数")
+    invalid_records: int = Field(0, description="JSONとして読めずに除外した行数")
+    output_keys: list[str] = Field(default_factory=list, description="出力先のキー")
+    output_bytes: int = Field(0, description="出力ファイルの合計サイズ (圧縮後)")
+    deleted_objects: int = Field(0, description="削除したログオブジェクト数")
+
+
+def parse_hour(value: str) -> datetime.datetime:
+    """YYYY-MM-DDTHH形式の文字列をUTCの日時に変換する"""
+    hour = datetime.datetime.fromisoformat(value)
+    if hour.tzinfo is None:
+        hour = hour.replace(tzinfo=datetime.UTC)
+    return hour.astimezone(datetime.UTC).replace(minute=0, second=0, microsecond=0)
+
+
+def hours_between(
+    start: datetime.datetime, end: datetime.datetime
+) -> list[datetime.datetime]:
+    """開始時刻から終了時刻 (含まない) までの1時間ごとの日時を返す"""
+    hours = []
+    hour = start
+    while hour < end:
+        hours.append(hour)
+        hour += datetime.timedelta(hours=1)
+    return hours
+
+
+def source_prefix(hour: datetime.datetime) -> str:
+    """指定した時間に書き出されたログオブジェクトのプレフィックス
+
+    ログのキーは ``logs/YYYY/MM/DD/HHMMSS_...`` のため、時間単位で絞り込める。
+    """
+    return f"{SOURCE_PREFIX}{hour:%Y/%m/%d/%H}"
+
+
+def partition_prefix(hour: datetime.datetime) -> str:
+    """指定した時間のHive形式のパーティションのプレフィックス"""
+    return f"{DEST_PREFIX}dt={hour:%Y-%m-%d}/hour={hour:%H}/"
+
+
+def bounded_map[T, R](
+    executor: ThreadPoolExecutor,
+    func: Callable[[T], R],
+    items: Iterable[T],
+    max_in_flight: int,
+) -> Iterator[R]:
+    """実行中のタスク数を制限しながら、入力順に結果を返す"""
+    items = iter(items)
+    pending: deque[Future[R]] = deque(
+        executor.submit(func, item) for item in itertools.islice(items, max_in_flight)
+    )
+    while pending:
+        result = pending.popleft().result()
+        for item in itertools.islice(items, 1):
+            pending.append(executor.submit(func, item))
+        yield result
+
+
+class PartWriter:
+    """gzip圧縮したNDJSONを一時ファイルに書き込み、上限サイズごとにS3へ送るクラス"""
+
+    def __init__(
+        self,
+        upload: Callable[[str, IO[bytes]], None],
+        prefix: str,
+        run_id: str,
+        max_part_bytes: int,
+    ) -> None:
+        """PartWriterを初期化する
+
+        Args:
+            upload (Callable[[str, IO[bytes]], None]): キーとファイルを受け取る関数
+            prefix (str): 出力先のパーティションのプレフィックス
+            run_id (str): 出力ファイル名に含める入力の識別子
+            max_part_bytes (int): 1ファイルあたりの最大サイズ (圧縮前)
+        """
+        self._upload = upload
+        self._prefix = prefix
+        self._run_id = run_id
+        self.max_part_bytes = max_part_bytes
+        self._file: IO[bytes] | None = None
+        self._gzip: gzip.GzipFile | None = None
+        self._size = 0
+        self.keys: list[str] = []
+        self.output_bytes = 0
+
+    def write(self, line: bytes) -> None:
+        """1レコード分の行を書き込む"""
+        if self._gzip is None:
+            self._file = tempfile.TemporaryFile()
+            self._gzip = gzip.GzipFile(fileobj=self._file, mode="wb", mtime=0)
+        self._gzip.write(line)
+        self._size += len(line)
+        if self._size >= self.max_part_bytes:
+            self.close_part()
+
+    def close_part(self) -> None:
+        """書き込み中のファイルを閉じてS3へ送る"""
+        if self._gzip is None or self._file is None:
+            return
+        self._gzip.close()
+        self.output_bytes += self._file.tell()
+        self._file.seek(0)
+        key = f"{self._prefix}part-{self._run_id}-{len(self.keys):05d}.ndjson.gz"
+        try:
+            self._upload(key, self._file)
+        finally:
+            self._file.close()
+            self._file = None
+            self._gzip = None
+            self._size = 0
+        self.keys.append(key)
+
+
+class LogCompactor:
+    """アクセスログを時間単位のパーティションにまとめるクラス"""
+
+    def __init__(
+        self,
+        client: Any,
+        bucket: str,
+        max_workers: int = 32,
+        max_part_bytes: int = 128 * 1024 * 1024,
+        delete_source: bool = False,
+        dry_run: bool = False,
+    ) -> None:
+        """LogCompactorを初期化する
+
+        Args:
+            client (Any): botocoreのS3クライアント
+            bucket (str): ログが保存されているS3バケット名
+            max_workers (int): 一覧取得・ダウンロードの並列数
+            max_part_bytes (int): 出力ファイル1つあたりの最大サイズ (圧縮前)
+            delete_source (bool): 書き出し後に元のログオブジェクトを削除するかどうか
+            dry_run (bool): 対象のオブジェクト数のみを数え、書き出しを行わないかどうか
+        """
+        self.client = client
+        self.bucket = bucket
+        self.max_workers = max_workers
+        self.max_part_bytes = max_part_bytes
+        self.delete_source = delete_source
+        self.dry_run = dry_run
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="compact")
+
+    def close(self) -> None:
+        """ダウンロード・削除用のスレッドプールを終了する"""
+        self.executor.shutdown()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def list_keys(self, hour: datetime.datetime) -> list[str]:
+        """指定した時間に書き出されたログオブジェクトのキーを返す"""
+        paginator = self.client.get_paginator("list_objects_v2")
+        keys = []
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=source_prefix(hour)):
+            keys.extend(
+                item["Key"]
+                for item in page.get("Contents", [])
+                if item["Key"].endswith(SOURCE_SUFFIXES)
+            )
+        return sorted(keys)
+
+    def download(self, key: str) -> bytes:
+        """ログオブジェクトの内容を (圧縮されている場合は展開して) 取得する"""
+        response = self.client.get_object(Bucket=self.bucket, Key=key)
+        codec = codec_of(key, response.get("ContentEncoding"))
+        with response["Body"] as body:
+            return open_decompressed(body, codec).read()
+
+    def compacted_keys(self, hour: datetime.datetime) -> set[str]:
+        """パーティションにまとめ済みの元のログオブジェクトのキーを返す"""
+        try:
+            response = self.client.get_object(
+                Bucket=self.bucket, Key=partition_prefix(hour) + MANIFEST_NAME
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") != "NoSuchKey":
+                raise
+            return set()
+        with response["Body"] as body:
+            return set(body.read().decode().splitlines())
+
+    def record_compacted(self, hour: datetime.datetime, keys: set[str]) -> None:
+        """パーティションにまとめた元のログオブジェクトのキーを記録する"""
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=partition_prefix(hour) + MANIFEST_NAME,
+            Body="\n".join(sorted(keys)).encode(),
+            ContentType="text/plain",
+        )
+
+    def upload(self, key: str, file: IO[bytes]) -> None:
+        """圧縮済みのNDJSONファイルをS3へ書き込む"""
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=key,
+            Body=file,
+            ContentType="application/x-ndjson",
+            ContentEncoding="gzip",
+        )
+
+    def delete(self, keys: list[str]) -> int:
+        """ログオブジェクトをまとめて削除し、削除した件数を返す"""
+        batches = list(itertools.batched(keys, DELETE_BATCH_SIZE))
+        futures = [
+            self.executor.submit(
+                self.client.delete_objects,
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+            for batch in batches
+        ]
+        deleted = 0
+        for batch, future in zip(batches, futures, strict=True):
+            errors = future.result().get("Errors", [])
+            for error in errors:
+                print(
+                    f"failed to delete {error['Key']}: {error.get('Message')}",
+                    file=sys.stderr,
+                )
+            deleted += len(batch) - len(errors)
+        return deleted
+
+    def compact_hour(
+        self, hour: datetime.datetime, keys: list[str]
+    ) -> CompactionResult:
+        """1時間分のログオブジェクトを読み込み、パーティションに書き出す
+
+        まとめ済みのオブジェクトは読み込まず、未処理のオブジェクトのみを
+        新しいファイルに書き出してから、まとめ済みとして記録する。
+        """
+        result = CompactionResult(hour=hour, source_objects=len(keys))
+        if not keys or self.dry_run:
+            return result
+
+        compacted = self.compacted_keys(hour)
+        new_keys = [key for key in keys if key not in compacted]
+        result.source_objects = len(new_keys)
+        result.skipped_objects = len(keys) - len(new_keys)
+        if new_keys:
+            self._write_partition(hour, new_keys, result)
+            self.record_compacted(hour, compacted | set(new_keys))
+
+        # すべての出力が書き込まれてから元のログを削除する
+        # (前回の実行で削除できなかったまとめ済みのオブジェクトも削除する)
+        if self.delete_source:
+            result.deleted_objects = self.delete(keys)
+        return result
+
+    def _write_partition(
+        self, hour: datetime.datetime, keys: list[str], result: CompactionResult
+    ) -> None:
+        run_id = hashlib.sha256("\n".join(keys).encode()).hexdigest()[:16]
+        writer = PartWriter(
+            self.upload, partition_prefix(hour), run_id, self.max_part_bytes
+        )
+        for body in bounded_map(
+            self.executor, self.download, keys, self.max_workers * 2
+        ):
+            for line in body.splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    json.loads(line)
+                except ValueError:
+                    result.invalid_records += 1
+                    continue
+                writer.write(line.strip() + b"\n")
+                result.records += 1
+        writer.close_part()
+        result.output_keys = writer.keys
+        result.output_bytes = writer.output_bytes
+
+    def compact(
+        self, start: datetime.datetime, end: datetime.datetime
+    ) -> Iterator[CompactionResult]:
+        """時間範囲内のログを1時間ずつまとめ、処理結果を順に返す
+
+        次の時間のオブジェクト一覧は、前の時間の処理中に並行して取得する。
+        """
+        hours = hours_between(start, end)
+        with ThreadPoolExecutor(4, thread_name_prefix="list") as list_executor:
+            listings = bounded_map(list_executor, self.list_keys, hours, 4)
+            for hour, keys in zip(hours, listings, strict=True):
+                yield self.compact_hour(hour, keys)
+
+
+def create_client(max_workers: int) -> Any:
+    """並列数に合わせたコネクションプールを持つS3クライアントを生成する"""
+    session = botocore.session.get_session()
+    return session.create_client(
+        "s3",
+        config=Config(
+            max_pool_connections=max_workers,
+            retries={"mode": "adaptive", "total_max_attempts": 10},
+        ),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--bucket",
+        default=os.environ.get("LOG_BUCKET_NAME"),
+        help="ログが保存されているS3バケット名 (既定値: LOG_BUCKET_NAME)",
+    )
+    parser.add_argument(
+        "--start",
+        type=parse_hour,
+        default=None,
+        help="対象の開始時刻 (UTC, YYYY-MM-DDTHH, 既定値: 1時間前)",
+    )
+    parser.add_argument(
+        "--end",
+        type=parse_hour,
+        default=None,
+        help="対象の終了時刻 (UTC, 含まない, 既定値: 開始時刻の1時間後)",
+    )
+    parser.add_argument("--workers", type=int, default=32, help="並列数")
+    parser.add_argument(
+        "--max-part-mib",
+        type=int,
+        default=128,
+        help="出力ファイル1つあたりの最大サイズ (圧縮前, MiB)",
+    )
+    parser.add_argument(
+        "--delete-source",
+        action="store_true",
+        help="書き出し後に元のログオブジェクトを削除する",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="対象のオブジェクト数のみを表示する"
+    )
+    args = parser.parse_args()
+    if args.bucket is None:
+        parser.error("--bucket or LOG_BUCKET_NAME is required")
+
+    start = args.start or parse_hour(
+        (datetime.datetime.now(datetime.UTC) - datetime.timedelta(hours=1)).isoformat()
+    )
+    end = args.end or start + datetime.timedelta(hours=1)
+
+    with LogCompactor(
+        create_client(args.workers),
+        args.bucket,
+        max_workers=args.workers,
+        max_part_bytes=args.max_part_mib * 1024 * 1024,
+        delete_source=args.delete_source,
+        dry_run=args.dry_run,
+    ) as compactor:
+        for result in compactor.compact(start, end):
+            print(result.model_dump_json())
+
+
+if __name__ == "__main__":
+    main()
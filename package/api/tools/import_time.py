@@ -0,0 +1,127 @@
+"""Lambdaハンドラーのインポート時間を計測するツール
+
+``python -X importtime`` の出力を集計し、コールドスタート時の
+インポート時間と、時間のかかっているモジュールを表示する。
+
+使い方:
+    uv run python -m tools.import_time --top 20 --threshold-ms 1000
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from pydantic import BaseModel, Field
+
+API_ROOT = Path(__file__).resolve().parents[1]
+
+# インポート時に必須となる環境変数のダミー値
+DUMMY_ENV = {
+    "BOOKS_TABLE_NAME": "books",
+    "LOG_BUCKET_NAME": "logs",
+    "PROJECT_MAJOR_VERSION": "v1",
+    "AWS_DEFAULT_REGION": "ap-northeast-1",
+}
+
+
+class ImportTimeEntry(BaseModel):
+    """1モジュール分のインポート時間を管理するオブジェクトクラス"""
+
+    module: str = Field(..., description="モジュール名")
+    self_us: int = Field(..., description="モジュール自身のインポート時間 (マイクロ秒)")
+    cumulative_us: int = Field(
+        ..., description="依存モジュールを含むインポート時間 (マイクロ秒)"
+    )
+
+
+class ImportTimeReport(BaseModel):
+    """インポート時間の計測結果を管理するオブジェクトクラス"""
+
+    module: str = Field(..., description="計測対象のモジュール名")
+    total_us: int = Field(..., description="計測対象全体のインポート時間 (マイクロ秒)")
+    entries: list[ImportTimeEntry] = Field(..., description="モジュールごとの計測結果")
+
+    @property
+    def total_ms(self) -> float:
+        """計測対象全体のインポート時間 (ミリ秒)"""
+        return self.total_us / 1000
+
+    def format(self, top: int = 20) -> str:
+        """自身の処理時間が長い順にモジュールを並べたレポートを返す"""
+        lines = [f"import {self.module}: {self.total_ms:.1f} ms"]
+        lines.append(f"{'self [ms]':>10} {'cumulative [ms]':>16}  module")
+        for entry in sorted(self.entries, key=lambda e: e.self_us, reverse=True)[:top]:
+            lines.append(
+                f"{entry.self_us / 1000:>10.1f} {entry.cumulative_us / 1000:>16.1f}"
+                f"  {entry.module}"
+            )
+        return "\n".join(lines)
+
+
+def measure_import_time(
+    module: str = "main", extra_env: dict[str, str] | None = None
+) -> ImportTimeReport:
+    """新しいPythonプロセスでモジュールをインポートし、インポート時間を計測する
+
+    Args:
+        module (str): 計測対象のモジュール名
+        extra_env (dict[str, str] | None): 追加・上書きする環境変数
+            (例: レイヤーのPYTHONPATH)
+
+    Returns:
+        ImportTimeReport: 計測結果
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=API_ROOT,
+        env={**DUMMY_ENV, **os.environ, **(extra_env or {})},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        entries.append(
+            ImportTimeEntry(
+                module=name.strip(),
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+            )
+        )
+    total = next(e for e in reversed(entries) if e.module == module)
+    return ImportTimeReport(
+        module=module, total_us=total.cumulative_us, entries=entries
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="main", help="計測対象のモジュール名")
+    parser.add_argument("--top", type=int, default=20, help="表示するモジュール数")
+    parser.add_argument(
+        "--threshold-ms",
+        type=float,
+        default=None,
+        help="この時間を超えた場合に終了コード1で終了する",
+    )
+    parser.add_argument("--json", action="store_true", help="JSON形式で出力する")
+    args = parser.parse_args()
+
+    report = measure_import_time(args.module)
+    print(report.model_dump_json(indent=2) if args.json else report.format(args.top))
+    if args.threshold_ms is not None and report.total_ms > args.threshold_ms:
+        print(
+            f"import time {report.total_ms:.1f} ms exceeds "
+            f"threshold {args.threshold_ms:.1f} ms",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,511 @@
+"""CSV/NDJSONの書籍カタログを書籍テーブルに一括登録するツール
+
+ローカルのファイルまたはS3オブジェクト (``s3://<bucket>/<key>``、
+ログバケットに置いたファイルなど) を先頭から順に読み込み、
+``model.book.Book`` で一定件数ずつまとめて検証したうえで、
+``db.book.batch_write_books`` (BatchWriteItem) で並列に書き込む。
+``.gz`` で終わるファイルはgzipとして展開しながら読み込む。
+
+- 読み込みはストリーミングで行い、書き込み中のバッチ数にも上限を設けるため、
+  ファイルの大きさに関わらずメモリ使用量は一定に保たれる
+- スロットリングなどで書き込みに失敗した場合は、同時に書き込むバッチ数を半減し
+  (成功が続くと1ずつ戻す)、失敗した項目をバックオフしてから再送する。
+  AWSクライアントのリトライモードも既定でadaptiveにする。
+  ValidationExceptionなど再送しても成功しない失敗は、検証エラーと同じく
+  別ファイルに書き出して読み込みを続ける
+- 書き込みが完了した位置 (バイト位置と行番号) をチェックポイントファイルに保存し、
+  中断した場合は同じコマンドを再実行すると続きから再開する
+- 検証や書き込みに失敗したレコードは行番号とエラー内容をNDJSONで別ファイルに書き出す
+  (再開時は、中断時に書き込み中だったバッチの分が重複して出力される場合がある)
+
+並列に書き込むため、ファイル内に同じISBNが複数ある場合にどちらが残るかは
+保証されない (同一バッチ内では後の行が優先される)。
+
+使い方:
+    uv run python -m tools.load_books catalog.csv --table <table>
+    uv run python -m tools.load_books s3://<log bucket>/imports/catalog.ndjson.gz \\
+        --table <table> --workers 8
+"""
+
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import IO, Any, Literal
+
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+
+from model.book import Book
+
+# 1回に読み込むバイト数
+READ_CHUNK_BYTES = 1024 * 1024
+
+# 一括で検証する書籍情報の一覧
+books_adapter = TypeAdapter(list[Book])
+
+SourceFormat = Literal["csv", "ndjson"]
+
+
+class LoadError(Exception):
+    """再送しても書き込めなかった場合の例外"""
+
+
+class Checkpoint(BaseModel):
+    """書き込みが完了した位置を管理するオブジェクトクラス"""
+
+    source: str = Field(..., description="読み込み元のファイル")
+    format: SourceFormat = Field(..., description="読み込み元の形式")
+    offset: int = Field(0, description="書き込みが完了したバイト位置 (展開後)")
+    line: int = Field(0, description="書き込みが完了した行番号")
+    header: list[str] | None = Field(None, description="CSVのヘッダー")
+    loaded: int = Field(0, description="書き込んだレコード数")
+    rejected: int = Field(0, description="検証に失敗したレコード数")
+
+    @classmethod
+    def load(cls, path: Path, source: str, source_format: SourceFormat) -> "Checkpoint":
+        """チェックポイントを読み込む (存在しない場合は先頭から開始する)
+
+        Raises:
+            ValueError: 別のファイルのチェックポイントの場合
+        """
+        if not path.exists():
+            return cls(source=source, format=source_format)
+        checkpoint = cls.model_validate_json(path.read_text())
+        if checkpoint.source != source or checkpoint.format != source_format:
+            raise ValueError(
+                f"Checkpoint {path} belongs to {checkpoint.source}; "
+                "use --checkpoint or --restart"
+            )
+        return checkpoint
+
+    def save(self, path: Path) -> None:
+        """チェックポイントを一時ファイル経由で置き換えて保存する"""
+        tmp = path.with_name(f"{path.name}.tmp")
+        tmp.write_text(self.model_dump_json())
+        os.replace(tmp, path)
+
+
+class AdaptiveWindow:
+    """同時に書き込むバッチ数をAIMD (加算増加・乗算減少) で調整するクラス
+
+    失敗 (スロットリングなど) が起きると上限を半減し、
+    成功するたびに上限 1 つ分につき 1 ずつ戻す。
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.limit = float(max_size)
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """書き込み枠が空くまで待機する"""
+        with self._condition:
+            while self.in_flight >= max(int(self.limit), 1):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self) -> None:
+        """書き込み枠を返す"""
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    def record(self, throttled: bool) -> None:
+        """書き込み結果に応じて上限を調整する"""
+        with self._condition:
+            if throttled:
+                self.limit = max(self.limit / 2, 1.0)
+            else:
+                self.limit = min(self.limit + 1 / self.limit, float(self.max_size))
+            self._condition.notify_all()
+
+
+def detect_format(source: str) -> SourceFormat:
+    """拡張子から読み込み元の形式を判定する"""
+    name = source.removesuffix(".gz").lower()
+    if name.endswith(".csv"):
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl", ".json")):
+        return "ndjson"
+    raise ValueError(f"Cannot detect format of {source}; use --format")
+
+
+def open_source(source: str, offset: int) -> IO[bytes]:
+    """読み込み元を開き、展開後のバイト位置offsetから読み込めるストリームを返す
+
+    非圧縮の場合はシーク (S3はRangeの指定) で再開位置から読み込む。
+    gzipの場合は先頭から展開し、再開位置まで読み飛ばす。
+    """
+    compressed = source.endswith(".gz")
+    start = 0 if compressed else offset
+    if source.startswith("s3://"):
+        from botocore.exceptions import ClientError
+
+        from core.aws import get_s3_client
+
+        bucket, _, key = source.removeprefix("s3://").partition("/")
+        params = {"Bucket": bucket, "Key": key}
+        if start:
+            params["Range"] = f"bytes={start}-"
+        try:
+            raw: IO[bytes] = get_s3_client().get_object(**params)["Body"]
+        except ClientError as e:
+            # 前回の実行で最後まで書き込み済みの場合は、再開位置がファイルの末尾になる
+            if e.response.get("Error", {}).get("Code") != "InvalidRange":
+                raise
+            return io.BytesIO()
+    else:
+        raw = open(source, "rb")
+        raw.seek(start)
+    if not compressed:
+        return raw
+    stream: IO[bytes] = gzip.GzipFile(fileobj=raw)
+    remaining = offset
+    while remaining:
+        skipped = len(stream.read(min(remaining, READ_CHUNK_BYTES)))
+        if not skipped:
+            break
+        remaining -= skipped
+    return stream
+
+
+class LineReader:
+    """ストリームを1行ずつ文字列として返し、読み込んだ位置を記録するクラス"""
+
+    def __init__(self, stream: IO[bytes], offset: int, line: int) -> None:
+        self.stream = stream
+        self.offset = offset
+        self.line = line
+
+    def __iter__(self) -> Iterator[str]:
+        rest = b""
+        while chunk := self.stream.read(READ_CHUNK_BYTES):
+            *lines, rest = (rest + chunk).split(b"\n")
+            for line in lines:
+                yield self._decode(line + b"\n")
+        if rest:
+            yield self._decode(rest)
+
+    def _decode(self, line: bytes) -> str:
+        # ファイル先頭のBOMは読み飛ばす
+        encoding = "utf-8-sig" if self.offset == 0 else "utf-8"
+        self.offset += len(line)
+        self.line += 1
+        return line.decode(encoding)
+
+
+# 1レコード分の読み込み結果 (行番号, レコードまたはエラー内容, 読み込み後の位置)
+Record = tuple[int, dict[str, Any] | str, int]
+
+
+def csv_records(reader: LineReader, checkpoint: Checkpoint) -> Iterator[Record]:
+    """CSVを1レコードずつ読み込む (ヘッダーはチェックポイントに保存する)"""
+    rows = csv.reader(reader)
+    if checkpoint.header is None:
+        checkpoint.header = next(rows, None)
+        if checkpoint.header is None:
+            return
+    header = checkpoint.header
+    for row in rows:
+        if not row:
+            continue
+        if len(row) != len(header):
+            record: dict[str, Any] | str = (
+                f"Expected {len(header)} columns, got {len(row)}"
+            )
+        else:
+            record = {
+                name: (value if value != "" or name != "publisher" else None)
+                for name, value in zip(header, row)
+            }
+        yield reader.line, record, reader.offset
+
+
+def ndjson_records(reader: LineReader) -> Iterator[Record]:
+    """NDJSONを1レコードずつ読み込む (空行は読み飛ばす)"""
+    for line in reader:
+        if not line.strip():
+            continue
+        try:
+            record: dict[str, Any] | str = json.loads(line)
+        except json.JSONDecodeError as e:
+            record = f"Invalid JSON: {e}"
+        yield reader.line, record, reader.offset
+
+
+def batched_records(records: Iterable[Record], size: int) -> Iterator[list[Record]]:
+    """レコードを一定件数ずつまとめる"""
+    batch: list[Record] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def validate_batch(
+    batch: list[Record],
+) -> tuple[list[tuple[int, Book]], list[tuple[int, str]]]:
+    """レコードをまとめて検証し、書籍情報と検証エラーをそれぞれ行番号と組にして分ける"""
+    errors = {
+        i: record for i, (_, record, _) in enumerate(batch) if isinstance(record, str)
+    }
+    candidates = [
+        (i, record) for i, (_, record, _) in enumerate(batch) if i not in errors
+    ]
+    try:
+        books = books_adapter.validate_python([record for _, record in candidates])
+    except ValidationError as e:
+        invalid: dict[int, list[str]] = {}
+        for error in e.errors(include_url=False):
+            index = candidates[int(error["loc"][0])][0]
+            field = ".".join(str(part) for part in error["loc"][1:]) or "record"
+            invalid.setdefault(index, []).append(f"{field}: {error['msg']}")
+        errors.update({i: "; ".join(messages) for i, messages in invalid.items()})
+        candidates = [(i, record) for i, record in candidates if i not in invalid]
+        books = books_adapter.validate_python([record for _, record in candidates])
+    return (
+        [(batch[i][0], book) for (i, _), book in zip(candidates, books)],
+        [(batch[i][0], error) for i, error in sorted(errors.items())],
+    )
+
+
+class BookLoader:
+    """検証済みの書籍情報をバッチ単位で並列に書き込み、完了位置を記録するクラス"""
+
+    def __init__(
+        self,
+        checkpoint: Checkpoint,
+        checkpoint_path: Path,
+        rejects: IO[str],
+        workers: int,
+        max_retries: int,
+        progress_seconds: float,
+    ) -> None:
+        self.checkpoint = checkpoint
+        self.checkpoint_path = checkpoint_path
+        self.rejects = rejects
+        self.window = AdaptiveWindow(workers)
+        self.max_retries = max_retries
+        self.progress_seconds = progress_seconds
+        self.started = time.perf_counter()
+        self.loaded_at_start = checkpoint.loaded
+        self._last_progress = self.started
+        self._rejects_lock = threading.Lock()
+
+    def reject(self, line: int, error: str) -> None:
+        """書き込まないレコードの行番号とエラー内容を書き出す"""
+        with self._rejects_lock:
+            self.rejects.write(json.dumps({"line": line, "error": error}) + "\n")
+            self.checkpoint.rejected += 1
+
+    def write(self, books: list[tuple[int, Book]]) -> int:
+        """書籍情報を書き込み、失敗した項目はバックオフして再送する
+
+        スロットリングや未処理項目による失敗のみを再送し、同時に書き込むバッチ数を
+        減らす。再送しても成功しない失敗 (ValidationExceptionなど) は書き出して
+        読み飛ばす。
+
+        Args:
+            books (list[tuple[int, Book]]): 行番号と書籍情報の一覧
+
+        Returns:
+            int: 書き込んだレコード数
+
+        Raises:
+            LoadError: 再送しても書き込めなかった場合
+        """
+        from db.book import backoff_seconds, batch_write_books
+        from model.book import BookWriteOperation
+
+        pending = [(line, BookWriteOperation(put=book)) for line, book in books]
+        written = 0
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(backoff_seconds(attempt))
+            results = batch_write_books([op for _, op in pending])
+            retry = []
+            for (line, op), result in zip(pending, results):
+                if result.status != "failed":
+                    written += 1
+                elif result.retryable:
+                    retry.append(((line, op), result))
+                else:
+                    self.reject(line, str(result.error))
+            self.window.record(throttled=bool(retry))
+            if not retry:
+                return written
+            pending = [entry for entry, _ in retry]
+        raise LoadError(
+            f"{len(pending)} books could not be written: {retry[0][1].error}"
+        )
+
+    def run(self, batches: Iterable[list[Record]]) -> None:
+        """バッチを順に検証して書き込み、完了したバッチまでの位置を保存する
+
+        書き込みは並列に行われるが、チェックポイントは先頭から連続して
+        完了したバッチの位置までしか進めないため、再開時に抜けは生じない。
+        """
+        in_flight: deque[tuple[Future[int], int, int]] = deque()
+        with ThreadPoolExecutor(max_workers=self.window.max_size) as executor:
+            try:
+                for batch in batches:
+                    books, errors = validate_batch(batch)
+                    for line, error in errors:
+                        self.reject(line, error)
+                    end_line, _, end_offset = batch[-1]
+                    # 先頭のバッチが遅れている間に、完了待ちのバッチを溜めすぎない
+                    while len(in_flight) >= self.window.max_size * 2:
+                        self._complete(in_flight.popleft())
+                    self.window.acquire()
+                    future = executor.submit(self.write, books)
+                    future.add_done_callback(lambda _: self.window.release())
+                    in_flight.append((future, end_offset, end_line))
+                    while in_flight and in_flight[0][0].done():
+                        self._complete(in_flight.popleft())
+                while in_flight:
+                    self._complete(in_flight.popleft())
+            except BaseException:
+                for future, *_ in in_flight:
+                    future.cancel()
+                raise
+            finally:
+                self.checkpoint.save(self.checkpoint_path)
+                self.rejects.flush()
+
+    def _complete(self, entry: tuple[Future[int], int, int]) -> None:
+        future, offset, line = entry
+        written = future.result()
+        self.checkpoint.offset = offset
+        self.checkpoint.line = line
+        self.checkpoint.loaded += written
+        self.checkpoint.save(self.checkpoint_path)
+        now = time.perf_counter()
+        if now - self._last_progress >= self.progress_seconds:
+            self._last_progress = now
+            print(self.progress(), file=sys.stderr)
+
+    def records_per_second(self) -> float:
+        """今回の実行で書き込んだレコード数の1秒あたりの件数"""
+        elapsed = time.perf_counter() - self.started
+        return (self.checkpoint.loaded - self.loaded_at_start) / max(elapsed, 1e-9)
+
+    def progress(self) -> str:
+        """進捗を1行で返す"""
+        return (
+            f"line {self.checkpoint.line}: loaded {self.checkpoint.loaded}, "
+            f"rejected {self.checkpoint.rejected}, "
+            f"{self.records_per_second():.0f} records/s, "
+            f"window {int(self.window.limit)}/{self.window.max_size}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="読み込み元のファイル (パスまたはs3://...)")
+    parser.add_argument(
+        "--table",
+        default=os.environ.get("BOOKS_TABLE_NAME"),
+        help="書籍テーブル名 (既定値: BOOKS_TABLE_NAME)",
+    )
+    parser.add_argument(
+        "--format", choices=["csv", "ndjson"], default=None, help="読み込み元の形式"
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=1000, help="まとめて検証・書き込む件数"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=4, help="同時に書き込むバッチ数の上限"
+    )
+    parser.add_argument(
+        "--max-retries", type=int, default=5, help="失敗した項目を再送する最大回数"
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=None,
+        help="チェックポイントファイル (既定値: <ファイル名>.checkpoint.json)",
+    )
+    parser.add_argument(
+        "--rejects",
+        type=Path,
+        default=None,
+        help="検証エラーの出力先 (既定値: <ファイル名>.rejects.ndjson)",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="チェックポイントを無視して先頭から読み込む",
+    )
+    parser.add_argument(
+        "--progress-seconds", type=float, default=5.0, help="進捗を表示する間隔"
+    )
+    args = parser.parse_args()
+    if args.table is None:
+        parser.error("--table or BOOKS_TABLE_NAME is required")
+    try:
+        source_format: SourceFormat = args.format or detect_format(args.source)
+    except ValueError as e:
+        parser.error(str(e))
+
+    # テーブル名などは読み込み時に環境変数から設定されるため、先に設定しておく
+    # (アクセスログは出力しないため、ログ関連の設定は仮の値でよい)
+    os.environ["BOOKS_TABLE_NAME"] = args.table
+    os.environ.setdefault("LOG_BUCKET_NAME", "")
+    os.environ.setdefault("PROJECT_MAJOR_VERSION", "v1")
+    os.environ.setdefault("AWS_RETRY_MODE", "adaptive")
+    # バッチごとにbatch_max_workers (既定値8) 個のリクエストが並列に送られる
+    os.environ.setdefault("AWS_MAX_POOL_CONNECTIONS", str(args.workers * 8))
+
+    name = Path(args.source.removeprefix("s3://")).name
+    checkpoint_path = args.checkpoint or Path(f"{name}.checkpoint.json")
+    rejects_path = args.rejects or Path(f"{name}.rejects.ndjson")
+    if args.restart:
+        checkpoint_path.unlink(missing_ok=True)
+    checkpoint = Checkpoint.load(checkpoint_path, args.source, source_format)
+    if checkpoint.line:
+        print(f"resuming after line {checkpoint.line}", file=sys.stderr)
+
+    stream = open_source(args.source, checkpoint.offset)
+    reader = LineReader(stream, checkpoint.offset, checkpoint.line)
+    records = (
+        csv_records(reader, checkpoint)
+        if source_format == "csv"
+        else ndjson_records(reader)
+    )
+    with stream, open(rejects_path, "a", encoding="utf-8") as rejects:
+        loader = BookLoader(
+            checkpoint,
+            checkpoint_path,
+            rejects,
+            workers=args.workers,
+            max_retries=args.max_retries,
+            progress_seconds=args.progress_seconds,
+        )
+        try:
+            loader.run(batched_records(records, args.batch_size))
+        except (LoadError, KeyboardInterrupt) as e:
+            print(loader.progress(), file=sys.stderr)
+            print(
+                f"stopped: {str(e) or 'interrupted'}; rerun the same command to resume",
+                file=sys.stderr,
+            )
+            sys.exit(1)
+    print(loader.progress(), file=sys.stderr)
+    print(f"done; rejected records are in {rejects_path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
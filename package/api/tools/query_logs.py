@@ -0,0 +1,436 @@
+"""S3上のアクセスログを並列に読み込み、絞り込み・集計するツール
+
+指定した時間範囲を1時間ごとのシャードに分け、``logs/YYYY/MM/DD/HH`` (または
+compact_logsが書き出した ``compacted/dt=YYYY-MM-DD/hour=HH/``) のプレフィックスを
+並列に一覧取得し、オブジェクトを上限付きのスレッドプールでダウンロードしながら
+``AccessLog`` として1件ずつ読み込む。イベントの種類・ISBNでの絞り込みと、
+種類別・ISBN別の件数、時間ごとのヒストグラムを集計できる。
+
+シャードはログオブジェクトを書き出した時刻で分かれているため、遅れて書き出された
+レコード (バッファリングや退避からの再送) を拾えるよう、終了時刻から ``--lag-hours``
+分先のシャードまで読み込み、レコードのタイムスタンプで絞り込む。
+
+書き込みが終わった時間のシャードは、読み込んだレコードをプレフィックスごとに
+ローカルのキャッシュ (gzip圧縮したNDJSON) に保存し、次回以降はS3を読まずに集計する。
+
+使い方:
+    uv run python -m tools.query_logs --bucket <bucket> --start 2025-01-01 \\
+        --end 2025-01-02 --isbn 9784000000000 --action retrieved
+    uv run python -m tools.query_logs --bucket <bucket> --count-by isbn --top 10
+    uv run python -m tools.query_logs --bucket <bucket> --histogram minute \\
+        --start 2025-01-01T09:30 --end 2025-01-01T10:00
+"""
+
+import argparse
+import datetime
+import gzip
+import os
+import re
+import time
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Literal, Self
+
+from pydantic import BaseModel, Field
+
+from core.compression import codec_of, iter_lines, open_decompressed
+from model.log import AccessLog
+from tools.compact_logs import (
+    SOURCE_SUFFIXES,
+    bounded_map,
+    create_client,
+    hours_between,
+    partition_prefix,
+    source_prefix,
+)
+
+# アクセスログのイベント (例: "Book with ISBN 9784000000000 retrieved")
+BOOK_EVENT = re.compile(r"^Book with ISBN (?P<isbn>\S+) (?P<action>\w+)$")
+# 書籍全体へのイベント (例: "Books exported as csv")
+BOOKS_EVENT = re.compile(r"^Books (?P<action>\w+)")
+
+# 書き込みが終わったとみなすまでの時間 (ログシンクの書き出し遅延を考慮する)
+SETTLE_DELAY = datetime.timedelta(minutes=15)
+
+# 終了時刻より後に読み込むシャードの時間 (ログの書き出しの遅れを考慮する)
+DEFAULT_LAG = datetime.timedelta(hours=1)
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "dynamodb-s3-sample" / "logs"
+
+LogSource = Literal["raw", "compacted"]
+CountBy = Literal["type", "isbn", "event"]
+Histogram = Literal["minute", "hour", "day"]
+
+# ヒストグラムの区切りごとの時刻の書式
+HISTOGRAM_FORMATS: dict[Histogram, str] = {
+    "minute": "%Y-%m-%dT%H:%M",
+    "hour": "%Y-%m-%dT%H",
+    "day": "%Y-%m-%d",
+}
+
+
+class LogRecord(BaseModel):
+    """集計用に解析したアクセスログを管理するオブジェクトクラス"""
+
+    timestamp: datetime.datetime = Field(..., description="ログのタイムスタンプ (UTC)")
+    event: str = Field(..., description="イベントの内容")
+    type: str = Field(..., description="イベントの種類 (例: retrieved)")
+    isbn: str | None = Field(None, description="対象の書籍のISBNコード")
+
+    @classmethod
+    def parse(cls, line: bytes) -> "LogRecord":
+        """NDJSONの1行をAccessLogとして検証し、集計用の項目を取り出す
+
+        Raises:
+            ValueError: AccessLogとして読めない場合 (タイムスタンプの形式を含む)
+        """
+        log = AccessLog.model_validate_json(line)
+        timestamp = datetime.datetime.fromisoformat(log.timestamp)
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=datetime.UTC)
+        match = BOOK_EVENT.match(log.event) or BOOKS_EVENT.match(log.event)
+        groups = match.groupdict() if match else {}
+        return cls(
+            timestamp=timestamp.astimezone(datetime.UTC),
+            event=log.event,
+            type=groups.get("action", log.event),
+            isbn=groups.get("isbn"),
+        )
+
+
+class LogFilter(BaseModel):
+    """レコードの絞り込み条件を管理するオブジェクトクラス"""
+
+    start: datetime.datetime = Field(..., description="対象の開始時刻 (UTC)")
+    end: datetime.datetime = Field(..., description="対象の終了時刻 (UTC, 含まない)")
+    isbn: str | None = Field(None, description="ISBNコード")
+    type: str | None = Field(None, description="イベントの種類")
+    contains: str | None = Field(None, description="イベントに含まれる文字列")
+
+    def matches(self, record: LogRecord) -> bool:
+        """レコードが条件に一致するかどうかを返す"""
+        return (
+            self.start <= record.timestamp < self.end
+            and (self.isbn is None or record.isbn == self.isbn)
+            and (self.type is None or record.type == self.type)
+            and (self.contains is None or self.contains in record.event)
+        )
+
+
+class QueryResult(BaseModel):
+    """集計結果を管理するオブジェクトクラス"""
+
+    objects: int = Field(0, description="S3から読み込んだオブジェクト数")
+    cached_shards: int = Field(0, description="キャッシュから読み込んだシャード数")
+    scanned: int = Field(0, description="読み込んだレコード数")
+    invalid: int = Field(0, description="AccessLogとして読めなかった行数")
+    matched: int = Field(0, description="条件に一致したレコード数")
+    counts: dict[str, int] = Field(default_factory=dict, description="グループ別件数")
+    histogram: dict[str, int] = Field(default_factory=dict, description="時間別件数")
+    elapsed_seconds: float = Field(0.0, description="所要時間")
+
+    def format(self) -> str:
+        """集計結果を表形式で返す"""
+        lines = [
+            f"matched {self.matched} of {self.scanned} records "
+            f"({self.objects} objects, {self.cached_shards} cached shards, "
+            f"{self.invalid} invalid) in {self.elapsed_seconds:.1f} s"
+        ]
+        for title, values in (("count", self.counts), ("histogram", self.histogram)):
+            if values:
+                lines.append(f"{title}:")
+                width = max(len(key) for key in values)
+                lines.extend(f"  {key:<{width}} {n:>10}" for key, n in values.items())
+        return "\n".join(lines)
+
+
+def parse_time(value: str) -> datetime.datetime:
+    """ISO 8601形式の文字列をUTCの日時に変換する (タイムゾーンがなければUTC)"""
+    time_ = datetime.datetime.fromisoformat(value)
+    if time_.tzinfo is None:
+        time_ = time_.replace(tzinfo=datetime.UTC)
+    return time_.astimezone(datetime.UTC)
+
+
+def floor_hour(time_: datetime.datetime) -> datetime.datetime:
+    """時刻を1時間単位に切り捨てる"""
+    return time_.replace(minute=0, second=0, microsecond=0)
+
+
+class LogQuery:
+    """アクセスログを時間単位のシャードごとに並列に読み込むクラス"""
+
+    def __init__(
+        self,
+        client: Any,
+        bucket: str,
+        source: LogSource = "raw",
+        max_workers: int = 32,
+        cache_dir: Path | None = DEFAULT_CACHE_DIR,
+        lag: datetime.timedelta = DEFAULT_LAG,
+    ) -> None:
+        """LogQueryを初期化する
+
+        Args:
+            client (Any): botocoreのS3クライアント
+            bucket (str): ログが保存されているS3バケット名
+            source (LogSource): 読み込むログ (rawは元のログ、compactedはまとめたログ)
+            max_workers (int): ダウンロードの並列数
+            cache_dir (Path | None): キャッシュの保存先 (Noneの場合は使用しない)
+            lag (datetime.timedelta): 終了時刻より後に読み込むシャードの時間
+                (ログの書き出しがどれだけ遅れうるか)
+        """
+        self.client = client
+        self.bucket = bucket
+        self.source = source
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+        self.lag = lag
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="query")
+        self.result = QueryResult()
+
+    def close(self) -> None:
+        """ダウンロード用のスレッドプールを終了する"""
+        self.executor.shutdown()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def prefix(self, hour: datetime.datetime) -> str:
+        """シャード (1時間分) のプレフィックス"""
+        if self.source == "compacted":
+            return partition_prefix(hour)
+        return source_prefix(hour)
+
+    def cache_path(self, hour: datetime.datetime) -> Path | None:
+        """シャードのキャッシュファイルのパス (キャッシュしない場合はNone)
+
+        書き込み中の可能性がある直近のシャードはキャッシュしない。
+        """
+        settled = hour + datetime.timedelta(hours=1) + SETTLE_DELAY
+        if self.cache_dir is None or settled > datetime.datetime.now(datetime.UTC):
+            return None
+        name = self.prefix(hour).strip("/").replace("/", "_")
+        return self.cache_dir / self.bucket / f"{name}.ndjson.gz"
+
+    def list_keys(self, hour: datetime.datetime) -> list[str] | None:
+        """シャードのオブジェクトのキーを返す (キャッシュがある場合はNone)"""
+        path = self.cache_path(hour)
+        if path is not None and path.exists():
+            return None
+        paginator = self.client.get_paginator("list_objects_v2")
+        keys = []
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix(hour)):
+            keys.extend(
+                item["Key"]
+                for item in page.get("Contents", [])
+                if item["Key"].endswith(SOURCE_SUFFIXES)
+            )
+        return sorted(keys)
+
+    def download(self, key: str) -> list[bytes]:
+        """ログオブジェクトを展開しながら取得し、行に分けて返す"""
+        response = self.client.get_object(Bucket=self.bucket, Key=key)
+        codec = codec_of(key, response.get("ContentEncoding"))
+        with response["Body"] as body:
+            return list(iter_lines(open_decompressed(body, codec)))
+
+    def shard_lines(
+        self, hour: datetime.datetime, keys: list[str] | None
+    ) -> Iterator[bytes]:
+        """シャードの行をキャッシュまたはS3から順に返す
+
+        S3から読み込んだ行は一時ファイルに書き込み、最後まで読み込めた場合のみ
+        キャッシュとして保存する。
+        """
+        path = self.cache_path(hour)
+        if keys is None and path is not None:
+            self.result.cached_shards += 1
+            with gzip.open(path, "rb") as cache:
+                for line in cache:
+                    yield line.rstrip(b"\n")
+            return
+
+        assert keys is not None
+        cache = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            cache = gzip.open(tmp, "wb")
+        try:
+            for lines in bounded_map(
+                self.executor, self.download, keys, self.max_workers * 2
+            ):
+                self.result.objects += 1
+                for line in lines:
+                    if cache is not None:
+                        cache.write(line + b"\n")
+                    yield line
+        except BaseException:
+            if cache is not None:
+                cache.close()
+                tmp.unlink(missing_ok=True)
+            raise
+        if cache is not None and path is not None:
+            cache.close()
+            os.replace(tmp, path)
+
+    def records(
+        self, start: datetime.datetime, end: datetime.datetime
+    ) -> Iterator[LogRecord]:
+        """時間範囲のレコードが書き出されうるシャードのレコードを順に返す
+
+        シャードは書き出した時刻で分かれているため、終了時刻からlag分先の
+        シャードまで読み込む (範囲外のレコードも返すため、呼び出し側で絞り込む)。
+        シャードのオブジェクト一覧は並列に取得し、先のシャードの読み込み中に
+        後のシャードの一覧を用意しておく。
+        """
+        hours = hours_between(floor_hour(start), end + self.lag)
+        with ThreadPoolExecutor(8, thread_name_prefix="list") as list_executor:
+            listings = bounded_map(list_executor, self.list_keys, hours, 8)
+            for hour, keys in zip(hours, listings, strict=True):
+                for line in self.shard_lines(hour, keys):
+                    self.result.scanned += 1
+                    try:
+                        yield LogRecord.parse(line)
+                    except ValueError:
+                        self.result.invalid += 1
+
+    def run(
+        self,
+        log_filter: LogFilter,
+        count_by: CountBy | None = None,
+        histogram: Histogram | None = None,
+        top: int = 20,
+    ) -> QueryResult:
+        """条件に一致するレコードを数え、グループ別・時間別に集計する"""
+        started = time.perf_counter()
+        counts: Counter[str] = Counter()
+        buckets: Counter[str] = Counter()
+        for record in self.matching(log_filter):
+            if count_by is not None:
+                counts[getattr(record, count_by) or "-"] += 1
+            if histogram is not None:
+                buckets[record.timestamp.strftime(HISTOGRAM_FORMATS[histogram])] += 1
+        self.result.counts = dict(counts.most_common(top))
+        self.result.histogram = dict(sorted(buckets.items()))
+        self.result.elapsed_seconds = time.perf_counter() - started
+        return self.result
+
+    def matching(self, log_filter: LogFilter) -> Iterator[LogRecord]:
+        """条件に一致するレコードを順に返す"""
+        for record in self.records(log_filter.start, log_filter.end):
+            if log_filter.matches(record):
+                self.result.matched += 1
+                yield record
+
+
+def print_records(records: Iterable[LogRecord]) -> None:
+    """レコードをNDJSONで標準出力に書き出す"""
+    for record in records:
+        print(record.model_dump_json())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--bucket",
+        default=os.environ.get("LOG_BUCKET_NAME"),
+        help="ログが保存されているS3バケット名 (既定値: LOG_BUCKET_NAME)",
+    )
+    parser.add_argument(
+        "--start",
+        type=parse_time,
+        default=None,
+        help="対象の開始時刻 (ISO 8601, UTC, 既定値: 終了時刻の24時間前)",
+    )
+    parser.add_argument(
+        "--end",
+        type=parse_time,
+        default=None,
+        help="対象の終了時刻 (ISO 8601, UTC, 含まない, 既定値: 現在時刻)",
+    )
+    parser.add_argument(
+        "--source",
+        choices=["raw", "compacted"],
+        default="raw",
+        help="読み込むログ (compactedはcompact_logsでまとめたログ)",
+    )
+    parser.add_argument("--isbn", default=None, help="ISBNコードで絞り込む")
+    parser.add_argument(
+        "--action",
+        default=None,
+        help="イベントの種類で絞り込む (created/retrieved/updated/deleted など)",
+    )
+    parser.add_argument(
+        "--contains", default=None, help="イベントに含まれる文字列で絞り込む"
+    )
+    parser.add_argument(
+        "--count-by", choices=["type", "isbn", "event"], default=None, help="集計単位"
+    )
+    parser.add_argument(
+        "--histogram",
+        choices=sorted(HISTOGRAM_FORMATS),
+        default=None,
+        help="時間ごとの件数を集計する",
+    )
+    parser.add_argument("--top", type=int, default=20, help="表示するグループ数")
+    parser.add_argument(
+        "--records",
+        action="store_true",
+        help="集計せずに一致したレコードをNDJSONで出力する",
+    )
+    parser.add_argument(
+        "--lag-hours",
+        type=float,
+        default=DEFAULT_LAG.total_seconds() / 3600,
+        help="終了時刻より後に読み込むシャードの時間 (ログの書き出しの遅れ、"
+        f"既定値: {DEFAULT_LAG.total_seconds() / 3600:g})",
+    )
+    parser.add_argument("--workers", type=int, default=32, help="並列数")
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=DEFAULT_CACHE_DIR,
+        help=f"キャッシュの保存先 (既定値: {DEFAULT_CACHE_DIR})",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="キャッシュを使用しない"
+    )
+    parser.add_argument("--json", action="store_true", help="JSON形式で出力する")
+    args = parser.parse_args()
+    if args.bucket is None:
+        parser.error("--bucket or LOG_BUCKET_NAME is required")
+
+    end = args.end or datetime.datetime.now(datetime.UTC)
+    start = args.start or end - datetime.timedelta(hours=24)
+    log_filter = LogFilter(
+        start=start,
+        end=end,
+        isbn=args.isbn,
+        type=args.action,
+        contains=args.contains,
+    )
+    with LogQuery(
+        create_client(args.workers),
+        args.bucket,
+        source=args.source,
+        max_workers=args.workers,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        lag=datetime.timedelta(hours=args.lag_hours),
+    ) as query:
+        if args.records:
+            print_records(query.matching(log_filter))
+            return
+
+        result = query.run(log_filter, args.count_by, args.histogram, args.top)
+    print(result.model_dump_json(indent=2) if args.json else result.format())
+
+
+if __name__ == "__main__":
+    main()
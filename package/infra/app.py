@@ -14,13 +14,13 @@ def add_name_tag(scope):  # noqa: ANN001, ANN201
 # Initialize the CDK application
 app = cdk.App()
 
-# Define the project metadata
-project = Project()
+# Define the project metadata (select an environment with -c environment=<name>)
+project = Project(environment=app.node.try_get_context("environment"))
 
 # 統合アプリケーションスタック
 app_stack = AppStack(
     scope=app,
-    construct_id=f"{project.camel_case_name}App",
+    construct_id=project.stack_name,
     project=project,
     env=cdk.Environment(
         region="ap-northeast-1",
@@ -9,6 +9,31 @@ from constructs import Construct
 
 from src.model.project import Project
 
+ARCHITECTURES = {
+    "arm64": lambda_.Architecture.ARM_64,
+    "x86_64": lambda_.Architecture.X86_64,
+}
+
+
+# Function code with precompiled bytecode, built by api/tools/build_function.py
+FUNCTION_CODE_PATH = Path(__file__).resolve().parents[4] / ".function"
+
+# Development-only files in the api package that are not needed at runtime
+# (used when the precompiled function code has not been built)
+FUNCTION_CODE_EXCLUDES = [
+    "bench",
+    "tests",
+    "tools",
+    ".bench",
+    ".venv",
+    ".pytest_cache",
+    ".ruff_cache",
+    "**/__pycache__",
+    "moon.yml",
+    "uv.lock",
+    "README.md",
+]
+
 
 class LambdaConstruct(Construct):
     """Lambda function construct for FastAPI backend."""
@@ -30,6 +55,13 @@ class LambdaConstruct(Construct):
         """
         super().__init__(scope, construct_id, **kwargs)
 
+        if project.lambda_snap_start and project.lambda_provisioned_concurrency > 0:
+            raise ValueError(
+                "SnapStart cannot be combined with provisioned concurrency; "
+                "set either lambda_snap_start or lambda_provisioned_concurrency"
+            )
+        architecture = ARCHITECTURES[project.lambda_architecture]
+
         # Create custom execution role to replace AWS managed policy
         self.execution_role = iam.Role(
             self,
@@ -43,14 +75,10 @@ class LambdaConstruct(Construct):
         self.dependencies_layer = lambda_.LayerVersion(
             self,
             "LayerVersion",
-            code=lambda_.Code.from_asset(
-                layer_path,
-                exclude=[
-                    "**/__pycache__",
-                    "**/*.pyc",
-                ],
-            ),
+            # Built by api/tools/build_layer.py, which ships precompiled bytecode
+            code=lambda_.Code.from_asset(layer_path),
             compatible_runtimes=[lambda_.Runtime.PYTHON_3_13],
+            compatible_architectures=[architecture],
             description=project.description,
         )
 
@@ -77,8 +105,15 @@ class LambdaConstruct(Construct):
             "Function",
             runtime=lambda_.Runtime.PYTHON_3_13,
             handler="main.handler",
-            code=lambda_.Code.from_asset("../api"),
-            memory_size=5192,
+            code=self._function_code(),
+            architecture=architecture,
+            memory_size=project.lambda_memory_size,
+            reserved_concurrent_executions=project.lambda_reserved_concurrency,
+            snap_start=(
+                lambda_.SnapStartConf.ON_PUBLISHED_VERSIONS
+                if project.lambda_snap_start
+                else None
+            ),
             timeout=cdk.Duration.seconds(15),
             role=self.execution_role,  # type: ignore
             layers=[
@@ -92,9 +127,43 @@ class LambdaConstruct(Construct):
                 "PROJECT_NAME": project.name,
                 "PROJECT_MAJOR_VERSION": project.major_version,
                 "PROJECT_SEMANTIC_VERSION": project.semantic_version,
+                "PROJECT_DESCRIPTION": project.summary,
+                # Provisioned environments prime clients and the app during init;
+                # SnapStart primes through its before-snapshot runtime hook instead
+                "PRIME_ON_INIT": str(
+                    project.lambda_provisioned_concurrency > 0
+                ).lower(),
             },
         )
 
+        # Provisioned concurrency and SnapStart only apply to published versions,
+        # so route traffic through an alias on the current version
+        self.alias: lambda_.Alias | None = None
+        if project.lambda_snap_start or project.lambda_provisioned_concurrency > 0:
+            self.alias = lambda_.Alias(
+                self,
+                "LiveAlias",
+                alias_name="live",
+                version=self.function.current_version,
+                provisioned_concurrent_executions=(
+                    project.lambda_provisioned_concurrency or None
+                ),
+            )
+            if (
+                project.lambda_provisioned_concurrency_max
+                > project.lambda_provisioned_concurrency
+                > 0
+            ):
+                self.alias.add_auto_scaling(
+                    min_capacity=project.lambda_provisioned_concurrency,
+                    max_capacity=project.lambda_provisioned_concurrency_max,
+                ).scale_on_utilization(
+                    utilization_target=project.lambda_provisioned_utilization_target,
+                )
+
+        # Target for integrations: the alias when versions are published
+        self.entrypoint: lambda_.IFunction = self.alias or self.function
+
         # Suppress CDK Nag for necessary log stream wildcard permissions on DefaultPolicy
         # Use construct ID pattern matching to avoid circular dependency
         NagSuppressions.add_resource_suppressions_by_path(
@@ -125,6 +194,14 @@ class LambdaConstruct(Construct):
             description="Lambda function ARN",
         )
 
+        if self.alias is not None:
+            cdk.CfnOutput(
+                self,
+                "AliasArn",
+                value=self.alias.function_arn,
+                description="Lambda live alias ARN",
+            )
+
         cdk.CfnOutput(
             self,
             "DependenciesLayerArn",
@@ -132,6 +209,18 @@ class LambdaConstruct(Construct):
             description="Lambda dependencies layer ARN",
         )
 
+    @staticmethod
+    def _function_code() -> lambda_.Code:
+        """Use the precompiled function code when it has been built.
+
+        Lambda's code directory is read-only, so without .pyc files the app
+        modules are compiled again on every cold start. The api sources are
+        used as-is when the build output is missing (e.g. in tests).
+        """
+        if FUNCTION_CODE_PATH.is_dir():
+            return lambda_.Code.from_asset(str(FUNCTION_CODE_PATH))
+        return lambda_.Code.from_asset("../api", exclude=FUNCTION_CODE_EXCLUDES)
+
 
 # LogGroup output removed due to circular dependency
 # Log group is automatically created by Lambda function
@@ -9,6 +9,17 @@ from constructs import Construct
 
 from src.model.project import Project
 
+# Static routes under /books (see package/api/router/books.py). They are
+# declared explicitly when the stage cache is enabled so that API Gateway
+# never matches them against {isbn}, and caching is turned off for them.
+UNCACHED_BOOK_PATHS = (
+    "export",
+    "batch",
+    "batch-get",
+    "by-author/{author}",
+    "by-publisher/{publisher}",
+)
+
 
 class ApigwConstruct(Construct):
     """API Gateway construct for FastAPI backend."""
@@ -43,9 +54,27 @@ class ApigwConstruct(Construct):
             deploy_options=apigw.StageOptions(
                 logging_level=apigw.MethodLoggingLevel.ERROR,
                 stage_name=project.major_version,
+                # Throttle at the edge so bursts are rejected before reaching Lambda
+                throttling_rate_limit=project.api_throttle_rate_limit,
+                throttling_burst_limit=project.api_throttle_burst_limit,
+                # Optional stage cache for book reads (see add_cached_book_routes)
+                cache_cluster_enabled=project.api_cache_enabled or None,
+                cache_cluster_size=(
+                    project.api_cache_size if project.api_cache_enabled else None
+                ),
+                method_options=self._method_options(project) or None,
+            ),
+            default_method_options=apigw.MethodOptions(
+                api_key_required=project.api_key_required or None,
             ),
         )
 
+        if project.api_cache_enabled:
+            self.add_cached_book_routes(function)
+
+        for plan in project.api_usage_plans:
+            self.add_usage_plan(plan)
+
         # Create request validator for API Gateway to satisfy AwsSolutions-APIG2
         # This enables basic request validation at the API Gateway level
         # Note: For proxy integration, the validator will be created but may not
@@ -213,3 +242,125 @@ class ApigwConstruct(Construct):
             value=f"API-Gateway-Execution-Logs_{self.api_gateway.rest_api_id}/{self.api_gateway.deployment_stage.stage_name}",
             description="API Gateway log group name",
         )
+
+    def add_cached_book_routes(self: Self, function: lambda_.IFunction) -> None:
+        """Add explicit /books routes so GET /books/{isbn} can use the stage cache.
+
+        The greedy {proxy+} resource cannot have per-path cache keys, so the book
+        resources are declared explicitly. API Gateway allows only one variable
+        path part per parent, so the static children of /books are declared one
+        by one instead of through a sibling {proxy+}; they take precedence over
+        {isbn} and are never cached. Every method still proxies to the same
+        Lambda function; only GET /books/{isbn} is cached, keyed on the ISBN, the
+        fields query parameter and the If-None-Match header so that a cached 304
+        is never replayed to a client that sent no validator.
+
+        Args:
+            function: The Lambda function that serves the API
+        """
+        # LambdaRestApi(proxy=True) forbids add_resource on the root, so the
+        # resources are created directly with the root as parent
+        books = apigw.Resource(
+            self,
+            "BooksResource",
+            parent=self.api_gateway.root,
+            path_part="books",
+        )
+        books.add_method("ANY")
+
+        for path in UNCACHED_BOOK_PATHS:
+            parent: apigw.IResource = books
+            for part in path.split("/"):
+                resource = parent.get_resource(part)
+                if resource is None:
+                    resource = parent.add_resource(part)
+                    resource.add_method("ANY")
+                parent = resource
+
+        book = books.add_resource("{isbn}")
+        book.add_method("ANY")
+        book.add_method(
+            "GET",
+            apigw.LambdaIntegration(
+                function,
+                cache_key_parameters=[
+                    "method.request.path.isbn",
+                    "method.request.querystring.fields",
+                    "method.request.header.If-None-Match",
+                ],
+            ),
+            request_parameters={
+                "method.request.path.isbn": True,
+                "method.request.querystring.fields": False,
+                "method.request.header.If-None-Match": False,
+            },
+        )
+
+        NagSuppressions.add_resource_suppressions(
+            books,
+            [
+                {
+                    "id": "AwsSolutions-APIG4",
+                    "reason": "Publicにするため抑制する。",
+                },
+                {
+                    "id": "AwsSolutions-COG4",
+                    "reason": "Publicにするため抑制する。",
+                },
+            ],
+            apply_to_children=True,
+        )
+
+    @staticmethod
+    def _method_options(
+        project: Project,
+    ) -> dict[str, apigw.MethodDeploymentOptions]:
+        """Build per-method stage settings for caching and throttling."""
+        options: dict[str, dict[str, Any]] = {}
+        if project.api_cache_enabled:
+            for path in UNCACHED_BOOK_PATHS:
+                options[f"/books/{path}/*"] = {"caching_enabled": False}
+            options["/books/{isbn}/GET"] = {
+                "caching_enabled": True,
+                "cache_ttl": cdk.Duration.seconds(project.api_cache_ttl_seconds),
+                "cache_data_encrypted": True,
+            }
+        for path, throttling in project.api_method_throttling.items():
+            options.setdefault(path, {}).update(
+                throttling_rate_limit=throttling.get("rate_limit"),
+                throttling_burst_limit=throttling.get("burst_limit"),
+            )
+        return {
+            path: apigw.MethodDeploymentOptions(
+                logging_level=apigw.MethodLoggingLevel.ERROR, **kwargs
+            )
+            for path, kwargs in options.items()
+        }
+
+    def add_usage_plan(self: Self, plan: dict[str, Any]) -> apigw.UsagePlan:
+        """Add a usage plan with its own API key for per-client throttling.
+
+        Args:
+            plan: Usage plan settings from Project.api_usage_plans
+        """
+        name = plan["name"]
+        quota = (
+            apigw.QuotaSettings(
+                limit=plan["quota_limit"],
+                period=apigw.Period[plan.get("quota_period", "DAY")],
+            )
+            if "quota_limit" in plan
+            else None
+        )
+        usage_plan = self.api_gateway.add_usage_plan(
+            f"UsagePlan-{name}",
+            name=name,
+            throttle=apigw.ThrottleSettings(
+                rate_limit=plan.get("rate_limit"),
+                burst_limit=plan.get("burst_limit"),
+            ),
+            quota=quota,
+        )
+        usage_plan.add_api_stage(stage=self.api_gateway.deployment_stage)
+        usage_plan.add_api_key(self.api_gateway.add_api_key(f"ApiKey-{name}"))
+        return usage_plan
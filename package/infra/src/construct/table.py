@@ -1,3 +1,4 @@
+from collections.abc import Sequence
 from typing import Any, Self
 
 import aws_cdk as cdk
@@ -12,6 +13,7 @@ class DynamoDBConstruct(Construct):
         self: Self,
         scope: Construct,
         construct_id: str,
+        index_attributes: Sequence[str] = ("author", "publisher"),
         **kwargs: Any,  # noqa: ANN401
     ) -> None:
         """Initialize DynamoDB construct.
@@ -19,6 +21,7 @@ class DynamoDBConstruct(Construct):
         Args:
             scope: The scope in which to define this construct
             construct_id: The scoped construct ID
+            index_attributes: Attributes to create "<attribute>-index" GSIs for
             **kwargs: Additional keyword arguments
         """
         super().__init__(scope, construct_id, **kwargs)
@@ -38,6 +41,22 @@ class DynamoDBConstruct(Construct):
             ),
         )
 
+        # Add GSIs for the most common non-ISBN lookups (sorted by title).
+        # An existing table accepts only one new GSI per stack update.
+        for attribute_name in index_attributes:
+            self.table.add_global_secondary_index(
+                index_name=f"{attribute_name}-index",
+                partition_key=dynamodb.Attribute(
+                    name=attribute_name,
+                    type=dynamodb.AttributeType.STRING,
+                ),
+                sort_key=dynamodb.Attribute(
+                    name="title",
+                    type=dynamodb.AttributeType.STRING,
+                ),
+                projection_type=dynamodb.ProjectionType.ALL,
+            )
+
         # Output table name
         cdk.CfnOutput(
             self,
@@ -8,15 +8,38 @@ PYPROJECT_PATH = Path.cwd() / "pyproject.toml"
 class Project:
     """Project class to manage project metadata."""
 
-    def __init__(self) -> None:
-        """Initialize Project with metadata from pyproject.toml."""
-        self._metadata = self._load_metadata()
+    def __init__(
+        self,
+        settings: dict[str, Any] | None = None,
+        environment: str | None = None,
+    ) -> None:
+        """Initialize Project with metadata from pyproject.toml.
 
-    def _load_metadata(self) -> dict[str, Any]:
-        """Load project metadata from pyproject.toml."""
+        Args:
+            settings: Overrides for the [tool.infra] settings in pyproject.toml
+            environment: Name of a [tool.infra.environments.<name>] table whose
+                settings override the shared ones (None uses only the shared ones)
+        """
+        data = self._load_pyproject()
+        self._metadata = data["project"]
+        shared = dict(data.get("tool", {}).get("infra", {}))
+        environments = shared.pop("environments", {})
+        if environment is not None and environment not in environments:
+            raise ValueError(
+                f"Unknown environment: {environment} "
+                f"(expected one of {', '.join(sorted(environments))})"
+            )
+        self.environment = environment
+        self._settings = {
+            **shared,
+            **environments.get(environment, {}),
+            **(settings or {}),
+        }
+
+    def _load_pyproject(self) -> dict[str, Any]:
+        """Load pyproject.toml."""
         with open(PYPROJECT_PATH, "rb") as f:
-            data = tomllib.load(f)
-            return data["project"]  # type: ignore[no-any-return]
+            return tomllib.load(f)
 
     @property
     def name(self) -> str:
@@ -28,11 +51,22 @@ class Project:
         """Get the camel case project name."""
         return self.name[0].upper() + self.name[1:]
 
+    @property
+    def stack_name(self) -> str:
+        """Get the stack name, suffixed with the environment when one is selected."""
+        suffix = self.environment.capitalize() if self.environment else ""
+        return f"{self.camel_case_name}{suffix}App"
+
     @property
     def description(self) -> str:
         """Get the project description."""
         return f"[{self.name}] {self._metadata['description']}"
 
+    @property
+    def summary(self) -> str:
+        """Get the project description as written in pyproject.toml."""
+        return str(self._metadata["description"])
+
     @property
     def semantic_version(self) -> str:
         """Get the project semantic version."""
@@ -42,3 +76,108 @@ class Project:
     def major_version(self) -> str:
         """Get the project version."""
         return f"v{self.semantic_version.split('.')[0]}"
+
+    @property
+    def api_cache_enabled(self) -> bool:
+        """Whether to provision the API Gateway stage cache for book reads."""
+        return bool(self._settings.get("api_cache_enabled", False))
+
+    @property
+    def api_cache_size(self) -> str:
+        """API Gateway cache cluster size in GB (e.g. "0.5")."""
+        return str(self._settings.get("api_cache_size", "0.5"))
+
+    @property
+    def api_cache_ttl_seconds(self) -> int:
+        """TTL of cached GET /books/{isbn} responses in API Gateway."""
+        return int(self._settings.get("api_cache_ttl_seconds", 300))
+
+    @property
+    def api_throttle_rate_limit(self) -> float | None:
+        """Stage-wide steady-state request rate limit (requests per second)."""
+        value = self._settings.get("api_throttle_rate_limit")
+        return None if value is None else float(value)
+
+    @property
+    def api_throttle_burst_limit(self) -> int | None:
+        """Stage-wide burst limit (requests)."""
+        value = self._settings.get("api_throttle_burst_limit")
+        return None if value is None else int(value)
+
+    @property
+    def api_method_throttling(self) -> dict[str, dict[str, Any]]:
+        """Per-method throttling keyed by "<resource path>/<HTTP method>".
+
+        Each value has optional "rate_limit" and "burst_limit" entries.
+        """
+        return dict(self._settings.get("api_method_throttling", {}))
+
+    @property
+    def api_key_required(self) -> bool:
+        """Whether API methods require an API key (needed for usage plans)."""
+        return bool(self._settings.get("api_key_required", False))
+
+    @property
+    def api_usage_plans(self) -> list[dict[str, Any]]:
+        """Usage plans for per-client throttling and quotas.
+
+        Each plan has a "name" and optional "rate_limit", "burst_limit",
+        "quota_limit" and "quota_period" (DAY/WEEK/MONTH) entries.
+        """
+        return list(self._settings.get("api_usage_plans", []))
+
+    @property
+    def lambda_architecture(self) -> str:
+        """Lambda instruction set architecture ("arm64" or "x86_64")."""
+        value = str(self._settings.get("lambda_architecture", "x86_64"))
+        if value not in ("arm64", "x86_64"):
+            raise ValueError(f"Unsupported lambda_architecture: {value}")
+        return value
+
+    @property
+    def lambda_memory_size(self) -> int:
+        """Lambda memory size in MB (CPU is allocated proportionally)."""
+        return int(self._settings.get("lambda_memory_size", 5192))
+
+    @property
+    def lambda_reserved_concurrency(self) -> int | None:
+        """Reserved concurrent executions (None leaves the account pool shared)."""
+        value = self._settings.get("lambda_reserved_concurrency")
+        return None if value is None else int(value)
+
+    @property
+    def lambda_provisioned_concurrency(self) -> int:
+        """Provisioned concurrent executions on the live alias (0 disables it)."""
+        return int(self._settings.get("lambda_provisioned_concurrency", 0))
+
+    @property
+    def lambda_provisioned_concurrency_max(self) -> int:
+        """Upper bound for provisioned concurrency autoscaling.
+
+        Autoscaling is disabled when this is not above
+        lambda_provisioned_concurrency.
+        """
+        return int(self._settings.get("lambda_provisioned_concurrency_max", 0))
+
+    @property
+    def lambda_provisioned_utilization_target(self) -> float:
+        """Target provisioned concurrency utilization for autoscaling (0-1)."""
+        return float(self._settings.get("lambda_provisioned_utilization_target", 0.7))
+
+    @property
+    def lambda_snap_start(self) -> bool:
+        """Whether to enable SnapStart on published versions."""
+        return bool(self._settings.get("lambda_snap_start", False))
+
+    @property
+    def table_indexes(self) -> list[str]:
+        """Attributes of the books table that get a GSI ("author", "publisher").
+
+        DynamoDB creates only one GSI per table update, so add new entries to an
+        existing table one deployment at a time.
+        """
+        value = list(self._settings.get("table_indexes", ["author", "publisher"]))
+        unknown = set(value) - {"author", "publisher"}
+        if unknown:
+            raise ValueError(f"Unsupported table_indexes: {', '.join(sorted(unknown))}")
+        return value
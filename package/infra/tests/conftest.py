@@ -0,0 +1,36 @@
+from collections.abc import Callable
+
+import pytest
+from aws_cdk import App, Aspects, assertions
+from cdk_nag import AwsSolutionsChecks
+
+from src.model.project import Project
+from src.stack.app_stack import AppStack
+
+
+@pytest.fixture
+def synth() -> Callable[..., AppStack]:
+    """Build an AppStack with cdk-nag checks for the given [tool.infra] settings."""
+
+    def _synth(settings: dict, environment: str | None = None) -> AppStack:
+        app = App()
+        stack = AppStack(
+            app, "AppStack", project=Project(settings, environment=environment)
+        )
+        Aspects.of(stack).add(AwsSolutionsChecks(verbose=True))
+        return stack
+
+    return _synth
+
+
+@pytest.fixture
+def assert_no_nag_errors() -> Callable[[AppStack], None]:
+    """Assert that cdk-nag reported no AwsSolutions errors on the stack."""
+
+    def _assert_no_nag_errors(stack: AppStack) -> None:
+        errors = assertions.Annotations.from_stack(stack).find_error(
+            "*", assertions.Match.string_like_regexp(r"AwsSolutions-.*")
+        )
+        assert errors == [], f"CDK Nag Errors: {errors}"
+
+    return _assert_no_nag_errors
@@ -0,0 +1,139 @@
+import pytest
+from aws_cdk import assertions
+
+from src.model.project import Project
+
+
+def test_function_profile(synth):
+    template = assertions.Template.from_stack(
+        synth(
+            {
+                "lambda_architecture": "arm64",
+                "lambda_memory_size": 1769,
+                "lambda_reserved_concurrency": 50,
+                "lambda_provisioned_concurrency": 0,
+                "lambda_snap_start": False,
+            }
+        )
+    )
+
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Architectures": ["arm64"],
+            "MemorySize": 1769,
+            "ReservedConcurrentExecutions": 50,
+            "SnapStart": assertions.Match.absent(),
+        },
+    )
+    template.has_resource_properties(
+        "AWS::Lambda::LayerVersion", {"CompatibleArchitectures": ["arm64"]}
+    )
+    template.resource_count_is("AWS::Lambda::Alias", 0)
+
+
+def test_provisioned_concurrency_with_autoscaling(synth, assert_no_nag_errors):
+    stack = synth(
+        {
+            "lambda_provisioned_concurrency": 2,
+            "lambda_provisioned_concurrency_max": 10,
+            "lambda_provisioned_utilization_target": 0.6,
+            "lambda_snap_start": False,
+        }
+    )
+    template = assertions.Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::Lambda::Alias",
+        {
+            "Name": "live",
+            "ProvisionedConcurrencyConfig": {"ProvisionedConcurrentExecutions": 2},
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalableTarget",
+        {
+            "MinCapacity": 2,
+            "MaxCapacity": 10,
+            "ScalableDimension": "lambda:function:ProvisionedConcurrency",
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ApplicationAutoScaling::ScalingPolicy",
+        {
+            "TargetTrackingScalingPolicyConfiguration": assertions.Match.object_like(
+                {"TargetValue": 0.6}
+            )
+        },
+    )
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Environment": {
+                "Variables": assertions.Match.object_like({"PRIME_ON_INIT": "true"})
+            }
+        },
+    )
+    assert_no_nag_errors(stack)
+
+
+def test_snap_start_routes_api_to_alias(synth, assert_no_nag_errors):
+    stack = synth({"lambda_snap_start": True, "lambda_provisioned_concurrency": 0})
+    template = assertions.Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "SnapStart": {"ApplyOn": "PublishedVersions"},
+            "Environment": {
+                "Variables": assertions.Match.object_like({"PRIME_ON_INIT": "false"})
+            },
+        },
+    )
+    template.has_resource_properties(
+        "AWS::Lambda::Alias",
+        {
+            "Name": "live",
+            "ProvisionedConcurrencyConfig": assertions.Match.absent(),
+        },
+    )
+    alias_id = next(iter(template.find_resources("AWS::Lambda::Alias")))
+    template.has_resource_properties(
+        "AWS::ApiGateway::Method",
+        {
+            "Integration": assertions.Match.object_like(
+                {
+                    "Uri": assertions.Match.object_like(
+                        {
+                            "Fn::Join": assertions.Match.array_with(
+                                [assertions.Match.array_with([{"Ref": alias_id}])]
+                            )
+                        }
+                    )
+                }
+            )
+        },
+    )
+    assert_no_nag_errors(stack)
+
+
+def test_snap_start_and_provisioned_concurrency_are_exclusive(synth):
+    with pytest.raises(ValueError, match="SnapStart"):
+        synth({"lambda_snap_start": True, "lambda_provisioned_concurrency": 1})
+
+
+def test_environment_profiles():
+    assert Project().lambda_architecture == "x86_64"
+    assert Project(environment="dev").lambda_architecture == "x86_64"
+    assert Project(environment="prod").lambda_architecture == "arm64"
+    assert Project(environment="prod").stack_name.endswith("ProdApp")
+    with pytest.raises(ValueError, match="Unknown environment"):
+        Project(environment="staging")
+
+
+def test_environment_selects_architecture(synth):
+    template = assertions.Template.from_stack(synth({}, environment="prod"))
+
+    template.has_resource_properties(
+        "AWS::Lambda::Function", {"Architectures": ["arm64"]}
+    )
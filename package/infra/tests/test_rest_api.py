@@ -0,0 +1,212 @@
+import ast
+from pathlib import Path
+
+from aws_cdk import assertions
+
+from src.construct.rest_api import UNCACHED_BOOK_PATHS
+
+BOOKS_ROUTER = Path(__file__).resolve().parents[2] / "api" / "router" / "books.py"
+
+
+def resource_paths(template: assertions.Template) -> dict[str, str]:
+    """Map each API Gateway resource path to its parent's logical ID."""
+    resources = template.find_resources("AWS::ApiGateway::Resource")
+
+    def path(logical_id: str) -> str:
+        props = resources[logical_id]["Properties"]
+        parent = props["ParentId"]
+        prefix = path(parent["Ref"]) if "Ref" in parent else ""
+        return f"{prefix}/{props['PathPart']}"
+
+    return {
+        path(logical_id): str(resource["Properties"]["ParentId"])
+        for logical_id, resource in resources.items()
+    }
+
+
+def book_router_paths() -> set[str]:
+    """Collect the route paths declared on the /books router of the api package."""
+    tree = ast.parse(BOOKS_ROUTER.read_text(encoding="utf-8"))
+    return {
+        decorator.args[0].value
+        for node in ast.walk(tree)
+        if isinstance(node, ast.AsyncFunctionDef | ast.FunctionDef)
+        for decorator in node.decorator_list
+        if isinstance(decorator, ast.Call)
+        and isinstance(decorator.func, ast.Attribute)
+        and isinstance(decorator.func.value, ast.Name)
+        and decorator.func.value.id == "router"
+        and decorator.args
+    }
+
+
+def test_uncached_book_paths_match_router():
+    # Every static child of /books must be declared, or API Gateway routes it
+    # to the cached {isbn} resource
+    static_paths = {
+        path.removeprefix("/")
+        for path in book_router_paths()
+        if path and not path.startswith("/{isbn}")
+    }
+    assert static_paths == set(UNCACHED_BOOK_PATHS)
+
+
+def test_api_cache_disabled_by_default(synth):
+    template = assertions.Template.from_stack(synth({"api_cache_enabled": False}))
+
+    template.has_resource_properties(
+        "AWS::ApiGateway::Stage",
+        {"CacheClusterEnabled": assertions.Match.absent()},
+    )
+    template.resource_properties_count_is(
+        "AWS::ApiGateway::Resource", {"PathPart": "books"}, 0
+    )
+
+
+def test_api_cache_enabled(synth, assert_no_nag_errors):
+    stack = synth({"api_cache_enabled": True, "api_cache_ttl_seconds": 120})
+    template = assertions.Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::ApiGateway::Stage",
+        {
+            "CacheClusterEnabled": True,
+            "CacheClusterSize": "0.5",
+            "MethodSettings": assertions.Match.array_with(
+                [
+                    assertions.Match.object_like(
+                        {
+                            "ResourcePath": "/~1books~1{isbn}",
+                            "HttpMethod": "GET",
+                            "CachingEnabled": True,
+                            "CacheTtlInSeconds": 120,
+                            "CacheDataEncrypted": True,
+                        }
+                    )
+                ]
+            ),
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ApiGateway::Method",
+        {
+            "HttpMethod": "GET",
+            "RequestParameters": {
+                "method.request.path.isbn": True,
+                "method.request.querystring.fields": False,
+                "method.request.header.If-None-Match": False,
+            },
+            "Integration": assertions.Match.object_like(
+                {
+                    "CacheKeyParameters": [
+                        "method.request.path.isbn",
+                        "method.request.querystring.fields",
+                        "method.request.header.If-None-Match",
+                    ]
+                }
+            ),
+        },
+    )
+
+    assert_no_nag_errors(stack)
+
+
+def test_api_cache_resource_tree(synth):
+    template = assertions.Template.from_stack(synth({"api_cache_enabled": True}))
+
+    paths = resource_paths(template)
+    assert set(paths) == {
+        "/{proxy+}",
+        "/books",
+        "/books/export",
+        "/books/batch",
+        "/books/batch-get",
+        "/books/by-author",
+        "/books/by-author/{author}",
+        "/books/by-publisher",
+        "/books/by-publisher/{publisher}",
+        "/books/{isbn}",
+    }
+    # API Gateway rejects more than one variable path part under the same parent
+    variable_parents = [parent for path, parent in paths.items() if path.endswith("}")]
+    assert len(variable_parents) == len(set(variable_parents))
+
+    template.has_resource_properties(
+        "AWS::ApiGateway::Stage",
+        {
+            "MethodSettings": assertions.Match.array_with(
+                [
+                    assertions.Match.object_like(
+                        {
+                            "ResourcePath": "/~1books~1export",
+                            "HttpMethod": "*",
+                            "CachingEnabled": False,
+                        }
+                    )
+                ]
+            ),
+        },
+    )
+
+
+def test_api_throttling_and_usage_plans(synth, assert_no_nag_errors):
+    stack = synth(
+        {
+            "api_throttle_rate_limit": 100,
+            "api_throttle_burst_limit": 200,
+            "api_method_throttling": {
+                "/{proxy+}/ANY": {"rate_limit": 50, "burst_limit": 80}
+            },
+            "api_key_required": True,
+            "api_usage_plans": [
+                {
+                    "name": "partner",
+                    "rate_limit": 10,
+                    "burst_limit": 20,
+                    "quota_limit": 1000,
+                    "quota_period": "DAY",
+                }
+            ],
+        }
+    )
+    template = assertions.Template.from_stack(stack)
+
+    template.has_resource_properties(
+        "AWS::ApiGateway::Stage",
+        {
+            "MethodSettings": assertions.Match.array_with(
+                [
+                    assertions.Match.object_like(
+                        {
+                            "ResourcePath": "/*",
+                            "HttpMethod": "*",
+                            "ThrottlingRateLimit": 100,
+                            "ThrottlingBurstLimit": 200,
+                        }
+                    ),
+                    assertions.Match.object_like(
+                        {
+                            "ResourcePath": "/~1{proxy+}",
+                            "HttpMethod": "ANY",
+                            "ThrottlingRateLimit": 50,
+                            "ThrottlingBurstLimit": 80,
+                        }
+                    ),
+                ]
+            ),
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ApiGateway::Method", {"HttpMethod": "ANY", "ApiKeyRequired": True}
+    )
+    template.has_resource_properties(
+        "AWS::ApiGateway::UsagePlan",
+        {
+            "UsagePlanName": "partner",
+            "Throttle": {"RateLimit": 10, "BurstLimit": 20},
+            "Quota": {"Limit": 1000, "Period": "DAY"},
+        },
+    )
+    template.resource_count_is("AWS::ApiGateway::ApiKey", 1)
+
+    assert_no_nag_errors(stack)
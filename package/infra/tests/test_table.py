@@ -0,0 +1,31 @@
+import pytest
+from aws_cdk import assertions
+
+from src.model.project import Project
+
+
+def index_names(template: assertions.Template) -> list[str]:
+    (table,) = template.find_resources("AWS::DynamoDB::Table").values()
+    indexes = table["Properties"].get("GlobalSecondaryIndexes", [])
+    return [index["IndexName"] for index in indexes]
+
+
+def test_table_indexes_follow_the_setting(synth, assert_no_nag_errors):
+    stack = synth({"table_indexes": ["author"]})
+
+    assert index_names(assertions.Template.from_stack(stack)) == ["author-index"]
+    assert_no_nag_errors(stack)
+
+
+def test_table_indexes_can_include_publisher(synth):
+    stack = synth({"table_indexes": ["author", "publisher"]})
+
+    assert index_names(assertions.Template.from_stack(stack)) == [
+        "author-index",
+        "publisher-index",
+    ]
+
+
+def test_unknown_table_index_is_rejected():
+    with pytest.raises(ValueError, match="title"):
+        Project({"table_indexes": ["author", "title"]}).table_indexes